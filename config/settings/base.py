@@ -538,6 +538,33 @@ TXC_SCHEMA_ZIP_URL = env(
     default="http://www.transxchange.org.uk/schema/2.4/TransXChange_schema_2.4.zip",
 )
 TXC_XSD_PATH = env("TXC_XSD_PATH", default="TransXChange_general.xsd")
+# Local directory where the timetable pipeline unpacks the files of a revision
+TXC_DOCUMENT_STORE_DIR = env("TXC_DOCUMENT_STORE_DIR", default="/tmp/txc_documents")
+# Number of threads used to validate the files of a revision against the schema
+TXC_SCHEMA_VALIDATION_WORKERS = env.int("TXC_SCHEMA_VALIDATION_WORKERS", default=1)
+# Load the transmodel tables of a revision with COPY rather than bulk_create
+TXC_LOAD_WITH_COPY = env.bool("TXC_LOAD_WITH_COPY", default=False)
+
+
+# Bulk data archive
+# ------------------------------------------------------------------------------
+# Number of threads reading upload files from storage while an archive is written
+BULK_ARCHIVE_FETCH_WORKERS = env.int("BULK_ARCHIVE_FETCH_WORKERS", default=8)
+# Number of upload files read ahead of the one being written into an archive
+BULK_ARCHIVE_FETCH_WINDOW = env.int("BULK_ARCHIVE_FETCH_WINDOW", default=16)
+
+
+# Request log
+# ------------------------------------------------------------------------------
+# Buffer API requests and resource downloads in Redis and save them in batches
+REQUEST_LOG_BUFFERED = env.bool("REQUEST_LOG_BUFFERED", default=True)
+# Redis the buffered requests are kept in. They aren't cache entries and have no
+# expiry, the Redis must not evict keys without an expiry, as for the broker
+REQUEST_LOG_REDIS_URL = env("REQUEST_LOG_REDIS_URL", default=CELERY_BROKER_URL)
+# Seconds between saving the buffered requests
+REQUEST_LOG_FLUSH_INTERVAL = env.float("REQUEST_LOG_FLUSH_INTERVAL", default=10.0)
+# Number of buffered requests saved in a single transaction
+REQUEST_LOG_FLUSH_BATCH_SIZE = env.int("REQUEST_LOG_FLUSH_BATCH_SIZE", default=5000)
 
 
 # NeTeX Schema
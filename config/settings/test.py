@@ -56,3 +56,5 @@ EMAIL_PORT = 1025
 # Your stuff...
 # ------------------------------------------------------------------------------
 NOTIFIER = "django"
+# Requests are saved as they are made, there is no Redis to buffer them in
+REQUEST_LOG_BUFFERED = False
@@ -11,6 +11,7 @@ from transit_odp.api.validators import (
 )
 from transit_odp.organisation.constants import DatasetType
 from transit_odp.organisation.models import Dataset
+from transit_odp.organisation.search import API_SEARCH_WEIGHTS, get_search_query
 
 valid_parameters = [
     "limit",
@@ -108,20 +109,14 @@ class DatasetViewSet(viewsets.ReadOnlyModelViewSet):
         keywords = self.request.GET.get("search", "").strip()
 
         if keywords:
-            # TODO - enable full-text search
-            # query = SearchQuery(keywords)
-            # vector = SearchVector('name', 'description')
-            # qs = qs.annotate(search=vector).filter(search=query)
-            # qs = qs.annotate(rank=SearchRank(vector, query)).order_by('-rank')
-            qs = qs.filter(
-                Q(live_revision__name__icontains=keywords)
-                | Q(live_revision__description__icontains=keywords)
-                | Q(organisation_name__icontains=keywords)
-                | Q(live_revision__admin_areas__name__icontains=keywords)
-            )
-
-        # Make the search results distinct since there will be duplicates from the
-        # join with admin_areas
+            query = get_search_query(keywords, API_SEARCH_WEIGHTS)
+            keywords_filter = Q(organisation_name__icontains=keywords)
+            if query is not None:
+                keywords_filter |= Q(live_revision__search_vector=query)
+            qs = qs.filter(keywords_filter)
+
+        # Make the results distinct since there will be duplicates from the
+        # join with admin_areas in the adminArea filter
         qs = qs.order_by("id").distinct()
 
         return qs
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AvlConfig(AppConfig):
     name = "transit_odp.avl"
     verbose_name = "Avl"
+
+    def ready(self):
+        import transit_odp.avl.receivers  # noqa: F401
@@ -0,0 +1,43 @@
+import django.db.models.deletion
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organisation", "0058_auto_20230113_1621"),
+        ("avl", "0023_alter_postpublishingcheckreport_dataset"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TimetableJourneyIndex",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                ("index", models.JSONField()),
+                (
+                    "txc_file_attributes",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="journey_index",
+                        to="organisation.txcfileattributes",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -19,7 +19,11 @@ from transit_odp.avl.validation.models import (
 from transit_odp.common.constants import UTF8
 from transit_odp.common.fields import CallableStorageFileField
 from transit_odp.organisation.constants import AVLType
-from transit_odp.organisation.models import Dataset, DatasetRevision
+from transit_odp.organisation.models import (
+    Dataset,
+    DatasetRevision,
+    TXCFileAttributes,
+)
 from transit_odp.pipelines.models import TaskResult
 
 limit_to_query = Q(dataset__dataset_type=AVLType) & Q(dataset__live_revision_id=F("id"))
@@ -237,3 +241,21 @@ class PostPublishingCheckReport(models.Model):
             "vehicle_activities_completely_matching="
             f"{self.vehicle_activities_completely_matching}"
         )
+
+
+class TimetableJourneyIndex(models.Model):
+    """The vehicle journeys of a published TXC file, indexed by journey code for
+    the post publishing checks. The `index` is a serialised TimetableIndex.
+    """
+
+    txc_file_attributes = models.OneToOneField(
+        TXCFileAttributes, on_delete=models.CASCADE, related_name="journey_index"
+    )
+    created = CreationDateTimeField(_("created"))
+    index = models.JSONField()
+
+    def __str__(self):
+        return (
+            f"id={self.id}, txc_file_attributes_id={self.txc_file_attributes_id}, "
+            f"created={self.created.isoformat()}"
+        )
@@ -0,0 +1,39 @@
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+class IndexedVehicleJourney(BaseModel):
+    """The parts of a TXC VehicleJourney used to match it to a SIRI-VM
+    VehicleActivity, with its operating days resolved.
+    """
+
+    # Position of the VehicleJourney in the VehicleJourneys of its file
+    position: Optional[int] = None
+    sequence_number: Optional[str] = None
+    # DaysOfWeek of the OperatingProfile, empty if the journey has no applicable
+    # OperatingProfile, e.g. it only runs on holidays
+    days_of_week: List[str] = []
+    days_of_operation: bool = False
+    days_of_non_operation: bool = False
+    # (StartDate, EndDate) of the WorkingDays of the ServicedOrganisation, None if
+    # the journey doesn't refer to a ServicedOrganisation, empty if the
+    # ServicedOrganisation it refers to isn't in the file
+    working_days: Optional[List[Tuple[str, str]]] = None
+
+
+class TimetableIndex(BaseModel):
+    """The vehicle journeys of a TXC file keyed by TicketMachine/JourneyCode,
+    with the file level attributes used to choose between them.
+    """
+
+    filename: str
+    file_name: str = ""
+    revision_number: Optional[str] = None
+    operating_period_start: Optional[str] = None
+    operating_period_end: Optional[str] = None
+    service_code: Optional[str] = None
+    journeys: Dict[str, List[IndexedVehicleJourney]] = {}
+
+    def get_journeys(self, journey_code: str) -> List[IndexedVehicleJourney]:
+        return self.journeys.get(journey_code, [])
@@ -1,15 +1,22 @@
 import logging
 import random
-from typing import List, Optional, Tuple
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Tuple
 
 import requests
 from django.conf import settings
+from lxml import etree
+from lxml.etree import _Element
+from urllib3.exceptions import HTTPError
 
 from transit_odp.avl.post_publishing_checks.constants import SirivmField
 from transit_odp.avl.post_publishing_checks.models import Siri, VehicleActivity
+from transit_odp.avl.post_publishing_checks.models.siri import SIRI_NAMESPACE
 
 logger = logging.getLogger(__name__)
 
+VEHICLE_ACTIVITY_TAG = f"{{{SIRI_NAMESPACE}}}VehicleActivity"
+
 
 class SiriHeader(dict):
     def __setitem__(self, key, value):
@@ -34,19 +41,53 @@ class SiriHeader(dict):
 
 
 class SirivmSampler:
-    def get_siri_vm_data_feed_by_id(self, feed_id: int) -> Optional[bytes]:
+    @contextmanager
+    def open_siri_vm_data_feed_by_id(self, feed_id: int) -> Iterator[Optional[IO]]:
+        """Open the datafeed as a stream so it can be parsed as it is downloaded."""
         url = f"{settings.CAVL_CONSUMER_URL}/datafeed/{feed_id}/"
         try:
-            response = requests.get(url, timeout=60)
+            response = requests.get(url, timeout=60, stream=True)
         except requests.RequestException:
             logger.exception(f"Error requesting {url}")
-            return None
+            yield None
+            return
+
+        with response:
+            if response.status_code != 200:
+                logger.error(
+                    f"Status code {response.status_code} returned from GET {url}"
+                )
+                yield None
+                return
+
+            response.raw.decode_content = True
+            yield response.raw
+
+    def sample_vehicle_activities(
+        self, source: IO, num_activities: int
+    ) -> Tuple[Siri, List[_Element], int]:
+        """Parse a SIRI-VM packet keeping a uniform random sample of up to
+        `num_activities` VehicleActivity elements.
 
-        if response.status_code != 200:
-            logger.error(f"Status code {response.status_code} returned from GET {url}")
-            return None
+        Each VehicleActivity is removed from the tree once it has been parsed, so
+        only the packet header and the sample are held in memory however large the
+        packet is. Returns the packet without its vehicle activities, the sample
+        and the number of vehicle activities in the packet.
+        """
+        samples: List[_Element] = []
+        count = 0
+        context = etree.iterparse(source, events=("end",), tag=VEHICLE_ACTIVITY_TAG)
+        for _, element in context:
+            count += 1
+            if len(samples) < num_activities:
+                samples.append(element)
+            else:
+                idx = random.randrange(count)
+                if idx < num_activities:
+                    samples[idx] = element
+            element.getparent().remove(element)
 
-        return response.content
+        return Siri.from_lxml_element(context.root), samples, count
 
     def get_vehicle_activities(
         self,
@@ -55,26 +96,27 @@ class SirivmSampler:
     ) -> Tuple[SiriHeader, List[VehicleActivity]]:
         random.seed()
         sirivm_fields = {}
-        feed = self.get_siri_vm_data_feed_by_id(feed_id=feed_id)
-        if not isinstance(feed, bytes):
-            return sirivm_fields, []
+        with self.open_siri_vm_data_feed_by_id(feed_id=feed_id) as feed:
+            if feed is None:
+                return sirivm_fields, []
+            try:
+                siri, samples, count = self.sample_vehicle_activities(
+                    feed, num_activities
+                )
+            except (requests.RequestException, HTTPError):
+                logger.exception(f"Error reading datafeed for feed {feed_id}")
+                return sirivm_fields, []
 
-        siri = Siri.from_bytes(feed)
         sirivm_header = SiriHeader.from_siri_packet(siri)
-
-        vmd = siri.service_delivery.vehicle_monitoring_delivery
-        vehicle_activities = vmd.vehicle_activities
-        logger.info(
-            f"Client returned {len(vehicle_activities)} vehicle activities for "
-            f"feed {feed_id}"
-        )
-        if len(vehicle_activities) == 0:
+        logger.info(f"Client returned {count} vehicle activities for feed {feed_id}")
+        if count == 0:
             return sirivm_header, []
 
-        num_samples = min(num_activities, len(vehicle_activities))
-        samples = random.sample(vehicle_activities, k=num_samples)
-
+        vehicle_activities = [
+            VehicleActivity.from_lxml_element(element) for element in samples
+        ]
         logger.debug(
-            f"Added {len(samples)} sample vehicle activities for feed id {feed_id}"
+            f"Added {len(vehicle_activities)} sample vehicle activities for feed id "
+            f"{feed_id}"
         )
-        return sirivm_header, samples
+        return sirivm_header, vehicle_activities
@@ -0,0 +1,117 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from transit_odp.avl.post_publishing_checks.constants import SirivmField
+from transit_odp.avl.post_publishing_checks.daily.sirivm_sampler import SirivmSampler
+
+DATA_DIR = Path(__file__).parents[2] / "models" / "tests" / "data"
+SAMPLER_MODULE = "transit_odp.avl.post_publishing_checks.daily.sirivm_sampler"
+
+HEADER = b"""<Siri xmlns="http://www.siri.org.uk/siri" version="2.0">
+  <ServiceDelivery>
+    <ResponseTimestamp>2023-01-25T17:02:00+00:00</ResponseTimestamp>
+    <ProducerRef>ItoWorld</ProducerRef>
+    <VehicleMonitoringDelivery>
+      <ResponseTimestamp>2023-01-25T17:02:01+00:00</ResponseTimestamp>
+      <RequestMessageRef>c68a8a45-7fe5-45b4-8225-0b5eb09b2c82</RequestMessageRef>
+      <ValidUntil>2023-01-25T17:07:00+00:00</ValidUntil>
+      <ShortestPossibleCycle>PT5S</ShortestPossibleCycle>
+"""
+VEHICLE_ACTIVITY = """      <VehicleActivity>
+        <RecordedAtTime>2023-01-25T17:01:47+00:00</RecordedAtTime>
+        <ItemIdentifier>{0}</ItemIdentifier>
+        <ValidUntilTime>2023-01-25T17:07:00+00:00</ValidUntilTime>
+        <MonitoredVehicleJourney>
+          <LineRef>22</LineRef>
+          <OperatorRef>STWS</OperatorRef>
+          <VehicleLocation>
+            <Longitude>-4.664237</Longitude>
+            <Latitude>55.6348305</Latitude>
+          </VehicleLocation>
+          <VehicleRef>STWS-{0}</VehicleRef>
+        </MonitoredVehicleJourney>
+      </VehicleActivity>
+"""
+FOOTER = b"""    </VehicleMonitoringDelivery>
+  </ServiceDelivery>
+</Siri>
+"""
+
+
+class SyntheticFeed:
+    """A SIRI-VM packet that is generated as it is read."""
+
+    def __init__(self, num_activities: int):
+        self._chunks = self.generate(num_activities)
+        self._buffer = b""
+
+    def generate(self, num_activities: int):
+        yield HEADER
+        for idx in range(num_activities):
+            yield VEHICLE_ACTIVITY.format(idx).encode()
+        yield FOOTER
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def test_get_vehicle_activities_samples_large_feed(mocker):
+    num_activities = 100_000
+    response = mocker.MagicMock(status_code=200, raw=SyntheticFeed(num_activities))
+    mocker.patch(f"{SAMPLER_MODULE}.requests.get", return_value=response)
+
+    tracemalloc.start()
+    try:
+        header, activities = SirivmSampler().get_vehicle_activities(
+            feed_id=1, num_activities=1000
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert header[SirivmField.PRODUCER_REF] == "ItoWorld"
+    assert header[SirivmField.SHORTEST_POSSIBLE_CYCLE] == "PT5S"
+    assert len(activities) == 1000
+    item_identifiers = {activity.item_identifier for activity in activities}
+    assert len(item_identifiers) == 1000
+    assert all(0 <= int(item) < num_activities for item in item_identifiers)
+    # Only the sample is held, the whole packet is over 50MB
+    assert peak < 20 * 1024 * 1024
+
+
+def test_get_vehicle_activities_keeps_line_numbers(mocker):
+    with (DATA_DIR / "siri_sample.xml").open("rb") as fp:
+        response = mocker.MagicMock(status_code=200, raw=mocker.Mock(wraps=fp))
+        mocker.patch(f"{SAMPLER_MODULE}.requests.get", return_value=response)
+        header, activities = SirivmSampler().get_vehicle_activities(
+            feed_id=1, num_activities=1000
+        )
+
+    assert header[SirivmField.VERSION] == "2.0"
+    assert len(activities) == 2
+    mvj = activities[0].monitored_vehicle_journey
+    assert mvj.direction_ref == "OUTBOUND"
+    assert mvj.direction_ref_linenum == 16
+    assert mvj.origin_ref_linenum == 23
+
+
+@pytest.mark.parametrize("status_code", [404, 500])
+def test_get_vehicle_activities_unavailable_feed(mocker, status_code):
+    response = mocker.MagicMock(status_code=status_code)
+    mocker.patch(f"{SAMPLER_MODULE}.requests.get", return_value=response)
+
+    header, activities = SirivmSampler().get_vehicle_activities(
+        feed_id=1, num_activities=1000
+    )
+    assert header == {}
+    assert activities == []
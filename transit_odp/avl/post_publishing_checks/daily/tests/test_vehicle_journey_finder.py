@@ -3,10 +3,12 @@ from pathlib import Path
 
 import pytest
 
+from transit_odp.avl.models import TimetableJourneyIndex
 from transit_odp.avl.post_publishing_checks.constants import ErrorCategory
 from transit_odp.avl.post_publishing_checks.daily.results import ValidationResult
 from transit_odp.avl.post_publishing_checks.daily.vehicle_journey_finder import (
     DayOfWeek,
+    JourneyMatch,
     TxcVehicleJourney,
     VehicleJourneyFinder,
 )
@@ -186,6 +188,55 @@ def test_filter_by_days_of_operation():
     assert txc_vehicle_journeys[0].vehicle_journey["SequenceNumber"] == "1"
 
 
+def test_index_timetable_without_operating_profile():
+    txc_xml = TransXChangeDocument(str(DATA_DIR / "vehicle_journeys7.xml"))
+    vehicle_journey_finder = VehicleJourneyFinder()
+    vehicle_journey = TxcVehicleJourney(txc_xml.get_vehicle_journeys()[0], txc_xml)
+    assert (
+        vehicle_journey_finder.get_operating_profile_for_journey(vehicle_journey)
+        is None
+    )
+
+    timetable = vehicle_journey_finder.index_timetable(txc_xml, "vehicle_journeys7.xml")
+    journeys = timetable.get_journeys("700")
+    assert len(journeys) == 1
+    assert journeys[0].days_of_week == []
+    assert journeys[0].working_days is None
+
+
+def test_filter_by_days_of_operation_with_unresolved_serviced_organisation():
+    txc_xml = TransXChangeDocument(str(DATA_DIR / "vehicle_journeys7.xml"))
+    txc_vehicle_journeys = [
+        TxcVehicleJourney(vj, txc_xml) for vj in txc_xml.get_vehicle_journeys()
+    ]
+    recorded_at_time = datetime.date.fromisoformat("2023-04-17")
+    vehicle_journey_finder = VehicleJourneyFinder()
+    vehicle_journey_finder.filter_by_days_of_operation(
+        recorded_at_time, txc_vehicle_journeys, ValidationResult()
+    )
+
+    assert [vj.vehicle_journey["SequenceNumber"] for vj in txc_vehicle_journeys] == [
+        "700",
+        "703",
+    ]
+
+
+def test_index_timetable_without_serviced_organisation_ref():
+    txc_xml = TransXChangeDocument(str(DATA_DIR / "vehicle_journeys7.xml"))
+    vehicle_journey_finder = VehicleJourneyFinder()
+    timetable = vehicle_journey_finder.index_timetable(txc_xml, "vehicle_journeys7.xml")
+
+    days_of_operation = timetable.get_journeys("702")
+    assert len(days_of_operation) == 1
+    assert days_of_operation[0].days_of_operation
+    assert days_of_operation[0].working_days == []
+
+    days_of_non_operation = timetable.get_journeys("703")
+    assert len(days_of_non_operation) == 1
+    assert days_of_non_operation[0].days_of_non_operation
+    assert days_of_non_operation[0].working_days == []
+
+
 @pytest.mark.parametrize(
     "txc_files,expected_result,expected_error",
     [
@@ -223,3 +274,30 @@ def test_filter_by_service_code(txc_files, expected_result, expected_error):
         assert result.errors[ErrorCategory.GENERAL] == expected_error
     else:
         assert result.errors == expected_error
+
+
+def test_get_timetable_indexes():
+    txc_file_attrs = TXCFileAttributesFactory(
+        revision__upload_file__from_path=str(DATA_DIR / "vehicle_journeys.xml"),
+        filename="vehicle_journeys.xml",
+    )
+    revision = txc_file_attrs.revision
+    vehicle_journey_finder = VehicleJourneyFinder()
+
+    # The revision is indexed the first time it's used if it wasn't on publishing
+    timetables = vehicle_journey_finder.get_timetable_indexes([txc_file_attrs])
+    assert TimetableJourneyIndex.objects.count() == 1
+    assert vehicle_journey_finder.index_revision(revision) == []
+
+    assert len(timetables) == 1
+    assert timetables[0].file_name == "vehicle_journeys.xml"
+    assert timetables[0].revision_number == "1"
+    journeys = timetables[0].get_journeys("50")
+    assert len(journeys) == 1
+    assert journeys[0].sequence_number == "2"
+    assert journeys[0].days_of_week == [DayOfWeek.tuesday.value]
+
+    txc_vehicle_journey = vehicle_journey_finder.get_txc_vehicle_journey(
+        revision, JourneyMatch(timetables[0], journeys[0])
+    )
+    assert txc_vehicle_journey.vehicle_journey["SequenceNumber"] == "2"
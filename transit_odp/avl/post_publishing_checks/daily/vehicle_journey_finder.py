@@ -1,11 +1,17 @@
 import datetime
 import logging
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from zipfile import ZipFile
 
+from transit_odp.avl.models import TimetableJourneyIndex
 from transit_odp.avl.post_publishing_checks.constants import ErrorCategory, SirivmField
+from transit_odp.avl.post_publishing_checks.daily.journey_index import (
+    IndexedVehicleJourney,
+    TimetableIndex,
+)
 from transit_odp.avl.post_publishing_checks.daily.results import (
     MiscFieldPPC,
     ValidationResult,
@@ -20,7 +26,7 @@ from transit_odp.common.xmlelements.exceptions import (
     TooManyElements,
     XMLAttributeError,
 )
-from transit_odp.organisation.models import TXCFileAttributes
+from transit_odp.organisation.models import DatasetRevision, TXCFileAttributes
 from transit_odp.timetables.transxchange import (
     TransXChangeDocument,
     TransXChangeElement,
@@ -28,6 +34,9 @@ from transit_odp.timetables.transxchange import (
 
 logger = logging.getLogger(__name__)
 
+# Number of parsed timetables kept by a VehicleJourneyFinder
+DOCUMENT_CACHE_SIZE = 16
+
 
 class DayOfWeek(ChoiceEnum):
     monday = "Monday"
@@ -61,7 +70,18 @@ class TxcVehicleJourney:
     txc_xml: TransXChangeDocument
 
 
+@dataclass
+class JourneyMatch:
+    timetable: TimetableIndex
+    journey: IndexedVehicleJourney
+
+
 class VehicleJourneyFinder:
+    def __init__(self):
+        self._timetables: Dict[int, TimetableIndex] = {}
+        self._indexed: Set[int] = set()
+        self._documents: Dict[Tuple[int, str], TransXChangeDocument] = OrderedDict()
+
     def get_vehicle_journey_ref(self, mvj: MonitoredVehicleJourney) -> Optional[str]:
         framed_vehicle_journey_ref = mvj.framed_vehicle_journey_ref
         if framed_vehicle_journey_ref is not None:
@@ -149,44 +169,300 @@ class VehicleJourneyFinder:
 
         return consistent_data
 
-    def get_corresponding_timetable_xml_files(
-        self, txc_file_attrs: List[TXCFileAttributes]
-    ) -> List[TransXChangeDocument]:
-        """Get entire XML content for each TXC object."""
-        timetables: List[TransXChangeDocument] = []
-        upload_file = txc_file_attrs[0].revision.upload_file
+    def iter_timetable_xml_files(
+        self, revision: DatasetRevision, filenames: List[str]
+    ) -> Iterator[Tuple[str, TransXChangeDocument]]:
+        """Parse the TXC files of a revision with the given filenames."""
+        upload_file = revision.upload_file
         if Path(upload_file.name).suffix == ".xml":
+            # An XML upload is a single TXC file
             with upload_file.open("rb") as fp:
-                timetables.append(TransXChangeDocument(fp))
+                yield filenames[0], TransXChangeDocument(fp)
         else:
             with ZipFile(upload_file) as zin:
-                txc_filenames = [txc.filename for txc in txc_file_attrs]
                 for filename in zin.namelist():
-                    if filename in txc_filenames:
+                    if filename in filenames:
                         with zin.open(filename, "r") as fp:
-                            timetables.append(TransXChangeDocument(fp))
+                            yield filename, TransXChangeDocument(fp)
+
+    def get_corresponding_timetable_xml_files(
+        self, txc_file_attrs: List[TXCFileAttributes]
+    ) -> List[TransXChangeDocument]:
+        """Get entire XML content for each TXC object."""
+        filenames = [txc.filename for txc in txc_file_attrs]
+        timetables: List[TransXChangeDocument] = [
+            txc_xml
+            for _, txc_xml in self.iter_timetable_xml_files(
+                txc_file_attrs[0].revision, filenames
+            )
+        ]
 
         logger.info(
             f"Found {len(timetables)} out of {len(txc_file_attrs)} TXC XML files"
         )
         return timetables
 
-    def filter_by_operating_period(
+    def get_journey_code(self, vehicle_journey: TransXChangeElement) -> Optional[str]:
+        try:
+            operational = vehicle_journey.get_element("Operational")
+            ticket_machine = operational.get_element("TicketMachine")
+            return ticket_machine.get_element("JourneyCode").text
+        except (NoElement, TooManyElements):
+            return None
+
+    def get_working_days_by_organisation(
+        self, txc_xml: TransXChangeDocument
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """Get the (StartDate, EndDate) of the WorkingDays of each
+        ServicedOrganisation in a timetable, keyed by OrganisationCode.
+        """
+        try:
+            service_orgs = txc_xml.get_serviced_organisations()
+        except NoElement:
+            service_orgs = []
+
+        working_days = defaultdict(list)
+        for org in service_orgs:
+            org_code = org.get_text_or_default("OrganisationCode")
+            working_days[org_code].extend(
+                (
+                    date_range.get_text_or_default("StartDate"),
+                    date_range.get_text_or_default("EndDate"),
+                )
+                for date_range in self.get_working_days(org)
+            )
+        return dict(working_days)
+
+    def index_vehicle_journey(
+        self,
+        vj: TxcVehicleJourney,
+        working_days_by_organisation: Dict[str, List[Tuple[str, str]]],
+        position: Optional[int] = None,
+    ) -> IndexedVehicleJourney:
+        """Resolve the days a vehicle journey operates on from its OperatingProfile
+        and ServicedOrganisation. NOTE: Bank Holidays not yet supported
+        """
+        days_of_week = []
+        operating_profile = self.get_operating_profile_for_journey(vj)
+        if operating_profile is not None and not operating_profile.find_anywhere(
+            "HolidaysOnly"
+        ):
+            profile_days_of_week = operating_profile.find_anywhere("DaysOfWeek")
+            if len(profile_days_of_week) > 0:
+                days_of_week = [
+                    day.value
+                    for day in DayOfWeek
+                    if profile_days_of_week[0].get_element_or_none(day.value)
+                    is not None
+                ]
+
+        days_of_non_operation = None
+        days_of_operation = None
+        service_org_ref = None
+        service_org_day_type = self.service_org_day_type(vj)
+        if service_org_day_type is not None:
+            days_of_non_operation = service_org_day_type.get_element_or_none(
+                "DaysOfNonOperation"
+            )
+            if days_of_non_operation is not None:
+                service_org_ref = self.get_service_org_ref(days_of_non_operation)
+
+            days_of_operation = service_org_day_type.get_element_or_none(
+                "DaysOfOperation"
+            )
+            if days_of_operation is not None:
+                service_org_ref = self.get_service_org_ref(days_of_operation)
+
+        working_days = None
+        if days_of_operation is not None or days_of_non_operation is not None:
+            # A missing ref, or a ref to a ServicedOrganisation missing from the
+            # file, has no working days, so it's never inside its operating range
+            working_days = (
+                working_days_by_organisation.get(service_org_ref, [])
+                if service_org_ref
+                else []
+            )
+
+        return IndexedVehicleJourney(
+            position=position,
+            sequence_number=vj.vehicle_journey.get("SequenceNumber"),
+            days_of_week=days_of_week,
+            days_of_operation=days_of_operation is not None,
+            days_of_non_operation=days_of_non_operation is not None,
+            working_days=working_days,
+        )
+
+    def index_timetable(
+        self,
+        txc_xml: TransXChangeDocument,
+        filename: str,
+        include_journeys: bool = True,
+    ) -> TimetableIndex:
+        """Index the vehicle journeys of a timetable by their
+        TicketMachine/JourneyCode.
+        """
+        operating_period_start = txc_xml.get_operating_period_start_date()
+        operating_period_end = txc_xml.get_operating_period_end_date()
+        service_codes = txc_xml.get_service_codes()
+        try:
+            revision_number = txc_xml.get_revision_number()
+        except XMLAttributeError:
+            revision_number = None
+
+        journeys = defaultdict(list)
+        if include_journeys:
+            try:
+                vehicle_journeys = txc_xml.get_vehicle_journeys()
+            except NoElement:
+                vehicle_journeys = []
+            working_days = self.get_working_days_by_organisation(txc_xml)
+            for position, vehicle_journey in enumerate(vehicle_journeys):
+                journey_code = self.get_journey_code(vehicle_journey)
+                if journey_code is None:
+                    continue
+                journeys[journey_code].append(
+                    self.index_vehicle_journey(
+                        TxcVehicleJourney(vehicle_journey, txc_xml),
+                        working_days,
+                        position,
+                    )
+                )
+
+        return TimetableIndex(
+            filename=filename,
+            file_name=txc_xml.get_file_name(),
+            revision_number=revision_number,
+            operating_period_start=(
+                operating_period_start[0].text or "" if operating_period_start else None
+            ),
+            operating_period_end=(
+                operating_period_end[0].text or "" if operating_period_end else None
+            ),
+            service_code=service_codes[0].text if service_codes else None,
+            journeys=dict(journeys),
+        )
+
+    def index_revision(self, revision: DatasetRevision) -> List[TimetableJourneyIndex]:
+        """Index the vehicle journeys of each TXC file in a revision that hasn't
+        already been indexed. Revisions are indexed when they are published, so the
+        files are parsed once rather than for every VehicleActivity checked.
+        """
+        txc_files = {
+            txc.filename: txc
+            for txc in revision.txc_file_attributes.filter(journey_index__isnull=True)
+        }
+        if not txc_files:
+            return []
+
+        indexes = [
+            TimetableJourneyIndex(
+                txc_file_attributes=txc_files[filename],
+                index=self.index_timetable(txc_xml, filename).dict(),
+            )
+            for filename, txc_xml in self.iter_timetable_xml_files(
+                revision, list(txc_files)
+            )
+        ]
+        TimetableJourneyIndex.objects.bulk_create(indexes, ignore_conflicts=True)
+        logger.info(
+            f"Indexed vehicle journeys of {len(indexes)} TXC files in revision "
+            f"{revision.id}"
+        )
+        return indexes
+
+    def get_timetable_indexes(
+        self, txc_file_attrs: List[TXCFileAttributes]
+    ) -> List[TimetableIndex]:
+        """Get the index of each TXC file, indexing the revision if it was published
+        before revisions were indexed.
+        """
+        unloaded = [txc for txc in txc_file_attrs if txc.id not in self._timetables]
+        if unloaded:
+            indexes = list(
+                TimetableJourneyIndex.objects.filter(txc_file_attributes__in=unloaded)
+            )
+            revision = unloaded[0].revision
+            if len(indexes) < len(unloaded) and revision.id not in self._indexed:
+                self._indexed.add(revision.id)
+                self.index_revision(revision)
+                indexes = list(
+                    TimetableJourneyIndex.objects.filter(
+                        txc_file_attributes__in=unloaded
+                    )
+                )
+            for index in indexes:
+                self._timetables[
+                    index.txc_file_attributes_id
+                ] = TimetableIndex.parse_obj(index.index)
+
+        timetables = [
+            self._timetables[txc.id]
+            for txc in txc_file_attrs
+            if txc.id in self._timetables
+        ]
+        logger.info(
+            f"Found {len(timetables)} out of {len(txc_file_attrs)} TXC XML files"
+        )
+        return timetables
+
+    def get_txc_vehicle_journey(
+        self, revision: DatasetRevision, match: JourneyMatch
+    ) -> TxcVehicleJourney:
+        """Get the XML of a vehicle journey found in the index, keeping the most
+        recently used timetables parsed.
+        """
+        key = (revision.id, match.timetable.filename)
+        txc_xml = self._documents.pop(key, None)
+        if txc_xml is None:
+            [(_, txc_xml)] = self.iter_timetable_xml_files(
+                revision, [match.timetable.filename]
+            )
+        self._documents[key] = txc_xml
+        while len(self._documents) > DOCUMENT_CACHE_SIZE:
+            self._documents.popitem(last=False)
+
+        vehicle_journey = txc_xml.get_vehicle_journeys()[match.journey.position]
+        return TxcVehicleJourney(vehicle_journey, txc_xml)
+
+    def get_journey_matches(
+        self, vehicle_journeys: List[TxcVehicleJourney]
+    ) -> List[JourneyMatch]:
+        """Index vehicle journeys that were found without the revision index."""
+        timetables = {}
+        working_days = {}
+        matches = []
+        for vj in vehicle_journeys:
+            key = id(vj.txc_xml)
+            if key not in timetables:
+                timetables[key] = self.index_timetable(
+                    vj.txc_xml, vj.txc_xml.name, include_journeys=False
+                )
+                working_days[key] = self.get_working_days_by_organisation(vj.txc_xml)
+            journey = self.index_vehicle_journey(vj, working_days[key])
+            matches.append(JourneyMatch(timetables[key], journey))
+        return matches
+
+    def retain(self, items: list, indexed: list, remaining: list) -> None:
+        """Remove the items whose index was filtered out of `remaining` in place."""
+        kept = {id(index) for index in remaining}
+        items[:] = [item for item, index in zip(items, indexed) if id(index) in kept]
+
+    def filter_timetables_by_operating_period(
         self,
         activity_date: datetime.date,
-        txc_xml: List[TransXChangeDocument],
+        timetables: List[TimetableIndex],
         result: ValidationResult,
     ) -> bool:
         """Filter list of timetable files down to those in which the VehicleActivity
         date is inside the Service-level OperatingPeriod. Returns the list in place
         with non-matching timetables removed.
         """
-        for idx in range(len(txc_xml) - 1, -1, -1):
-            operating_period_start = txc_xml[idx].get_operating_period_start_date()
+        for idx in range(len(timetables) - 1, -1, -1):
+            timetable = timetables[idx]
             error_msg = None
-            if not operating_period_start:
+            if timetable.operating_period_start is None:
                 error_msg = (
-                    f"Ignoring timetable {txc_xml[idx].get_file_name()} with no "
+                    f"Ignoring timetable {timetable.file_name} with no "
                     "OperatingPeriod"
                 )
                 result.add_error(ErrorCategory.GENERAL, error_msg)
@@ -194,28 +470,27 @@ class VehicleJourneyFinder:
             else:
                 try:
                     start_date = datetime.date.fromisoformat(
-                        operating_period_start[0].text
+                        timetable.operating_period_start
                     )
                 except ValueError:
                     error_msg = (
-                        f"Ignoring timetable {txc_xml[idx].get_file_name()} with "
+                        f"Ignoring timetable {timetable.file_name} with "
                         "incorrectly formatted OperatingPeriod.StartDate"
                     )
                     result.add_error(ErrorCategory.GENERAL, error_msg)
 
                 if error_msg is None:
-                    operating_period_end = txc_xml[idx].get_operating_period_end_date()
                     try:
                         end_date = (
                             None
-                            if not operating_period_end
+                            if timetable.operating_period_end is None
                             else datetime.date.fromisoformat(
-                                operating_period_end[0].text
+                                timetable.operating_period_end
                             )
                         )
                     except ValueError:
                         error_msg = (
-                            f"Ignoring timetable {txc_xml[idx].get_file_name()} with "
+                            f"Ignoring timetable {timetable.file_name} with "
                             "incorrectly formatted OperatingPeriod.EndDate"
                         )
                         result.add_error(ErrorCategory.GENERAL, error_msg)
@@ -227,15 +502,15 @@ class VehicleJourneyFinder:
 
                         end_date_str = "-" if end_date is None else str(end_date)
                         logger.debug(
-                            f"Filtering out timetable {txc_xml[idx].get_file_name()} "
+                            f"Filtering out timetable {timetable.file_name} "
                             f"with OperatingPeriod ({start_date} to {end_date_str})"
                         )
-            txc_xml.pop(idx)
+            timetables.pop(idx)
 
         logger.info(
-            f"Filtering by OperatingPeriod left {len(txc_xml)} timetable TXC " "files"
+            f"Filtering by OperatingPeriod left {len(timetables)} timetable TXC files"
         )
-        if len(txc_xml) == 0:
+        if len(timetables) == 0:
             result.add_error(
                 ErrorCategory.GENERAL,
                 "No timetables found with VehicleActivity date in OperatingPeriod",
@@ -244,6 +519,49 @@ class VehicleJourneyFinder:
 
         return True
 
+    def filter_by_operating_period(
+        self,
+        activity_date: datetime.date,
+        txc_xml: List[TransXChangeDocument],
+        result: ValidationResult,
+    ) -> bool:
+        timetables = [
+            self.index_timetable(timetable, timetable.name, include_journeys=False)
+            for timetable in txc_xml
+        ]
+        remaining = list(timetables)
+        matched = self.filter_timetables_by_operating_period(
+            activity_date, remaining, result
+        )
+        self.retain(txc_xml, timetables, remaining)
+        return matched
+
+    def find_journeys_by_journey_code(
+        self,
+        timetables: List[TimetableIndex],
+        vehicle_journey_ref: str,
+        result: ValidationResult,
+    ) -> List[JourneyMatch]:
+        """Find the journeys in the timetable indexes with a TicketMachine/JourneyCode
+        matching the passed vehicle journey ref.
+        """
+        matching_journeys = [
+            JourneyMatch(timetable, journey)
+            for timetable in timetables
+            for journey in timetable.get_journeys(vehicle_journey_ref)
+        ]
+        logger.info(
+            f"Filtering by JourneyCode gave {len(matching_journeys)} matching journeys"
+        )
+
+        if len(matching_journeys) == 0:
+            result.add_error(
+                ErrorCategory.GENERAL,
+                f"No vehicle journeys found with JourneyCode '{vehicle_journey_ref}'",
+            )
+
+        return matching_journeys
+
     def filter_by_journey_code(
         self,
         txc_xml: List[TransXChangeDocument],
@@ -265,13 +583,10 @@ class VehicleJourneyFinder:
                 f"Timetable {timetable} has {len(vehicle_journeys)} vehicle journeys"
             )
             for vehicle_journey in vehicle_journeys:
-                try:
-                    operational = vehicle_journey.get_element("Operational")
-                    ticket_machine = operational.get_element("TicketMachine")
-                    journey_code = ticket_machine.get_element("JourneyCode").text
-                    debug_journey_codes.append(journey_code)
-                except (NoElement, TooManyElements):
+                journey_code = self.get_journey_code(vehicle_journey)
+                if journey_code is None:
                     continue
+                debug_journey_codes.append(journey_code)
                 if journey_code == vehicle_journey_ref:
                     logger.debug(
                         f"Found TicketMachine/JourneyCode {journey_code} in timetable "
@@ -282,7 +597,7 @@ class VehicleJourneyFinder:
                     )
 
         logger.info(
-            f"Filtering by JourneyCode gave {len(vehicle_journeys)} matching journeys"
+            f"Filtering by JourneyCode gave {len(matching_journeys)} matching journeys"
         )
         logger.debug(
             f"In {len(txc_xml)} timetables, found JourneyCode's: {debug_journey_codes}"
@@ -305,55 +620,31 @@ class VehicleJourneyFinder:
             services = vj.txc_xml.get_services()
             if len(services) == 0:
                 return None
-            operating_profile = services[0].get_element("OperatingProfile")
+            operating_profile = services[0].get_element_or_none("OperatingProfile")
         except TooManyElements:
             return None
         return operating_profile
 
-    def filter_by_operating_profile(
+    def filter_journeys_by_operating_profile(
         self,
-        activity_date,
-        vehicle_journeys: List[TxcVehicleJourney],
+        activity_date: datetime.date,
+        vehicle_journeys: List[JourneyMatch],
         result: ValidationResult,
     ) -> bool:
         """Filter list of vehicle journeys down to those whose OperatingProfile applies
         to the VehiclActivity date. The OperatingProfile may be defined globally for
         the entire Service or individually for each VehicleJourney. Returns the list
         in place with inapplicable vehicle journeys removed.
-        NOTE: Bank Holidays not yet supported
         """
-        for vj in reversed(vehicle_journeys):
-            operating_profile: TransXChangeElement = (
-                self.get_operating_profile_for_journey(vj)
-            )
-            if operating_profile is None:
-                logger.debug(
-                    "Ignoring VehicleJourney with no operating profile: "
-                    f"{vj.vehicle_journey}"
-                )
-                vehicle_journeys.remove(vj)
-                continue
-            holidays_only = operating_profile.find_anywhere("HolidaysOnly")
-            if len(holidays_only) > 0:
-                logger.info("Ignoring OperatingProfile with HolidaysOnly")
-                vehicle_journeys.remove(vj)
-                continue
-            day_of_week = DayOfWeek.from_weekday_int(activity_date.weekday())
-            profile_days_of_week = operating_profile.find_anywhere("DaysOfWeek")
-            if len(profile_days_of_week) == 0:
-                logger.info("Ignoring OperatingProfile with no DaysOfWeek")
-                vehicle_journeys.remove(vj)
-                continue
-            specified_days = []
-            for day in DayOfWeek:
-                if profile_days_of_week[0].get_element_or_none(day.value) is not None:
-                    specified_days.append(day)
-            if day_of_week not in specified_days:
+        day_of_week = DayOfWeek.from_weekday_int(activity_date.weekday())
+        for idx in range(len(vehicle_journeys) - 1, -1, -1):
+            journey = vehicle_journeys[idx].journey
+            if day_of_week.value not in journey.days_of_week:
                 logger.debug(
                     "Ignoring VehicleJourney with operating profile inapplicable to "
-                    f"{day_of_week}"
+                    f"{day_of_week}: {journey.sequence_number}"
                 )
-                vehicle_journeys.remove(vj)
+                vehicle_journeys.pop(idx)
         logger.info(
             f"Filtering by OperatingProfile left {len(vehicle_journeys)} matching "
             "journeys"
@@ -369,29 +660,44 @@ class VehicleJourneyFinder:
 
         return True
 
-    def filter_by_revision_number(
-        self, vehicle_journeys: List[TxcVehicleJourney], result: ValidationResult
-    ):
+    def filter_by_operating_profile(
+        self,
+        activity_date,
+        vehicle_journeys: List[TxcVehicleJourney],
+        result: ValidationResult,
+    ) -> bool:
+        matches = self.get_journey_matches(vehicle_journeys)
+        remaining = list(matches)
+        matched = self.filter_journeys_by_operating_profile(
+            activity_date, remaining, result
+        )
+        self.retain(vehicle_journeys, matches, remaining)
+        return matched
+
+    def filter_journeys_by_revision_number(
+        self, vehicle_journeys: List[JourneyMatch], result: ValidationResult
+    ) -> bool:
         """Filter list of vehicle journeys by revision number of the including
         timetable. Only return vehicle journeys pertaining to the file with the highest
         revision number. If more than one file has the highest revision number, return
         journeys pertaining to all those files. Returns the list in place with journeys
         from lower revision files removed.
         """
-        highest_revision_number = -1
-        for vj in reversed(vehicle_journeys):
+        revision_numbers = []
+        for vj in vehicle_journeys:
             try:
-                revision_number = int(vj.txc_xml.get_revision_number())
-            except (ValueError, XMLAttributeError):
-                vehicle_journeys.remove(vj)
-                continue
-            if revision_number > highest_revision_number:
-                highest_revision_number = revision_number
+                revision_numbers.append(int(vj.timetable.revision_number))
+            except (TypeError, ValueError):
+                revision_numbers.append(None)
 
-        for vj in reversed(vehicle_journeys):
-            revision_number = int(vj.txc_xml.get_revision_number())
-            if revision_number < highest_revision_number:
-                vehicle_journeys.remove(vj)
+        highest_revision_number = max(
+            (number for number in revision_numbers if number is not None), default=-1
+        )
+        vehicle_journeys[:] = [
+            vj
+            for vj, number in zip(vehicle_journeys, revision_numbers)
+            if number == highest_revision_number
+        ]
 
         if len(vehicle_journeys) == 0:
             result.add_error(
@@ -402,6 +708,15 @@ class VehicleJourneyFinder:
 
         return True
 
+    def filter_by_revision_number(
+        self, vehicle_journeys: List[TxcVehicleJourney], result: ValidationResult
+    ):
+        matches = self.get_journey_matches(vehicle_journeys)
+        remaining = list(matches)
+        matched = self.filter_journeys_by_revision_number(remaining, result)
+        self.retain(vehicle_journeys, matches, remaining)
+        return matched
+
     def service_org_day_type(
         self, vj: TxcVehicleJourney
     ) -> Optional[TransXChangeElement]:
@@ -454,86 +769,55 @@ class VehicleJourneyFinder:
             return []
         return working_days
 
-    def filter_by_days_of_operation(
+    def filter_journeys_by_days_of_operation(
         self,
         recorded_at_time,
-        vehicle_journeys: List[TxcVehicleJourney],
+        vehicle_journeys: List[JourneyMatch],
         result: ValidationResult,
-    ):
-        for vj in reversed(vehicle_journeys):
-            days_of_non_operation = None
-            days_of_operation = None
-            service_org_ref = None
+    ) -> bool:
+        for idx in range(len(vehicle_journeys) - 1, -1, -1):
+            journey = vehicle_journeys[idx].journey
+            if journey.working_days is None:
+                continue
+
             inside_operating_range = False
             error_msg = None
+            for start_date, end_date in journey.working_days:
+                if not start_date:
+                    error_msg = (
+                        f"Ignoring vehicle journey with sequence number "
+                        f"{journey.sequence_number}, as Serviced organisation has "
+                        "no Start date"
+                    )
+                    result.add_error(ErrorCategory.GENERAL, error_msg)
+                    logger.info(error_msg)
+                    break
 
-            service_org_day_type = self.service_org_day_type(vj)
-            if service_org_day_type is not None:
-                days_of_non_operation: TransXChangeElement = (
-                    service_org_day_type.get_element_or_none("DaysOfNonOperation")
-                )
-                if days_of_non_operation is not None:
-                    service_org_ref = self.get_service_org_ref(days_of_non_operation)
+                if not end_date:
+                    error_msg = (
+                        f"Ignoring vehicle journey with sequence number "
+                        f"{journey.sequence_number}, as Serviced organisation has "
+                        "no End date"
+                    )
+                    result.add_error(ErrorCategory.GENERAL, error_msg)
+                    logger.info(error_msg)
+                    break
 
-                days_of_operation: TransXChangeElement = (
-                    service_org_day_type.get_element_or_none("DaysOfOperation")
-                )
-                if days_of_operation is not None:
-                    service_org_ref = self.get_service_org_ref(days_of_operation)
-
-            service_orgs = self.get_serviced_organisations(vj)
-            for org in service_orgs:
-                org_code = org.get_text_or_default("OrganisationCode")
-                if org_code == service_org_ref:
-                    working_days = self.get_working_days(org)
-                    for date_range in working_days:
-                        start_date = date_range.get_text_or_default("StartDate")
-                        if not start_date:
-                            vehicle_journey_seq_no = vj.vehicle_journey[
-                                "SequenceNumber"
-                            ]
-                            error_msg = (
-                                f"Ignoring vehicle journey with sequence number "
-                                f"{vehicle_journey_seq_no}, as Serviced organisation has no Start date"
-                            )
-                            result.add_error(ErrorCategory.GENERAL, error_msg)
-                            logger.info(error_msg)
-                            break
-
-                        end_date = date_range.get_text_or_default("EndDate")
-                        if not end_date:
-                            vehicle_journey_seq_no = vj.vehicle_journey[
-                                "SequenceNumber"
-                            ]
-                            error_msg = (
-                                f"Ignoring vehicle journey with sequence number "
-                                f"{vehicle_journey_seq_no}, as Serviced organisation has no End date"
-                            )
-                            result.add_error(ErrorCategory.GENERAL, error_msg)
-                            logger.info(error_msg)
-                            break
-
-                        start_date_formatted = datetime.datetime.strptime(
-                            start_date, "%Y-%m-%d"
-                        ).date()
-                        end_date_formatted = datetime.datetime.strptime(
-                            end_date, "%Y-%m-%d"
-                        ).date()
-
-                        if (
-                            start_date_formatted
-                            <= recorded_at_time
-                            <= end_date_formatted
-                        ):
-                            inside_operating_range = True
+                start_date_formatted = datetime.datetime.strptime(
+                    start_date, "%Y-%m-%d"
+                ).date()
+                end_date_formatted = datetime.datetime.strptime(
+                    end_date, "%Y-%m-%d"
+                ).date()
 
-                    if error_msg is None:
-                        if days_of_non_operation is not None and inside_operating_range:
-                            vehicle_journeys.remove(vj)
-                        elif (
-                            days_of_operation is not None and not inside_operating_range
-                        ):
-                            vehicle_journeys.remove(vj)
+                if start_date_formatted <= recorded_at_time <= end_date_formatted:
+                    inside_operating_range = True
+
+            if error_msg is None:
+                if journey.days_of_non_operation and inside_operating_range:
+                    vehicle_journeys.pop(idx)
+                elif journey.days_of_operation and not inside_operating_range:
+                    vehicle_journeys.pop(idx)
 
         if len(vehicle_journeys) == 0:
             result.add_error(
@@ -545,18 +829,25 @@ class VehicleJourneyFinder:
 
         return True
 
-    def filter_by_service_code(
-        self, vehicle_journeys: List[TxcVehicleJourney], result: ValidationResult
+    def filter_by_days_of_operation(
+        self,
+        recorded_at_time,
+        vehicle_journeys: List[TxcVehicleJourney],
+        result: ValidationResult,
     ):
-        txc_file_list = []
-        service_code_list = []
-        for vj in reversed(vehicle_journeys):
-            txc_file_list.append(vj.txc_xml.name)
-            service_code = self.get_service_code(vj)[0].text
-            service_code_list.append(service_code)
+        matches = self.get_journey_matches(vehicle_journeys)
+        remaining = list(matches)
+        matched = self.filter_journeys_by_days_of_operation(
+            recorded_at_time, remaining, result
+        )
+        self.retain(vehicle_journeys, matches, remaining)
+        return matched
 
-        txc_file_set = set(txc_file_list)
-        service_code_set = set(service_code_list)
+    def filter_journeys_by_service_code(
+        self, vehicle_journeys: List[JourneyMatch], result: ValidationResult
+    ) -> bool:
+        txc_file_set = {vj.timetable.filename for vj in vehicle_journeys}
+        service_code_set = {vj.timetable.service_code for vj in vehicle_journeys}
 
         if len(txc_file_set) == 1:
             result.add_error(
@@ -575,6 +866,12 @@ class VehicleJourneyFinder:
             return False
         return True
 
+    def filter_by_service_code(
+        self, vehicle_journeys: List[TxcVehicleJourney], result: ValidationResult
+    ):
+        matches = self.get_journey_matches(vehicle_journeys)
+        return self.filter_journeys_by_service_code(matches, result)
+
     def record_journey_match(
         self, result: ValidationResult, vehicle_journey_ref: str, vj: TxcVehicleJourney
     ):
@@ -615,7 +912,7 @@ class VehicleJourneyFinder:
         if not self.check_same_dataset(matching_txc_file_attrs, mvj, result):
             return None
 
-        txc_xml = self.get_corresponding_timetable_xml_files(matching_txc_file_attrs)
+        timetables = self.get_timetable_indexes(matching_txc_file_attrs)
 
         if (recorded_at_time := self.get_recorded_at_time(activity)) is None:
             result.add_error(
@@ -624,7 +921,9 @@ class VehicleJourneyFinder:
             )
             return None
 
-        if not self.filter_by_operating_period(recorded_at_time, txc_xml, result):
+        if not self.filter_timetables_by_operating_period(
+            recorded_at_time, timetables, result
+        ):
             return None
 
         if (vehicle_journey_ref := self.get_vehicle_journey_ref(mvj)) is None:
@@ -634,32 +933,34 @@ class VehicleJourneyFinder:
             )
             return None
 
-        vehicle_journeys = self.filter_by_journey_code(
-            txc_xml, vehicle_journey_ref, result
+        vehicle_journeys = self.find_journeys_by_journey_code(
+            timetables, vehicle_journey_ref, result
         )
         if not vehicle_journeys:
             return None
 
-        if not self.filter_by_operating_profile(
+        if not self.filter_journeys_by_operating_profile(
             recorded_at_time, vehicle_journeys, result
         ):
             return None
 
-        if not self.filter_by_revision_number(vehicle_journeys, result):
+        if not self.filter_journeys_by_revision_number(vehicle_journeys, result):
             return None
 
         if len(vehicle_journeys) > 1:
-            if not self.filter_by_days_of_operation(
+            if not self.filter_journeys_by_days_of_operation(
                 recorded_at_time, vehicle_journeys, result
             ):
                 return None
 
         if len(vehicle_journeys) > 1:
-            if not self.filter_by_service_code(vehicle_journeys, result):
+            if not self.filter_journeys_by_service_code(vehicle_journeys, result):
                 return None
 
         # If we get to this point, we've matched the SIRI-VM MonitoredVehicleJourney
         # to exactly one TXC VehicleJourney. Update result to record a match.
-        txc_vehicle_journey = vehicle_journeys[0]
+        txc_vehicle_journey = self.get_txc_vehicle_journey(
+            matching_txc_file_attrs[0].revision, vehicle_journeys[0]
+        )
         self.record_journey_match(result, vehicle_journey_ref, txc_vehicle_journey)
         return txc_vehicle_journey
@@ -0,0 +1,28 @@
+import logging
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from transit_odp.avl.tasks import task_index_timetable_journeys
+from transit_odp.organisation.constants import TimetableType
+from transit_odp.organisation.models import Dataset, DatasetRevision
+from transit_odp.organisation.signals import revision_publish
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(revision_publish)
+def index_timetable_journeys_handler(
+    sender: DatasetRevision, dataset: Dataset, **kwargs
+):
+    """
+    Listens on revision_publish and dispatches a Celery job to index the vehicle
+    journeys of a published timetable for the post publishing checks
+    """
+    if dataset.dataset_type != TimetableType:
+        return
+
+    logger.debug(
+        f"index_timetable_journeys_handler called for DatasetRevision {sender.id}"
+    )
+    transaction.on_commit(lambda: task_index_timetable_journeys.delay(sender.id))
@@ -40,6 +40,9 @@ from transit_odp.avl.notifications import (
     send_avl_schema_check_fail,
 )
 from transit_odp.avl.post_publishing_checks.daily.checker import PostPublishingChecker
+from transit_odp.avl.post_publishing_checks.daily.vehicle_journey_finder import (
+    VehicleJourneyFinder,
+)
 from transit_odp.avl.post_publishing_checks.weekly import WeeklyReport
 from transit_odp.avl.proxies import AVLDataset
 from transit_odp.avl.validation import get_validation_client
@@ -388,6 +391,15 @@ def task_daily_post_publishing_checks_all_feeds():
         )
 
 
+@shared_task(ignore_result=True)
+def task_index_timetable_journeys(revision_id: int) -> None:
+    """Index the vehicle journeys of a published timetable revision so the daily
+    post publishing checks don't parse its TXC files for every VehicleActivity.
+    """
+    revision = DatasetRevision.objects.get(id=revision_id)
+    VehicleJourneyFinder().index_revision(revision)
+
+
 @shared_task()
 def task_weekly_assimilate_post_publishing_check_reports(
     start_date: str = None,
@@ -1,10 +1,29 @@
+import copy
+import itertools
 import os
+import struct
+import tempfile
 import zipfile
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 from shutil import copyfileobj
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
 from django.core.files import File
 from django.utils import timezone
 
@@ -18,6 +37,18 @@ from transit_odp.pipelines.models import BulkDataArchive
 
 logger = get_task_logger(__name__)
 
+# Layout of a zip local file header, see section 4.3.7 of the zip APPNOTE
+LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
+LOCAL_FILE_HEADER_SIZE = 30
+DATA_DESCRIPTOR_FLAG = 0x08
+ZIP64_EXTRA_ID = 0x0001
+COPY_BUFFER_SIZE = 1024 * 1024
+# Upload files larger than this are spooled to disk while they wait to be zipped
+FETCH_SPOOL_SIZE = 8 * 1024 * 1024
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def get_datasets(dataset_type: DatasetType):
     """Returns all active datasets, i.e. status != expired."""
@@ -29,14 +60,21 @@ def get_datasets(dataset_type: DatasetType):
     )
 
 
-def get_datasets_by_region(region_code: str):
-    """Returns all published distinct datasets by region."""
+def get_datasets_with_regions():
+    """Returns all published timetable datasets with the traveline regions of
+    their live revision annotated as `traveline_regions`."""
     return (
         Dataset.objects.get_active_org()
-        .filter(live_revision__admin_areas__traveline_region_id=region_code)
         .filter(dataset_type=TimetableType)
         .get_only_active_datasets_bulk_archive()
-        .distinct("id")
+        .filter(live_revision__admin_areas__isnull=False)
+        .annotate(
+            traveline_regions=ArrayAgg(
+                "live_revision__admin_areas__traveline_region_id", distinct=True
+            )
+        )
+        .select_related("organisation", "live_revision")
+        .order_by("id")
     )
 
 
@@ -48,32 +86,281 @@ def get_outpath(dataset_type: DatasetType):
         return f"/tmp/bodds_archive_{now}.zip"
 
 
-def zip_datasets(datasets, outpath):
-    """Zips the uploaded data in `datasets` into the archive `outpath`"""
-    logger.info(
-        f"[bulk_data_archive] creating zip of {len(datasets)} datasets at {outpath}"
+def get_previous_archive(
+    dataset_type: DatasetType,
+    is_compliant: bool = False,
+    traveline_regions: str = "All",
+) -> Optional[BulkDataArchive]:
+    """Returns the latest archive of the same kind that has a manifest."""
+    return (
+        BulkDataArchive.objects.filter(
+            dataset_type=dataset_type,
+            compliant_archive=is_compliant,
+            traveline_regions=traveline_regions,
+        )
+        .exclude(manifest__isnull=True)
+        .first()
     )
+
+
+@contextmanager
+def open_previous_archive(
+    previous: Optional[BulkDataArchive],
+) -> Iterator[Tuple[Optional[zipfile.ZipFile], Dict[int, dict]]]:
+    """Opens the zip of `previous` and returns it with its manifest entries keyed
+    by dataset id. Returns no zip if there isn't a usable previous archive.
+    """
+    if previous is None or not previous.manifest:
+        yield None, {}
+        return
+
+    try:
+        fin = previous.data.open("rb")
+        zin = zipfile.ZipFile(fin)
+    except (OSError, zipfile.BadZipFile):
+        logger.warning(
+            f"[bulk_data_archive] could not open {previous}, archiving all datasets"
+        )
+        yield None, {}
+        return
+
+    with fin, zin:
+        yield zin, {member["dataset_id"]: member for member in previous.manifest}
+
+
+def strip_zip64_extra(extra: bytes) -> bytes:
+    """Removes the ZIP64 field from the extra data of a zip member, ZipInfo adds
+    the field again when the member needs it.
+    """
+    fields = []
+    while len(extra) >= 4:
+        header_id, size = struct.unpack("<HH", extra[:4])
+        if header_id != ZIP64_EXTRA_ID:
+            fields.append(extra[: 4 + size])
+        extra = extra[4 + size :]
+    return b"".join(fields)
+
+
+def copy_zip_member(
+    zin: zipfile.ZipFile, info: zipfile.ZipInfo, zout: zipfile.ZipFile
+) -> zipfile.ZipInfo:
+    """Copies the compressed data of the member `info` of `zin` into `zout`
+    without decompressing and compressing it again.
+    """
+    zin.fp.seek(info.header_offset)
+    header = zin.fp.read(LOCAL_FILE_HEADER_SIZE)
+    if header[:4] != LOCAL_FILE_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename!r}")
+    filename_length, extra_length = struct.unpack("<HH", header[26:30])
+    zin.fp.seek(filename_length + extra_length, os.SEEK_CUR)
+
+    copied = copy.copy(info)
+    # The CRC and sizes are known so they are written in the local file header
+    copied.flag_bits &= ~DATA_DESCRIPTOR_FLAG
+    copied.extra = strip_zip64_extra(info.extra)
+    copied.header_offset = zout.start_dir
+
+    # ZipFile has no public API for adding compressed data, so the member is
+    # written the same way ZipFile.write writes a member it has compressed.
+    zout.fp.seek(zout.start_dir)
+    zout.fp.write(copied.FileHeader())
+    remaining = info.compress_size
+    while remaining > 0:
+        data = zin.fp.read(min(remaining, COPY_BUFFER_SIZE))
+        if not data:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename!r}")
+        zout.fp.write(data)
+        remaining -= len(data)
+    zout.filelist.append(copied)
+    zout.NameToInfo[copied.filename] = copied
+    zout.start_dir = zout.fp.tell()
+    return copied
+
+
+def fetch_upload(upload) -> IO[bytes]:
+    """Reads the upload file `upload` from storage into a temporary file, small
+    files are kept in memory.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=FETCH_SPOOL_SIZE)
+    try:
+        with upload.open("rb") as fin:
+            copyfileobj(fin, spool, COPY_BUFFER_SIZE)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def prefetch(
+    items: Iterable[T], fetch: Callable[[T], R], workers: int, window: int
+) -> Iterator[Tuple[T, R]]:
+    """Calls `fetch` on each of `items` on a pool of `workers` threads and yields
+    the items with their result in the order of `items`.
+
+    At most `window` items are fetched ahead of the one being consumed, so the
+    memory used is bounded by the window rather than the number of items.
+    """
+    window = max(window, 1)
+    items = iter(items)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        try:
+            for item in itertools.islice(items, window):
+                pending.append((item, executor.submit(fetch, item)))
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for next_item in itertools.islice(items, 1):
+                    pending.append((next_item, executor.submit(fetch, next_item)))
+                yield item, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def get_previous_member(
+    zin: Optional[zipfile.ZipFile],
+    previous_members: Dict[int, dict],
+    dataset,
+    filename: str,
+) -> Optional[zipfile.ZipInfo]:
+    """Returns the member of the previous archive `zin` that holds the live
+    revision of `dataset`, None if the dataset has changed since.
+    """
+    member = previous_members.get(dataset.id)
+    if (
+        zin is None
+        or member is None
+        or member["revision_id"] != dataset.live_revision_id
+        or member["filename"] != filename
+    ):
+        return None
+
+    info = zin.NameToInfo.get(filename)
+    if info is None or info.header_offset != member["header_offset"]:
+        return None
+    return info
+
+
+def zip_datasets_by_archive(
+    datasets: Iterable[Tuple[Dataset, Iterable[str]]],
+    outpaths: Dict[str, str],
+    previous: Optional[Dict[str, Optional[BulkDataArchive]]] = None,
+    workers: Optional[int] = None,
+    window: Optional[int] = None,
+) -> Dict[str, List[dict]]:
+    """Zips the uploaded data of each of `datasets` into the archives it belongs
+    to, `datasets` are pairs of a dataset and the keys of its archives in
+    `outpaths`.
+
+    The upload file of a dataset is read from storage once however many archives
+    it is written to. Datasets whose live revision hasn't changed since the
+    `previous` archive of the same key are copied from that archive rather than
+    read again from storage. The other upload files are read from storage by
+    `workers` threads, up to `window` datasets ahead of the one being written.
+    Returns the manifest of each archive, the dataset, live revision and member
+    offset of each member.
+    """
+    if workers is None:
+        workers = settings.BULK_ARCHIVE_FETCH_WORKERS
+    if window is None:
+        window = settings.BULK_ARCHIVE_FETCH_WINDOW
+    previous = previous or {}
+
     # Get the name of the zip to use of the parent directory in the zip.
     orgs = defaultdict(list)
-    for dataset in datasets:
+    for dataset, keys in datasets:
         org = dataset.organisation
-        orgs[f"{org.short_name}_{org.id}"].append(dataset)
-
-    with zipfile.ZipFile(outpath, "w") as zf:
-        for directory_name, datasets in orgs.items():
-            for dataset in datasets:
+        orgs[f"{org.short_name}_{org.id}"].append((dataset, keys))
+
+    manifests = {key: [] for key in outpaths}
+    copied = 0
+    with ExitStack() as stack:
+        archives = {}
+        for key, outpath in outpaths.items():
+            logger.info(f"[bulk_data_archive] creating zip at {outpath}")
+            zin, previous_members = stack.enter_context(
+                open_previous_archive(previous.get(key))
+            )
+            zout = stack.enter_context(zipfile.ZipFile(outpath, "w"))
+            archives[key] = (zin, previous_members, zout)
+
+        # The members are planned up front so that only storage is accessed by
+        # the fetching threads, not the database.
+        plan = []
+        for directory_name, org_datasets in orgs.items():
+            for dataset, keys in org_datasets:
                 upload = dataset.live_revision.upload_file
-                # Open dataset upload file
-                with upload.open("rb") as fin:
-                    relative_path_upload_file = Path(directory_name, upload.name)
-                    # Write files into inner directory to keep all the files together
-                    # when the user unzips
-                    with zf.open(
-                        relative_path_upload_file.as_posix(),
-                        "w",
-                    ) as fout:
-                        # efficiently copy data from fin into fout
-                        copyfileobj(fin, fout)
+                # Write files into inner directory to keep all the files
+                # together when the user unzips
+                filename = Path(directory_name, upload.name).as_posix()
+                members = []
+                for key in keys:
+                    zin, previous_members, _ = archives[key]
+                    previous_info = get_previous_member(
+                        zin, previous_members, dataset, filename
+                    )
+                    members.append((key, previous_info))
+                plan.append((dataset, upload, filename, members))
+
+        def fetch(entry):
+            _, upload, _, members = entry
+            if all(previous_info is not None for _, previous_info in members):
+                return None
+            return fetch_upload(upload)
+
+        for entry, fetched in prefetch(plan, fetch, workers, window):
+            dataset, _, filename, members = entry
+            with ExitStack() as fetched_stack:
+                if fetched is not None:
+                    fetched_stack.enter_context(fetched)
+                for key, previous_info in members:
+                    zin, _, zout = archives[key]
+                    if previous_info is not None:
+                        info = copy_zip_member(zin, previous_info, zout)
+                        copied += 1
+                    else:
+                        fetched.seek(0)
+                        with zout.open(filename, "w") as fout:
+                            # efficiently copy data from fetched into fout
+                            copyfileobj(fetched, fout, COPY_BUFFER_SIZE)
+                        info = zout.filelist[-1]
+
+                    manifests[key].append(
+                        {
+                            "dataset_id": dataset.id,
+                            "revision_id": dataset.live_revision_id,
+                            "filename": filename,
+                            "header_offset": info.header_offset,
+                        }
+                    )
+
+    logger.info(
+        f"[bulk_data_archive] zipped {len(plan)} datasets into {len(outpaths)} "
+        f"archives, copied {copied} unchanged members from previous archives"
+    )
+    return manifests
+
+
+def zip_datasets(
+    datasets,
+    outpath,
+    previous: Optional[BulkDataArchive] = None,
+    workers: Optional[int] = None,
+    window: Optional[int] = None,
+) -> List[dict]:
+    """Zips the uploaded data in `datasets` into the archive `outpath`, see
+    `zip_datasets_by_archive`. Returns the manifest of the archive.
+    """
+    manifests = zip_datasets_by_archive(
+        [(dataset, [outpath]) for dataset in datasets],
+        {outpath: outpath},
+        {outpath: previous},
+        workers=workers,
+        window=window,
+    )
+    return manifests[outpath]
 
 
 def upload_bulk_data_archive(
@@ -81,6 +368,7 @@ def upload_bulk_data_archive(
     dataset_type: DatasetType,
     is_compliant: bool = False,
     traveline_regions: str = "All",
+    manifest: Optional[List[dict]] = None,
 ):
     """Saves the zip file at `outpath` to the BulkDataArchive model and uploads the
     zip to the MEDIA_ROOT"""
@@ -91,6 +379,7 @@ def upload_bulk_data_archive(
             dataset_type=dataset_type,
             compliant_archive=is_compliant,
             traveline_regions=traveline_regions,
+            manifest=manifest,
         )
     return archive
 
@@ -108,10 +397,13 @@ def create_timetable_archive():
     output = get_outpath(dataset_type=dataset_type)
 
     # Write copy each dataset's upload_file into the zip
-    zip_datasets(timetable_datasets, output)
+    previous = get_previous_archive(dataset_type=dataset_type)
+    manifest = zip_datasets(timetable_datasets, output, previous)
 
     # Create BulkDataArchive
-    timetable_archive = upload_bulk_data_archive(output, dataset_type=dataset_type)
+    timetable_archive = upload_bulk_data_archive(
+        output, dataset_type=dataset_type, manifest=manifest
+    )
 
     logger.info(f"[bulk_data_archive] created for timetables: {timetable_archive}")
 
@@ -129,36 +421,60 @@ def create_fares_archive():
     output = get_outpath(dataset_type=dataset_type)
 
     # Write copy each dataset's upload_file into the zip
-    zip_datasets(fares_datasets, output)
+    previous = get_previous_archive(dataset_type=dataset_type)
+    manifest = zip_datasets(fares_datasets, output, previous)
 
     # Create BulkDataArchive
-    fares_archive = upload_bulk_data_archive(output, dataset_type=dataset_type)
+    fares_archive = upload_bulk_data_archive(
+        output, dataset_type=dataset_type, manifest=manifest
+    )
 
     logger.info(f"[bulk_data_archive] created for fares: {fares_archive}")
 
 
-def create_region_archive(region_code):
+def create_region_archives():
     logger.info("[bulk_data_archive] processing Timetables data by region")
 
     dataset_type = TimetableType
-
-    # Get active datasets
-    timetables_datasets = get_datasets_by_region(region_code)
-
-    # Get local path to create zip file
-    output = get_outpath(dataset_type=dataset_type)
-
-    # Write copy each dataset's upload_file into the zip
-    zip_datasets(timetables_datasets, output)
-
-    # Create BulkDataArchive
-    timetables_archive = upload_bulk_data_archive(
-        output, dataset_type=dataset_type, traveline_regions=region_code
-    )
-
-    logger.info(
-        f"[bulk_data_archive] created {timetables_archive} for the region {region_code}"
-    )
+    region_codes = [t.value for t in TravelineRegions if t != TravelineRegions.ALL]
+
+    # Get active datasets with the regions of each of them
+    timetables_datasets = [
+        (dataset, [code for code in dataset.traveline_regions if code in region_codes])
+        for dataset in get_datasets_with_regions()
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Get local paths to create the zip files, each region has a directory so
+        # the archives keep the name of the zip
+        filename = os.path.basename(get_outpath(dataset_type=dataset_type))
+        outpaths = {}
+        for region_code in region_codes:
+            directory = Path(tmp, region_code)
+            directory.mkdir()
+            outpaths[region_code] = str(directory / filename)
+
+        # Write copy each dataset's upload_file into the zip of each of its regions
+        previous = {
+            region_code: get_previous_archive(
+                dataset_type=dataset_type, traveline_regions=region_code
+            )
+            for region_code in region_codes
+        }
+        manifests = zip_datasets_by_archive(timetables_datasets, outpaths, previous)
+
+        # Create BulkDataArchives
+        for region_code in region_codes:
+            timetables_archive = upload_bulk_data_archive(
+                outpaths[region_code],
+                dataset_type=dataset_type,
+                traveline_regions=region_code,
+                manifest=manifests[region_code],
+            )
+            logger.info(
+                f"[bulk_data_archive] created {timetables_archive} "
+                f"for the region {region_code}"
+            )
 
 
 def run():
@@ -172,6 +488,4 @@ def run():
 
     create_fares_archive()
 
-    for t in TravelineRegions:
-        if t != TravelineRegions.ALL:
-            create_region_archive(t.value)
+    create_region_archives()
@@ -0,0 +1,122 @@
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from transit_odp.browse.data_archive.bulk_data_archive import zip_datasets
+
+SAMPLE_FILE = (
+    Path(__file__).parents[3] / "timetables" / "tests" / "data" / "ea_20-1A-A-y08-1.xml"
+).as_posix()
+
+
+class LatencyStorage(FileSystemStorage):
+    """A local stand-in for S3 that waits `latency` seconds before each file
+    is opened."""
+
+    def __init__(self, latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+
+    def _open(self, name, mode="rb"):
+        time.sleep(self.latency)
+        return super()._open(name, mode)
+
+
+class StoredUpload:
+    """The parts of a FieldFile used when archiving an upload file."""
+
+    def __init__(self, storage, name: str):
+        self.storage = storage
+        self.name = name
+
+    def open(self, mode="rb"):
+        return self.storage.open(self.name, mode)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks prefetching upload files from storage into a bulk archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--datasets", type=int, default=5000, help="Number of datasets to zip"
+        )
+        parser.add_argument(
+            "--organisations", type=int, default=100, help="Number of organisations"
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.01,
+            help="Seconds to wait before each upload file is opened",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 4, 8, 16],
+            help="Number of fetching threads to benchmark",
+        )
+        parser.add_argument(
+            "--window",
+            type=int,
+            default=None,
+            help="Number of files read ahead, twice the workers by default",
+        )
+        parser.add_argument(
+            "--source", default=SAMPLE_FILE, help="TransXChange file to copy"
+        )
+
+    def handle(self, *args, **options):
+        content = Path(options["source"]).read_bytes()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            (directory / "storage").mkdir()
+            storage = LatencyStorage(
+                options["latency"], location=str(directory / "storage")
+            )
+            organisations = [
+                SimpleNamespace(id=index, short_name=f"Operator{index}")
+                for index in range(options["organisations"])
+            ]
+            datasets = []
+            for index in range(options["datasets"]):
+                name = f"upload_{index}.xml"
+                (directory / "storage" / name).write_bytes(content)
+                revision = SimpleNamespace(
+                    id=index, upload_file=StoredUpload(storage, name)
+                )
+                datasets.append(
+                    SimpleNamespace(
+                        id=index,
+                        organisation=organisations[index % len(organisations)],
+                        live_revision_id=revision.id,
+                        live_revision=revision,
+                    )
+                )
+            self.stdout.write(
+                f"Zipping {len(datasets)} datasets with "
+                f"{options['latency'] * 1000:.0f}ms storage latency."
+            )
+
+            baseline = None
+            for workers in options["workers"]:
+                window = options["window"] or 2 * workers
+                outpath = directory / f"archive_{workers}.zip"
+                start = time.perf_counter()
+                manifest = zip_datasets(
+                    datasets, outpath, workers=workers, window=window
+                )
+                duration = time.perf_counter() - start
+                baseline = baseline or duration
+                self.stdout.write(
+                    f"{workers} workers, window {window}: {duration:.2f}s "
+                    f"({baseline / duration:.2f}x), "
+                    f"{len(datasets) / duration:.0f} datasets/s, "
+                    f"{len(manifest)} members"
+                )
+                outpath.unlink()
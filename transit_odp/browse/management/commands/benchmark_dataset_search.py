@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from transit_odp.organisation.models import Dataset
+from transit_odp.organisation.search import API_SEARCH_WEIGHTS, get_search_query
+
+
+def icontains_search(qs, keywords):
+    """The search of the API before the search vector."""
+    return qs.filter(
+        Q(live_revision__name__icontains=keywords)
+        | Q(live_revision__description__icontains=keywords)
+        | Q(organisation_name__icontains=keywords)
+        | Q(live_revision__admin_areas__name__icontains=keywords)
+    ).distinct()
+
+
+def vector_search(qs, keywords):
+    query = get_search_query(keywords, API_SEARCH_WEIGHTS)
+    return qs.filter(
+        Q(live_revision__search_vector=query) | Q(organisation_name__icontains=keywords)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks searching published datasets with icontains lookups and with "
+        "the search vector, against the datasets in the database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "keywords",
+            nargs="*",
+            default=["London", "Bus Station", "Leeds", "school"],
+            help="Keywords to search",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=10, help="Number of runs of each search"
+        )
+
+    def handle(self, *args, **options):
+        qs = Dataset.objects.get_published().add_organisation_name()
+        self.stdout.write(f"Searching {qs.count()} published datasets.")
+
+        for keywords in options["keywords"]:
+            if get_search_query(keywords, API_SEARCH_WEIGHTS) is None:
+                self.stdout.write(f"Skipping {keywords!r}, it has no words.")
+                continue
+            results = {}
+            for name, search in (
+                ("icontains", icontains_search),
+                ("search vector", vector_search),
+            ):
+                start = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    ids = list(search(qs, keywords).values_list("id", flat=True))
+                duration = (time.perf_counter() - start) / options["repeat"]
+                results[name] = (duration, len(set(ids)))
+
+            (slow, slow_count), (fast, fast_count) = results.values()
+            self.stdout.write(
+                f"{keywords!r}: icontains {slow * 1000:.1f}ms ({slow_count} "
+                f"datasets), search vector {fast * 1000:.1f}ms ({fast_count} "
+                f"datasets), {slow / fast:.1f}x"
+            )
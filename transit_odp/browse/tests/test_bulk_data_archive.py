@@ -7,8 +7,14 @@ from django.test import override_settings
 from django.utils import timezone
 
 from transit_odp.browse.data_archive import bulk_data_archive
+from transit_odp.naptan.factories import AdminAreaFactory
 from transit_odp.organisation.constants import DatasetType
-from transit_odp.organisation.factories import DatasetFactory, OrganisationFactory
+from transit_odp.organisation.factories import (
+    DatasetFactory,
+    DatasetRevisionFactory,
+    OrganisationFactory,
+)
+from transit_odp.organisation.models import Dataset
 from transit_odp.pipelines.models import BulkDataArchive
 
 pytestmark = pytest.mark.django_db
@@ -95,6 +101,111 @@ def test_zip_fares_datasets(tmp_path):
                     assert zipped.read() == orig.read()
 
 
+def test_zip_datasets_copies_unchanged_datasets(tmp_path):
+    """Tests zip_datasets copies datasets with the same live revision from the
+    previous archive"""
+    # Setup
+    dataset_ids = [
+        dataset.id
+        for dataset in DatasetFactory.create_batch(
+            3, live_revision__upload_file__data=b"Test data"
+        )
+    ]
+    datasets = Dataset.objects.filter(id__in=dataset_ids).order_by("id")
+    outpath = str(tmp_path / "previous.zip")
+    manifest = bulk_data_archive.zip_datasets(list(datasets), outpath)
+    previous = bulk_data_archive.upload_bulk_data_archive(
+        outpath, dataset_type=DatasetType.TIMETABLE.value, manifest=manifest
+    )
+
+    # Publish a new revision of the first dataset and remove the upload files of
+    # the others, so they can only be copied from the previous archive
+    DatasetRevisionFactory(dataset=datasets[0], upload_file__data=b"New data")
+    for dataset in datasets[1:]:
+        upload = dataset.live_revision.upload_file
+        upload.storage.delete(upload.name)
+
+    # Test
+    outpath = str(tmp_path / "bulk.zip")
+    datasets = list(Dataset.objects.filter(id__in=dataset_ids).order_by("id"))
+    manifest = bulk_data_archive.zip_datasets(datasets, outpath, previous)
+
+    # Assert
+    assert [member["revision_id"] for member in manifest] == [
+        dataset.live_revision_id for dataset in datasets
+    ]
+    with zipfile.ZipFile(outpath, "r") as zf:
+        assert zf.testzip() is None
+        assert zf.read(manifest[0]["filename"]) == b"New data"
+        for member in manifest[1:]:
+            assert zf.read(member["filename"]) == b"Test data"
+            assert zf.getinfo(member["filename"]).header_offset == (
+                member["header_offset"]
+            )
+
+
+def test_zip_datasets_prefetch_keeps_order(tmp_path):
+    """Tests zip_datasets writes the datasets in the same order whether or not
+    the upload files are fetched in parallel"""
+    # Setup
+    datasets = [
+        DatasetFactory(live_revision__upload_file__data=f"Data {index}".encode())
+        for index in range(10)
+    ]
+
+    # Test
+    sequential = bulk_data_archive.zip_datasets(
+        datasets, str(tmp_path / "sequential.zip"), workers=1, window=1
+    )
+    outpath = str(tmp_path / "parallel.zip")
+    parallel = bulk_data_archive.zip_datasets(datasets, outpath, workers=4, window=3)
+
+    # Assert
+    assert parallel == sequential
+    with zipfile.ZipFile(outpath, "r") as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == [member["filename"] for member in parallel]
+        for dataset, member in zip(datasets, parallel):
+            with dataset.live_revision.upload_file.open("rb") as orig:
+                assert zf.read(member["filename"]) == orig.read()
+
+
+def test_create_region_archives(mocker):
+    """Tests create_region_archives reads the upload file of a dataset once and
+    writes it into the archive of each of its regions"""
+    # Setup
+    east_anglia = AdminAreaFactory(traveline_region_id="EA")
+    london = AdminAreaFactory(traveline_region_id="L")
+    both = DatasetFactory(
+        live_revision__upload_file__data=b"Both",
+        live_revision__admin_areas=(east_anglia, london),
+    )
+    only_london = DatasetFactory(
+        live_revision__upload_file__data=b"London",
+        live_revision__admin_areas=(london,),
+    )
+    fetch_upload = mocker.spy(bulk_data_archive, "fetch_upload")
+
+    # Test
+    bulk_data_archive.create_region_archives()
+
+    # Assert
+    assert fetch_upload.call_count == 2
+    expected = {"EA": [both], "L": [both, only_london], "W": []}
+    for region_code, datasets in expected.items():
+        archive = BulkDataArchive.objects.get(traveline_regions=region_code)
+        assert [member["dataset_id"] for member in archive.manifest] == [
+            dataset.id for dataset in datasets
+        ]
+        with zipfile.ZipFile(archive.data, "r") as zf:
+            assert zf.testzip() is None
+            assert len(zf.namelist()) == len(datasets)
+            for member in archive.manifest:
+                assert zf.getinfo(member["filename"]).header_offset == (
+                    member["header_offset"]
+                )
+
+
 def test_bulk_archive_creates_more_then_3_files():
     """
     Tests upload_bulk_data_archive creates 3 archive files - Timetable, compliant
@@ -6,7 +6,7 @@ from django.db.models.expressions import datetime
 from freezegun import freeze_time
 
 from transit_odp.browse.lta_column_headers import header_accessor_data
-from transit_odp.browse.views.local_authority import LTACSV
+from transit_odp.browse.views.local_authority import LTACSV, get_all_otc_map_lta
 from transit_odp.organisation.factories import DatasetFactory
 from transit_odp.organisation.factories import LicenceFactory as BODSLicenceFactory
 from transit_odp.organisation.factories import (
@@ -21,6 +21,11 @@ from transit_odp.otc.factories import (
     LocalAuthorityFactory,
     ServiceModelFactory,
 )
+from transit_odp.otc.models import ServiceStaleness
+from transit_odp.publish.requires_attention import (
+    get_requires_attention_data_lta,
+    refresh_service_staleness,
+)
 
 pytestmark = pytest.mark.django_db
 FAKER = faker.Faker()
@@ -114,6 +119,7 @@ def test_lta_queryset():
         (licence_number2, registration_number3),
     ]
 
+    refresh_service_staleness()
     lta_codes_csv = LTACSV([local_authority_1])
     queryset = lta_codes_csv.get_queryset()
 
@@ -196,6 +202,7 @@ def test_combined_authority_lta_queryset():
         (licence_number3, registration_number5),
     ]
 
+    refresh_service_staleness()
     lta_codes_csv = LTACSV([local_authority_1, local_authority_2])
     queryset = lta_codes_csv.get_queryset()
 
@@ -477,6 +484,7 @@ def test_lta_csv_output():
         id="1", name="first_LTA", registration_numbers=services_list_1
     )
 
+    refresh_service_staleness()
     lta_codes_csv = LTACSV([local_authority_1])
     csv_string = lta_codes_csv.to_string()
     csv_output = get_csv_output(csv_string)
@@ -860,6 +868,7 @@ def test_lta_csv_output_unpublished_status_no_organisation_name():
         id="1", name="first_LTA", registration_numbers=services_list_1
     )
 
+    refresh_service_staleness()
     lta_codes_csv = LTACSV([local_authority_1])
     csv_string = lta_codes_csv.to_string()
     csv_output = get_csv_output(csv_string)
@@ -990,6 +999,7 @@ def test_seasonal_status_lta_csv_output():
         id="1", name="first_LTA", registration_numbers=services_list_1
     )
 
+    refresh_service_staleness()
     lta_codes_csv = LTACSV([local_authority_1])
     csv_string = lta_codes_csv.to_string()
     csv_output = get_csv_output(csv_string)
@@ -1137,3 +1147,51 @@ def test_seasonal_status_lta_csv_output():
     assert csv_output["row3"][23] == '"PD0001111"'  # OTC:Licence Number
     assert csv_output["row3"][24] == '"PD0001111:3"'  # OTC:Registration Number
     assert csv_output["row3"][25] == '"Line3"'  # OTC Service Number
+
+
+@freeze_time("2023-02-28")
+def test_lta_service_without_staleness_requires_attention():
+    licence_number = "PD0000099"
+    service_code = f"{licence_number}:1"
+    org1 = OrganisationFactory(name="test_org_1")
+    BODSLicenceFactory(organisation=org1, number=licence_number)
+    otc_lic = LicenceModelFactory(number=licence_number)
+    # Two OTC Services of the same registration, so the live timetable is still
+    # found when one of them hasn't been evaluated
+    services = [
+        ServiceModelFactory(
+            licence=otc_lic,
+            registration_number=service_code,
+            service_number="Line1",
+            effective_date=datetime.datetime(2022, 6, 24),
+        )
+        for _ in range(2)
+    ]
+    dataset = DatasetFactory(organisation=org1)
+    TXCFileAttributesFactory(
+        revision=dataset.live_revision,
+        licence_number=licence_number,
+        service_code=service_code,
+        operating_period_start_date=datetime.datetime(2022, 6, 24),
+        operating_period_end_date=None,
+        modification_datetime=datetime.datetime(2023, 2, 1),
+    )
+    lta_list = [
+        LocalAuthorityFactory(id="1", name="first_LTA", registration_numbers=services)
+    ]
+
+    refresh_service_staleness()
+    csv_output = get_csv_output(LTACSV(lta_list).to_string())
+    assert csv_output["row0"][2] == '"No"'  # Requires Attention
+    assert get_requires_attention_data_lta(lta_list) == 0
+
+    service = get_all_otc_map_lta(lta_list)[service_code]
+    ServiceStaleness.objects.filter(service=service).delete()
+    csv_output = get_csv_output(LTACSV(lta_list).to_string())
+    assert csv_output["row0"][2] == '"Yes"'  # Requires Attention
+    assert csv_output["row0"][3] == '"Published"'  # Published Status
+
+    ServiceStaleness.objects.filter(service__in=services).delete()
+    csv_output = get_csv_output(LTACSV(lta_list).to_string())
+    assert csv_output["row0"][2] == '"Yes"'  # Requires Attention
+    assert get_requires_attention_data_lta(lta_list) == 1
@@ -67,6 +67,7 @@ from transit_odp.pipelines.factories import (
     ChangeDataArchiveFactory,
     DatasetETLTaskResultFactory,
 )
+from transit_odp.publish.requires_attention import refresh_service_staleness
 from transit_odp.site_admin.models import ResourceRequestCounter
 from transit_odp.users.factories import (
     AgentUserFactory,
@@ -947,6 +948,7 @@ class TestOperatorDetailView:
         request = request_factory.get("/operators/")
         request.user = UserFactory()
 
+        refresh_service_staleness()
         response = OperatorDetailView.as_view()(request, pk=org.id)
         assert response.status_code == 200
         context = response.context_data
@@ -1019,6 +1021,7 @@ class TestOperatorDetailView:
                 effective_date=datetime.date(year=2020, month=1, day=1),
             )
 
+        refresh_service_staleness()
         response = OperatorDetailView.as_view()(request, pk=org.id)
         assert response.status_code == 200
         context = response.context_data
@@ -1279,6 +1282,7 @@ class TestLTADetailView:
         request = request_factory.get(url)
         request.user = UserFactory()
 
+        refresh_service_staleness()
         response = LocalAuthorityDetailView.as_view()(request, pk=local_authority.id)
         assert response.status_code == 200
         context = response.context_data
@@ -1363,6 +1367,7 @@ class TestLTADetailView:
             registration_numbers=service,
         )
 
+        refresh_service_staleness()
         response = LocalAuthorityDetailView.as_view()(request, pk=local_authority.id)
         assert response.status_code == 200
         context = response.context_data
@@ -3,7 +3,7 @@ from typing import Dict, Optional
 
 from django.db.models import Subquery
 from django.db.models.functions import Trim
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.views import View
 
 from transit_odp.browse.views.base_views import BaseListView
@@ -14,10 +14,10 @@ from transit_odp.organisation.models.data import SeasonalService, ServiceCodeExe
 from transit_odp.otc.models import LocalAuthority
 from transit_odp.otc.models import Service as OTCService
 from transit_odp.publish.requires_attention import (
-    evaluate_staleness,
     get_requires_attention_data_lta,
+    get_staleness_map_lta,
     get_txc_map_lta,
-    is_stale,
+    requires_attention,
 )
 
 from datetime import timedelta
@@ -148,43 +148,34 @@ class LocalAuthorityView(BaseListView):
                 ids_list[lta.ui_lta_name_trimmed].append(lta.id)
 
         for lta_id_list in ids_list.values():
-            for lta in all_ltas_current_page:
-                if lta.id in lta_id_list:
-                    setattr(lta, "auth_ids", lta_id_list)
-
-                    lta_list = [x for x in all_ltas_current_page if x.id in lta_id_list]
-                    otc_qs = OTCService.objects.get_in_scope_in_season_lta_services(
-                        lta_list
-                    )
-                    if otc_qs:
-                        context["total_in_scope_in_season_services"] = otc_qs
-                    else:
-                        context["total_in_scope_in_season_services"] = 0
-                    requires_attention_data_qs = get_requires_attention_data_lta(
-                        lta_list
-                    )
-                    if requires_attention_data_qs:
-                        context[
-                            "total_services_requiring_attention"
-                        ] = requires_attention_data_qs
-                    else:
-                        context["total_services_requiring_attention"] = 0
-
-                    try:
-                        context["services_require_attention_percentage"] = round(
-                            100
-                            * (
-                                context["total_services_requiring_attention"]
-                                / context["total_in_scope_in_season_services"]
-                            )
-                        )
-                    except ZeroDivisionError:
-                        context["services_require_attention_percentage"] = 0
-                    setattr(
-                        lta,
-                        "services_require_attention_percentage",
-                        context["services_require_attention_percentage"],
+            lta_list = [x for x in all_ltas_current_page if x.id in lta_id_list]
+            otc_qs = OTCService.objects.get_in_scope_in_season_lta_services(lta_list)
+            if otc_qs:
+                context["total_in_scope_in_season_services"] = otc_qs
+            else:
+                context["total_in_scope_in_season_services"] = 0
+            context[
+                "total_services_requiring_attention"
+            ] = get_requires_attention_data_lta(lta_list)
+
+            try:
+                context["services_require_attention_percentage"] = round(
+                    100
+                    * (
+                        context["total_services_requiring_attention"]
+                        / context["total_in_scope_in_season_services"]
                     )
+                )
+            except ZeroDivisionError:
+                context["services_require_attention_percentage"] = 0
+
+            for lta in lta_list:
+                setattr(lta, "auth_ids", lta_id_list)
+                setattr(
+                    lta,
+                    "services_require_attention_percentage",
+                    context["services_require_attention_percentage"],
+                )
 
         names = []
         name_set = set()
@@ -293,8 +284,7 @@ class LocalAuthorityExportView(View):
             f"{updated_ui_lta_name}_detailed service code export detailed export.csv"
         )
         csv_export = LTACSV(lta_objs)
-        file_ = csv_export.to_string()
-        response = HttpResponse(file_, content_type="text/csv")
+        response = StreamingHttpResponse(csv_export.stream(), content_type="text/csv")
         response["Content-Disposition"] = f"attachment; filename={csv_filename}"
         return response
 
@@ -382,6 +372,7 @@ class LTACSV(CSVBuilder):
         """
         otc_map = get_all_otc_map_lta(lta_list)
         txcfa_map = get_txc_map_lta(lta_list)
+        staleness_map = get_staleness_map_lta(lta_list)
         seasonal_service_map = get_seasonal_service_map(lta_list)
         service_code_exemption_map = get_service_code_exemption_map(lta_list)
         services_code = set(otc_map)
@@ -392,15 +383,13 @@ class LTACSV(CSVBuilder):
             file_attribute = txcfa_map.get(service_code)
             seasonal_service = seasonal_service_map.get(service_code)
             exemption = service_code_exemption_map.get(service_code)
+            staleness = staleness_map.get(service.id)
 
             staleness_status = "Up to date"
-            if file_attribute is None:
-                require_attention = self._get_require_attention(
-                    exemption, seasonal_service
-                )
-            elif service and is_stale(service, file_attribute):
-                rad = evaluate_staleness(service, file_attribute)
-                staleness_status = STALENESS_STATUS[rad.index(True)]
+            if file_attribute is None or requires_attention(staleness):
+                if staleness and staleness.is_stale:
+                    rad = staleness.get_staleness()
+                    staleness_status = STALENESS_STATUS[rad.index(True)]
                 require_attention = self._get_require_attention(
                     exemption, seasonal_service
                 )
@@ -3,9 +3,10 @@ import io
 import logging
 import os
 import tempfile
+import zipfile
 from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Union
+from typing import Iterator, Union
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,8 @@ class CSVColumn:
 class CSVBuilder:
     columns = None
     queryset = None
+    # Number of rows fetched from the database and yielded at a time
+    chunk_size = 2000
 
     def count(self):
         if self.queryset is None:
@@ -43,36 +46,69 @@ class CSVBuilder:
 
         return values
 
-    def to_string(self):
+    def _iter_objects(self):
+        # QuerySet.iterator ignores prefetch_related before Django 4.1, so
+        # querysets that prefetch are evaluated as before
+        if hasattr(self.queryset, "iterator") and not getattr(
+            self.queryset, "_prefetch_related_lookups", ()
+        ):
+            return self.queryset.iterator(chunk_size=self.chunk_size)
+        return iter(self.queryset)
+
+    def stream(self) -> Iterator[str]:
         """
-        Creates a string representation of a Django model.
+        Yields the csv in chunks of `chunk_size` rows, the queryset is read with
+        a server side cursor so only one chunk is held in memory.
         """
-
         if self.queryset is None:
             self.queryset = self.get_queryset()
 
         classname = self.__class__.__name__
-        prefix = f"CSVExporter - to_string - {classname} - "
+        prefix = f"CSVExporter - stream - {classname} - "
         headers = [column.header for column in self.columns]
 
-        rows = [self._create_row(q) for q in self.queryset]
-        row_count = len(rows)
         csvfile = io.StringIO()
         writer = csv.writer(csvfile, quoting=csv.QUOTE_ALL)
-        logger.info(prefix + f"Writing {row_count} rows to StringIO file.")
-
         writer.writerow(headers)
-        writer.writerows(rows)
 
-        csvfile.seek(0, os.SEEK_END)
-        size = csvfile.tell()
-        logger.info(prefix + f"Final file size of {size} bytes.")
-        csvfile.seek(0)
-
-        output = csvfile.getvalue()
+        row_count = 0
+        size = 0
+        for obj in self._iter_objects():
+            writer.writerow(self._create_row(obj))
+            row_count += 1
+            if row_count % self.chunk_size == 0:
+                chunk = csvfile.getvalue()
+                size += len(chunk)
+                yield chunk
+                csvfile.seek(0)
+                csvfile.truncate()
+
+        chunk = csvfile.getvalue()
+        size += len(chunk)
+        yield chunk
         csvfile.close()
-        logger.info(prefix + "File successfully closed")
-        return output
+        logger.info(prefix + f"Streamed {row_count} rows, {size} characters.")
+
+    def stream_bytes(self, encoding: str = "utf-8") -> Iterator[bytes]:
+        """
+        Yields the csv in encoded chunks, e.g. for a StreamingHttpResponse.
+        """
+        for chunk in self.stream():
+            yield chunk.encode(encoding)
+
+    def to_zip(self, archive: zipfile.ZipFile, name: str) -> None:
+        """
+        Streams the csv into the member `name` of `archive`.
+        """
+        with archive.open(name, "w") as fout:
+            for chunk in self.stream_bytes():
+                fout.write(chunk)
+
+    def to_string(self):
+        """
+        Creates a string representation of a Django model.
+        """
+        return "".join(self.stream())
 
     def to_temporary_file(self):
         """
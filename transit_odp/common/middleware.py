@@ -1,5 +1,6 @@
 from transit_odp.common.utils import remove_query_string_param
-from transit_odp.site_admin.models import CHAR_LEN, APIRequest
+from transit_odp.site_admin.models import CHAR_LEN
+from transit_odp.site_admin.request_log import api_request_event, record_event
 
 
 class DefaultHostMiddleware:
@@ -28,7 +29,11 @@ class DefaultHostMiddleware:
 
 
 class APILoggerMiddleware:
-    """Logs any incoming requests to the BODS API in the APIRequest model."""
+    """Logs any incoming requests to the BODS API in the APIRequest model.
+
+    The requests are buffered and saved in batches, see
+    `transit_odp.site_admin.request_log`.
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
@@ -50,8 +55,6 @@ class APILoggerMiddleware:
             path_info = path_info[:CHAR_LEN]
             query_string = query_string[:CHAR_LEN]
 
-            APIRequest.objects.create(
-                requestor=user, path_info=path_info, query_string=query_string
-            )
+            record_event(api_request_event(user.id, path_info, query_string))
 
         return response
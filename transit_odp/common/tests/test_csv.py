@@ -0,0 +1,49 @@
+import csv
+import io
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+
+from transit_odp.common.csv import CSVBuilder, CSVColumn
+
+
+class PeopleCSV(CSVBuilder):
+    chunk_size = 3
+    columns = [
+        CSVColumn(header="Name", accessor="name"),
+        CSVColumn(header="Joined", accessor=lambda p: p.joined),
+    ]
+
+    def __init__(self, count: int):
+        self._count = count
+
+    def get_queryset(self):
+        return [
+            SimpleNamespace(name=f"Person {index}", joined=datetime(2023, 1, index + 1))
+            for index in range(self._count)
+        ]
+
+
+def test_stream_yields_chunks_of_rows():
+    chunks = list(PeopleCSV(7).stream())
+
+    # 3 chunks of rows and the remainder
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == ["Name", "Joined"]
+    assert rows[1] == ["Person 0", "2023-01-01T00:00:00"]
+    assert len(rows) == 8
+
+
+def test_to_string_matches_stream():
+    assert PeopleCSV(5).to_string() == "".join(PeopleCSV(5).stream())
+    assert PeopleCSV(0).to_string() == '"Name","Joined"\r\n'
+
+
+def test_to_zip():
+    buffer_ = io.BytesIO()
+    with zipfile.ZipFile(buffer_, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
+        PeopleCSV(10).to_zip(zf, "people.csv")
+
+    with zipfile.ZipFile(buffer_) as zf:
+        assert zf.read("people.csv").decode() == PeopleCSV(10).to_string()
@@ -10,6 +10,7 @@ from pytest_django.lazy_django import skip_if_no_django
 from pytest_factoryboy import register
 
 from config import hosts
+from transit_odp.data_quality.pti.lookups import service_code_lookup, stop_area_lookup
 from transit_odp.organisation.factories import OrganisationFactory
 from transit_odp.users.factories import InvitationFactory, UserFactory
 
@@ -24,6 +25,18 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def txc_document_store(settings, tmpdir):
+    settings.TXC_DOCUMENT_STORE_DIR = tmpdir.join("txc_documents").strpath
+
+
+@pytest.fixture(autouse=True)
+def pti_reference_lookups():
+    # The lookups are kept for the lifetime of the process, reload them per test
+    stop_area_lookup.invalidate()
+    service_code_lookup.invalidate()
+
+
 @pytest.fixture
 def request_factory() -> RequestFactory:
     return RequestFactory()
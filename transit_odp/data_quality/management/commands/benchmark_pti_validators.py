@@ -0,0 +1,197 @@
+import time
+
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from transit_odp.data_quality.pti.validators import LinesValidator, StopPointValidator
+
+TXC_NAMESPACE = "http://www.transxchange.org.uk/"
+
+
+class ScanningMixin:
+    """The lookups of BaseValidator answered by scanning the whole document on
+    every call, used as the baseline of the benchmark.
+    """
+
+    def get_vehicle_journey_by_line_ref(self, ref):
+        return [vj for vj in self.vehicle_journeys if vj.line_ref == ref]
+
+    def get_vehicle_journey_by_pattern_journey_ref(self, ref):
+        return [vj for vj in self.vehicle_journeys if vj.journey_pattern_ref == ref]
+
+    def get_vehicle_journey_by_code(self, code):
+        return [vj for vj in self.vehicle_journeys if vj.code == code]
+
+    def get_route_section_by_stop_point_ref(self, ref):
+        xpath = (
+            "//x:RouteSections/x:RouteSection/"
+            f"x:RouteLink[string(x:From/x:StopPointRef) = '{ref}' "
+            f"or string(x:To/x:StopPointRef) = '{ref}']/@id"
+        )
+        return list(set(self.root.xpath(xpath, namespaces=self.namespaces)))
+
+    def get_journey_pattern_section_refs_by_route_link_ref(self, ref):
+        xpath = (
+            "//x:JourneyPatternSections/x:JourneyPatternSection"
+            f"[x:JourneyPatternTimingLink[string(x:RouteLinkRef) = '{ref}']]/@id"
+        )
+        return list(set(self.root.xpath(xpath, namespaces=self.namespaces)))
+
+    def get_journey_pattern_ref_by_journey_pattern_section_ref(self, ref):
+        xpath = f"//x:JourneyPattern[string(x:JourneyPatternSectionRefs) = '{ref}']/@id"
+        return list(set(self.root.xpath(xpath, namespaces=self.namespaces)))
+
+    def get_stop_point_ref_from_journey_pattern_ref(self, ref):
+        xpath = (
+            f"//x:StandardService/x:JourneyPattern[@id='{ref}']"
+            "/x:JourneyPatternSectionRefs/text()"
+        )
+        all_stop_refs = []
+        for section_ref in self.root.xpath(xpath, namespaces=self.namespaces):
+            xpath = (
+                "//x:JourneyPatternSections/x:JourneyPatternSection"
+                f"[@id='{section_ref}']/x:JourneyPatternTimingLink/*"
+                "[local-name() = 'From' or local-name() = 'To']/x:StopPointRef/text()"
+            )
+            all_stop_refs += self.root.xpath(xpath, namespaces=self.namespaces)
+        return list(set(all_stop_refs))
+
+    def get_locality_name_from_annotated_stop_point_ref(self, ref):
+        xpath = (
+            "//x:StopPoints//x:AnnotatedStopPointRef[string(x:StopPointRef)"
+            f" = '{ref}']/x:LocalityName/text()"
+        )
+        names = self.root.xpath(xpath, namespaces=self.namespaces)
+        return names[0] if names else None
+
+    def get_operating_profile_by_vehicle_journey_code(self, ref):
+        xpath = (
+            f"//x:VehicleJourney[string(x:VehicleJourneyCode) = '{ref}']"
+            "//x:OperatingProfile"
+        )
+        return self.root.xpath(xpath, namespaces=self.namespaces)
+
+
+class ScanningLinesValidator(ScanningMixin, LinesValidator):
+    pass
+
+
+class ScanningStopPointValidator(ScanningMixin, StopPointValidator):
+    pass
+
+
+def _sub(parent, tag, text=None, **attrib):
+    element = etree.SubElement(parent, f"{{{TXC_NAMESPACE}}}{tag}", attrib)
+    element.text = text
+    return element
+
+
+def generate_document(
+    journeys: int, patterns: int, links: int, lines: int, stops: int
+) -> bytes:
+    """
+    Returns a synthetic TransXChange document with the elements the PTI
+    validators look up.
+    """
+    root = etree.Element(
+        f"{{{TXC_NAMESPACE}}}TransXChange", nsmap={None: TXC_NAMESPACE}
+    )
+
+    stop_points = _sub(root, "StopPoints")
+    for index in range(stops):
+        ref = _sub(stop_points, "AnnotatedStopPointRef")
+        _sub(ref, "StopPointRef", f"stop{index}")
+        _sub(ref, "CommonName", f"Stop {index}")
+        _sub(ref, "LocalityName", f"Locality {index % 50}")
+    for index in range(min(stops, 20)):
+        stop_point = _sub(stop_points, "StopPoint")
+        _sub(stop_point, "AtcoCode", f"stop{index}")
+
+    route_sections = _sub(root, "RouteSections")
+    sections = _sub(root, "JourneyPatternSections")
+    for pattern in range(patterns):
+        route_section = _sub(route_sections, "RouteSection", id=f"rs{pattern}")
+        section = _sub(sections, "JourneyPatternSection", id=f"js{pattern}")
+        for order in range(links):
+            from_ref = f"stop{(pattern + order) % stops}"
+            to_ref = f"stop{(pattern + order + 1) % stops}"
+            route_link = _sub(route_section, "RouteLink", id=f"rl{pattern}-{order}")
+            _sub(_sub(route_link, "From"), "StopPointRef", from_ref)
+            _sub(_sub(route_link, "To"), "StopPointRef", to_ref)
+            timing_link = _sub(
+                section, "JourneyPatternTimingLink", id=f"jptl{pattern}-{order}"
+            )
+            _sub(_sub(timing_link, "From"), "StopPointRef", from_ref)
+            _sub(_sub(timing_link, "To"), "StopPointRef", to_ref)
+            _sub(timing_link, "RouteLinkRef", f"rl{pattern}-{order}")
+
+    service = _sub(_sub(root, "Services"), "Service")
+    _sub(service, "ServiceCode", "PB0000001:1")
+    lines_element = _sub(service, "Lines")
+    for line in range(lines):
+        _sub(_sub(lines_element, "Line", id=f"line{line}"), "LineName", str(line))
+    period = _sub(service, "OperatingPeriod")
+    _sub(period, "StartDate", "2023-01-01")
+    standard_service = _sub(service, "StandardService")
+    for pattern in range(patterns):
+        journey_pattern = _sub(standard_service, "JourneyPattern", id=f"jp{pattern}")
+        _sub(journey_pattern, "JourneyPatternSectionRefs", f"js{pattern}")
+
+    vehicle_journeys = _sub(root, "VehicleJourneys")
+    for index in range(journeys):
+        journey = _sub(vehicle_journeys, "VehicleJourney")
+        _sub(journey, "VehicleJourneyCode", f"vj{index}")
+        _sub(journey, "LineRef", f"line{index % lines}")
+        _sub(journey, "JourneyPatternRef", f"jp{index % patterns}")
+
+    return etree.tostring(root)
+
+
+class Command(BaseCommand):
+    help = "Benchmarks the PTI validators on a large synthetic TransXChange file"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--journeys", type=int, default=10_000, help="Number of VehicleJourneys"
+        )
+        parser.add_argument(
+            "--patterns", type=int, default=200, help="Number of JourneyPatterns"
+        )
+        parser.add_argument(
+            "--links", type=int, default=20, help="Number of links per pattern"
+        )
+        parser.add_argument("--lines", type=int, default=5, help="Number of Lines")
+        parser.add_argument(
+            "--stops", type=int, default=1000, help="Number of StopPoints"
+        )
+
+    def run(self, content: bytes, lines_validator, stop_point_validator) -> float:
+        # Parse a new document for every run so no lookups are reused
+        root = etree.fromstring(content)
+        namespaces = {"x": TXC_NAMESPACE}
+        start = time.perf_counter()
+        for lines in root.xpath("//x:Lines", namespaces=namespaces):
+            lines_validator(lines).validate()
+        for stop_point in root.xpath("//x:StopPoint", namespaces=namespaces):
+            stop_point_validator(stop_point).validate()
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        content = generate_document(
+            journeys=options["journeys"],
+            patterns=options["patterns"],
+            links=options["links"],
+            lines=options["lines"],
+            stops=options["stops"],
+        )
+        self.stdout.write(
+            f"Validating a document of {len(content) / 1e6:.1f}MB with "
+            f"{options['journeys']} vehicle journeys."
+        )
+
+        scanning = self.run(content, ScanningLinesValidator, ScanningStopPointValidator)
+        self.stdout.write(f"Scanning lookups: {scanning:.2f}s")
+        indexed = self.run(content, LinesValidator, StopPointValidator)
+        self.stdout.write(
+            f"Indexed lookups: {indexed:.2f}s ({scanning / indexed:.1f}x faster)"
+        )
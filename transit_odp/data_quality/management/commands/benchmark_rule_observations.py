@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from transit_odp.data_quality.pti.validators import PTIValidator
+from transit_odp.fares_validator.views.fares_validation import FARES_SCHEMA
+from transit_odp.fares_validator.views.validators import FaresValidator
+from transit_odp.timetables.pti import PTI_PATH
+
+
+class Command(BaseCommand):
+    help = "Reports the time each PTI or fares observation takes to check a file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The TransXChange or NeTEx file to check")
+        parser.add_argument(
+            "--fares", action="store_true", help="Check the fares rules"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Number of times to check the file"
+        )
+        parser.add_argument(
+            "--top", type=int, default=20, help="Number of observations to report"
+        )
+
+    def handle(self, *args, **options):
+        if options["fares"]:
+            with FARES_SCHEMA.open("r") as f:
+                validator = FaresValidator(f)
+        else:
+            with PTI_PATH.open("r") as f:
+                validator = PTIValidator(f)
+
+        document = etree.parse(Path(options["path"]).as_posix())
+        timings = []
+        for compiled in validator.observations:
+            start = time.perf_counter()
+            for _ in range(options["repeat"]):
+                for element in compiled.context(document):
+                    validator.check_observation(compiled, element)
+            duration = (time.perf_counter() - start) / options["repeat"]
+            timings.append((duration, compiled.observation))
+
+        total = sum(duration for duration, _ in timings)
+        self.stdout.write(
+            f"{len(timings)} observations took {total * 1000:.1f}ms per check."
+        )
+        timings.sort(key=lambda timing: timing[0], reverse=True)
+        for duration, observation in timings[: options["top"]]:
+            context = observation.context
+            self.stdout.write(
+                f"{duration * 1000:9.2f}ms {observation.category}: {context}"
+            )
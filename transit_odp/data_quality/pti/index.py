@@ -0,0 +1,167 @@
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from typing import Dict, List, Set
+
+from lxml import etree
+
+from transit_odp.data_quality.pti.models.txcmodels import Line, VehicleJourney
+
+
+class DocumentIndex:
+    """Lookups of the elements of a TransXChange document that the PTI validators
+    need, keyed by their ids and refs.
+
+    Each lookup is built the first time it is used with a single pass over the
+    document, so answering a lookup doesn't scan the document again. Use
+    `get_document_index` to share the index of a document between validators.
+
+    Args:
+        root: The root element of the document.
+    """
+
+    def __init__(self, root: etree._Element):
+        self.root = root
+        self.namespaces = {"x": root.nsmap.get(None)}
+
+    def _xpath(self, element: etree._Element, path: str):
+        return element.xpath(path, namespaces=self.namespaces)
+
+    @cached_property
+    def lines(self) -> List[Line]:
+        return [Line.from_xml(line) for line in self._xpath(self.root, "//x:Line")]
+
+    @cached_property
+    def vehicle_journeys(self) -> List[VehicleJourney]:
+        journeys = self._xpath(self.root, "//x:VehicleJourneys/x:VehicleJourney")
+        return [VehicleJourney.from_xml(vj) for vj in journeys]
+
+    @cached_property
+    def journey_patterns(self) -> List[etree._Element]:
+        return self._xpath(self.root, "//x:JourneyPatterns/x:JourneyPattern")
+
+    @cached_property
+    def vehicle_journeys_by_code(self) -> Dict[str, List[VehicleJourney]]:
+        index = defaultdict(list)
+        for vj in self.vehicle_journeys:
+            index[vj.code].append(vj)
+        return index
+
+    @cached_property
+    def vehicle_journeys_by_line_ref(self) -> Dict[str, List[VehicleJourney]]:
+        index = defaultdict(list)
+        for vj in self.vehicle_journeys:
+            index[vj.line_ref].append(vj)
+        return index
+
+    @cached_property
+    def vehicle_journeys_by_journey_pattern_ref(
+        self,
+    ) -> Dict[str, List[VehicleJourney]]:
+        index = defaultdict(list)
+        for vj in self.vehicle_journeys:
+            index[vj.journey_pattern_ref].append(vj)
+        return index
+
+    @cached_property
+    def route_link_refs_by_stop_point_ref(self) -> Dict[str, Set[str]]:
+        index = defaultdict(set)
+        links = self._xpath(self.root, "//x:RouteSections/x:RouteSection/x:RouteLink")
+        for link in links:
+            link_id = link.get("id")
+            if link_id is None:
+                continue
+            index[self._xpath(link, "string(x:From/x:StopPointRef)")].add(link_id)
+            index[self._xpath(link, "string(x:To/x:StopPointRef)")].add(link_id)
+        return index
+
+    @cached_property
+    def journey_pattern_sections(self) -> List[etree._Element]:
+        return self._xpath(
+            self.root, "//x:JourneyPatternSections/x:JourneyPatternSection"
+        )
+
+    @cached_property
+    def section_refs_by_route_link_ref(self) -> Dict[str, Set[str]]:
+        index = defaultdict(set)
+        for section in self.journey_pattern_sections:
+            section_id = section.get("id")
+            if section_id is None:
+                continue
+            links = self._xpath(section, "x:JourneyPatternTimingLink")
+            for link in links:
+                index[self._xpath(link, "string(x:RouteLinkRef)")].add(section_id)
+        return index
+
+    @cached_property
+    def stop_point_refs_by_section_ref(self) -> Dict[str, List[str]]:
+        index = defaultdict(list)
+        xpath = (
+            "x:JourneyPatternTimingLink/*[local-name() = 'From' or "
+            "local-name() = 'To']/x:StopPointRef/text()"
+        )
+        for section in self.journey_pattern_sections:
+            section_id = section.get("id")
+            if section_id is not None:
+                index[section_id] += self._xpath(section, xpath)
+        return index
+
+    @cached_property
+    def journey_pattern_refs_by_section_ref(self) -> Dict[str, Set[str]]:
+        index = defaultdict(set)
+        for pattern in self._xpath(self.root, "//x:JourneyPattern"):
+            pattern_id = pattern.get("id")
+            if pattern_id is None:
+                continue
+            # Only the first JourneyPatternSectionRefs of a pattern is matched
+            section_ref = self._xpath(pattern, "string(x:JourneyPatternSectionRefs)")
+            index[section_ref].add(pattern_id)
+        return index
+
+    @cached_property
+    def section_refs_by_standard_journey_pattern_ref(self) -> Dict[str, List[str]]:
+        index = defaultdict(list)
+        patterns = self._xpath(self.root, "//x:StandardService/x:JourneyPattern")
+        for pattern in patterns:
+            refs = self._xpath(pattern, "x:JourneyPatternSectionRefs/text()")
+            index[pattern.get("id")] += refs
+        return index
+
+    @cached_property
+    def locality_name_by_stop_point_ref(self) -> Dict[str, str]:
+        index = {}
+        refs = self._xpath(self.root, "//x:StopPoints//x:AnnotatedStopPointRef")
+        for ref in refs:
+            stop_point_ref = self._xpath(ref, "string(x:StopPointRef)")
+            names = self._xpath(ref, "x:LocalityName/text()")
+            if names and stop_point_ref not in index:
+                index[stop_point_ref] = names[0]
+        return index
+
+    @cached_property
+    def operating_profiles_by_vehicle_journey_code(
+        self,
+    ) -> Dict[str, List[etree._Element]]:
+        index = defaultdict(list)
+        for journey in self._xpath(self.root, "//x:VehicleJourney"):
+            code = self._xpath(journey, "string(x:VehicleJourneyCode)")
+            index[code] += self._xpath(journey, ".//x:OperatingProfile")
+        return index
+
+    @cached_property
+    def service_operating_periods(self) -> List[etree._Element]:
+        return self._xpath(self.root, "//x:Service//x:OperatingPeriod")
+
+
+@lru_cache(maxsize=1)
+def _get_index(root: etree._Element) -> DocumentIndex:
+    return DocumentIndex(root)
+
+
+def get_document_index(element: etree._Element) -> DocumentIndex:
+    """
+    Returns the DocumentIndex of the document `element` belongs to.
+
+    Validators are created for every element a rule matches, only the index of
+    the most recent document is kept so they all share it.
+    """
+    return _get_index(element.getroottree().getroot())
@@ -0,0 +1,104 @@
+from logging import getLogger
+from typing import Dict, FrozenSet, Generic, List, Optional, TypeVar
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db.models import CharField, Value
+from django.db.models.functions import Replace
+
+from transit_odp.naptan.models import StopPoint
+from transit_odp.otc.models import Service
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ReferenceLookup(Generic[T]):
+    """A per-process copy of a reference table used by the PTI validators.
+
+    The table is loaded the first time it is used and kept for the lifetime of
+    the worker process. The version of the table is kept in the shared cache,
+    `invalidate` is called by the tasks that update the table so every worker
+    reloads it on its next `refresh`.
+
+    Subclasses set `version_key` and implement `load`.
+    """
+
+    version_key: str
+
+    def __init__(self):
+        self._value: Optional[T] = None
+        self._version: Optional[str] = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(version={self._version!r})"
+
+    def load(self) -> T:
+        raise NotImplementedError
+
+    def get_version(self) -> str:
+        version = cache.get(self.version_key)
+        if version is None:
+            # Nothing has invalidated the table since the cache was emptied
+            version = uuid4().hex
+            if not cache.add(self.version_key, version, timeout=None):
+                version = cache.get(self.version_key, version)
+        return version
+
+    def refresh(self) -> None:
+        """
+        Reloads the table if it has been invalidated since it was loaded.
+        """
+        version = self.get_version()
+        if self._value is None or version != self._version:
+            self._value = self.load()
+            self._version = version
+            logger.info(f"{self} loaded.")
+
+    def get(self) -> T:
+        """
+        Returns the table, loading it if it hasn't been loaded by this process.
+        """
+        if self._value is None:
+            self.refresh()
+        return self._value
+
+    def invalidate(self) -> None:
+        """
+        Marks the table as changed so every process reloads it.
+        """
+        cache.set(self.version_key, uuid4().hex, timeout=None)
+        self._value = None
+
+
+class StopAreaLookup(ReferenceLookup[Dict[str, List[str]]]):
+    """The stop areas of every NaPTAN StopPoint that has any, keyed by AtcoCode."""
+
+    version_key = "pti-stop-area-map-version"
+
+    def load(self) -> Dict[str, List[str]]:
+        stops = StopPoint.objects.exclude(stop_areas=[]).values_list(
+            "atco_code", "stop_areas"
+        )
+        return dict(stops.iterator())
+
+
+class ServiceCodeLookup(ReferenceLookup[FrozenSet[str]]):
+    """The service codes of every OTC registration in TransXChange format."""
+
+    version_key = "pti-service-codes-version"
+
+    def load(self) -> FrozenSet[str]:
+        service_codes = Service.objects.annotate(
+            service_code=Replace(
+                "registration_number",
+                Value("/", output_field=CharField()),
+                Value(":", output_field=CharField()),
+            )
+        ).values_list("service_code", flat=True)
+        return frozenset(service_codes.iterator())
+
+
+stop_area_lookup = StopAreaLookup()
+service_code_lookup = ServiceCodeLookup()
@@ -0,0 +1,36 @@
+from lxml import etree
+
+from transit_odp.data_quality.pti.index import get_document_index
+from transit_odp.data_quality.pti.tests.conftest import DATA_DIR
+from transit_odp.data_quality.pti.validators import BaseValidator
+
+NAMESPACES = {"x": "http://www.transxchange.org.uk/"}
+
+
+def test_validators_share_document_index():
+    root = etree.parse(str(DATA_DIR / "relatedlinesbyjp.xml")).getroot()
+    lines, *_ = root.xpath("//x:Lines", namespaces=NAMESPACES)
+    stop_point, *_ = root.xpath("//x:StopPoints", namespaces=NAMESPACES)
+
+    index = get_document_index(root)
+    assert BaseValidator(lines).index is index
+    assert BaseValidator(stop_point).index is index
+
+    other = etree.parse(str(DATA_DIR / "relatedlinesbystops.xml")).getroot()
+    assert get_document_index(other) is not index
+
+
+def test_lookups_use_index():
+    root = etree.parse(str(DATA_DIR / "relatedlinesbyjp.xml")).getroot()
+    validator = BaseValidator(root)
+
+    (journey,) = validator.get_vehicle_journey_by_code("VJ_A")
+    assert journey.line_ref == "L1N"
+    assert journey.journey_pattern_ref == "JP2"
+    assert validator.get_journey_pattern_ref_by_vehicle_journey_code("VJ_A") == "JP2"
+    assert len(validator.get_vehicle_journey_by_line_ref("L1N")) == 6
+    assert validator.get_vehicle_journey_by_code("unknown") == []
+    assert "RL1" in validator.get_route_section_by_stop_point_ref("9990000001")
+    assert sorted(
+        validator.get_journey_pattern_section_refs_by_route_link_ref("RL1")
+    ) == ["JPS1", "JPS2"]
@@ -0,0 +1,22 @@
+import pytest
+
+from transit_odp.data_quality.pti.lookups import StopAreaLookup
+from transit_odp.naptan.factories import StopPointFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_stop_area_lookup_is_kept_until_invalidated():
+    StopPointFactory(atco_code="0100000001", stop_areas=["area1"])
+    StopPointFactory(atco_code="0100000002", stop_areas=[])
+    lookup = StopAreaLookup()
+    assert lookup.get() == {"0100000001": ["area1"]}
+
+    StopPointFactory(atco_code="0100000003", stop_areas=["area2"])
+    lookup.refresh()
+    assert "0100000003" not in lookup.get()
+
+    # Another process, e.g. the NaPTAN ETL, invalidates the lookup
+    StopAreaLookup().invalidate()
+    lookup.refresh()
+    assert lookup.get() == {"0100000001": ["area1"], "0100000003": ["area2"]}
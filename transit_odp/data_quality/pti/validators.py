@@ -2,13 +2,11 @@ import itertools
 import json
 from collections import defaultdict
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Iterable, List, Optional
 from urllib.parse import unquote
 
 from dateutil import parser
 from dateutil.relativedelta import relativedelta
-from django.db.models import CharField, Value
-from django.db.models.functions import Replace
 from lxml import etree
 
 from transit_odp.common.types import JSONFile, XMLFile
@@ -34,10 +32,15 @@ from transit_odp.data_quality.pti.functions import (
     validate_run_time,
     validate_timing_link_stops,
 )
+from transit_odp.data_quality.pti.index import get_document_index
+from transit_odp.data_quality.pti.lookups import service_code_lookup, stop_area_lookup
 from transit_odp.data_quality.pti.models import Observation, Schema, Violation
-from transit_odp.data_quality.pti.models.txcmodels import Line, VehicleJourney
-from transit_odp.naptan.models import StopPoint
-from transit_odp.otc.models import Service
+from transit_odp.data_quality.pti.models.txcmodels import VehicleJourney
+from transit_odp.validate.xpath import (
+    CompiledObservation,
+    compile_observations,
+    select_contexts,
+)
 
 
 def has_destination_display(context, patterns):
@@ -57,9 +60,7 @@ def has_destination_display(context, patterns):
 
 def get_lines_validator(context, lines: List[etree._Element]) -> bool:
     lines = lines[0]
-    stops = StopPoint.objects.exclude(stop_areas=[]).values("atco_code", "stop_areas")
-    stop_area_map = {stop["atco_code"]: stop["stop_areas"] for stop in stops}
-    validator = LinesValidator(lines, stop_area_map=stop_area_map)
+    validator = LinesValidator(lines, stop_area_map=stop_area_lookup.get())
     return validator.validate()
 
 
@@ -73,37 +74,19 @@ class BaseValidator:
     def __init__(self, root):
         self.root = root
         self.namespaces = {"x": self.root.nsmap.get(None)}
-
-        self._vehicle_journeys = None
-        self._lines = None
-        self._journey_patterns = None
+        self.index = get_document_index(self.root)
 
     @property
     def lines(self):
-        if self._lines is not None:
-            return self._lines
-        lines = self.root.xpath("//x:Line", namespaces=self.namespaces)
-        self._lines = [Line.from_xml(line) for line in lines]
-        return self._lines
+        return self.index.lines
 
     @property
     def vehicle_journeys(self):
-        if self._vehicle_journeys is not None:
-            return self._vehicle_journeys
-        xpath = "//x:VehicleJourneys/x:VehicleJourney"
-        journeys = self.root.xpath(xpath, namespaces=self.namespaces)
-        self._vehicle_journeys = [VehicleJourney.from_xml(vj) for vj in journeys]
-        return self._vehicle_journeys
+        return self.index.vehicle_journeys
 
     @property
     def journey_patterns(self):
-        if self._journey_patterns is not None:
-            return self._journey_patterns
-
-        xpath = "//x:JourneyPatterns/x:JourneyPattern"
-        patterns = self.root.xpath(xpath, namespaces=self.namespaces)
-        self._journey_patterns = patterns
-        return self._journey_patterns
+        return self.index.journey_patterns
 
     def get_journey_pattern_ref_by_vehicle_journey_code(self, code: str):
         vehicle_journeys = self.get_vehicle_journey_by_code(code)
@@ -138,58 +121,39 @@ class BaseValidator:
         """
         Get all the VehicleJourneys that have LineRef equal to ref.
         """
-        return [vj for vj in self.vehicle_journeys if vj.line_ref == ref]
+        return list(self.index.vehicle_journeys_by_line_ref.get(ref, []))
 
     def get_vehicle_journey_by_pattern_journey_ref(self, ref) -> List[VehicleJourney]:
         """
         Get all the VehicleJourneys that JourneyPatternRef equal to ref.
         """
-        return [vj for vj in self.vehicle_journeys if vj.journey_pattern_ref == ref]
+        return list(self.index.vehicle_journeys_by_journey_pattern_ref.get(ref, []))
 
     def get_vehicle_journey_by_code(self, code) -> List[VehicleJourney]:
         """
         Get the VehicleJourney with VehicleJourneyCode equal to code.
         """
-        return [vj for vj in self.vehicle_journeys if vj.code == code]
+        return list(self.index.vehicle_journeys_by_code.get(code, []))
 
     def get_route_section_by_stop_point_ref(self, ref):
-        xpath = (
-            "//x:RouteSections/x:RouteSection/"
-            f"x:RouteLink[string(x:From/x:StopPointRef) = '{ref}' "
-            f"or string(x:To/x:StopPointRef) = '{ref}']/@id"
-        )
-        link_refs = self.root.xpath(xpath, namespaces=self.namespaces)
-        return list(set(link_refs))
+        return list(self.index.route_link_refs_by_stop_point_ref.get(ref, set()))
 
     def get_journey_pattern_section_refs_by_route_link_ref(self, ref):
-        xpath = (
-            "//x:JourneyPatternSections/x:JourneyPatternSection"
-            f"[x:JourneyPatternTimingLink[string(x:RouteLinkRef) = '{ref}']]/@id"
-        )
-        section_refs = self.root.xpath(xpath, namespaces=self.namespaces)
-        return list(set(section_refs))
+        return list(self.index.section_refs_by_route_link_ref.get(ref, set()))
 
     def get_journey_pattern_ref_by_journey_pattern_section_ref(self, ref):
-        xpath = f"//x:JourneyPattern[string(x:JourneyPatternSectionRefs) = '{ref}']/@id"
-        journey_pattern_refs = self.root.xpath(xpath, namespaces=self.namespaces)
-        return list(set(journey_pattern_refs))
+        return list(self.index.journey_pattern_refs_by_section_ref.get(ref, set()))
 
     def get_stop_point_ref_from_journey_pattern_ref(self, ref):
-        xpath = (
-            f"//x:StandardService/x:JourneyPattern[@id='{ref}']"
-            "/x:JourneyPatternSectionRefs/text()"
+        section_refs = self.index.section_refs_by_standard_journey_pattern_ref.get(
+            ref, []
         )
-        section_refs = self.root.xpath(xpath, namespaces=self.namespaces)
 
         all_stop_refs = []
         for section_ref in section_refs:
-            xpath = (
-                "//x:JourneyPatternSections/x:JourneyPatternSection"
-                f"[@id='{section_ref}']/x:JourneyPatternTimingLink/*"
-                "[local-name() = 'From' or local-name() = 'To']/x:StopPointRef/text()"
+            all_stop_refs += self.index.stop_point_refs_by_section_ref.get(
+                section_ref, []
             )
-            stop_refs = self.root.xpath(xpath, namespaces=self.namespaces)
-            all_stop_refs += stop_refs
 
         return list(set(all_stop_refs))
 
@@ -197,14 +161,7 @@ class BaseValidator:
         """
         Get the LocalityName of an AnnotatedStopPointRef from its StopPointRef.
         """
-        xpath = (
-            "//x:StopPoints//x:AnnotatedStopPointRef[string(x:StopPointRef)"
-            f" = '{ref}']/x:LocalityName/text()"
-        )
-        names = self.root.xpath(xpath, namespaces=self.namespaces)
-        if names:
-            return names[0]
-        return None
+        return self.index.locality_name_by_stop_point_ref.get(ref)
 
 
 class DestinationDisplayValidator:
@@ -369,17 +326,10 @@ class StopPointValidator(BaseValidator):
         return self.root.xpath(xpath, namespaces=self.namespaces)
 
     def get_operating_profile_by_vehicle_journey_code(self, ref):
-        xpath = (
-            f"//x:VehicleJourney[string(x:VehicleJourneyCode) = '{ref}']"
-            "//x:OperatingProfile"
-        )
-        profiles = self.root.xpath(xpath, namespaces=self.namespaces)
-        return profiles
+        return list(self.index.operating_profiles_by_vehicle_journey_code.get(ref, []))
 
     def get_service_operating_period(self):
-        xpath = "//x:Service//x:OperatingPeriod"
-        periods = self.root.xpath(xpath, namespaces=self.namespaces)
-        return periods
+        return self.index.service_operating_periods
 
     def has_valid_operating_profile(self, ref):
         profiles = self.get_operating_profile_by_vehicle_journey_code(ref)
@@ -438,8 +388,8 @@ class StopPointValidator(BaseValidator):
 
 
 class ServiceCodeValidator:
-    def __init__(self, service_codes: List[str]):
-        self.service_codes = service_codes
+    def __init__(self, service_codes: Iterable[str]):
+        self.service_codes = frozenset(service_codes)
 
     def validate(self, context, service_code: str):
         service_code = service_code[0].text
@@ -450,15 +400,7 @@ class ServiceCodeValidator:
 
 
 def get_service_code_validator() -> Callable:
-    service_codes = Service.objects.annotate(
-        service_code=Replace(
-            "registration_number",
-            Value("/", output_field=CharField()),
-            Value(":", output_field=CharField()),
-        )
-    ).values_list("service_code", flat=True)
-
-    validator = ServiceCodeValidator(list(service_codes))
+    validator = ServiceCodeValidator(service_code_lookup.get())
     return validator.validate
 
 
@@ -470,6 +412,10 @@ class PTIValidator:
         self.namespaces = self.schema.header.namespaces
         self.violations = []
 
+        # Pick up any changes to the reference tables since the last validation
+        stop_area_lookup.refresh()
+        service_code_lookup.refresh()
+
         self.fns = etree.FunctionNamespace(None)
         self.register_function("bool", cast_to_bool)
         self.register_function("contains_date", contains_date)
@@ -508,6 +454,10 @@ class PTIValidator:
         self.register_function("validate_bank_holidays", validate_bank_holidays)
         self.register_function("validate_service_code", get_service_code_validator())
 
+        self.observations = compile_observations(
+            self.schema.observations, self.namespaces
+        )
+
     def register_function(self, key: str, function: Callable) -> None:
         self.fns[key] = function
 
@@ -515,10 +465,11 @@ class PTIValidator:
         self.violations.append(violation)
 
     def check_observation(
-        self, observation: Observation, element: etree._Element
+        self, compiled: CompiledObservation, element: etree._Element
     ) -> None:
-        for rule in observation.rules:
-            result = element.xpath(rule.test, namespaces=self.namespaces)
+        observation: Observation = compiled.observation
+        for rule in compiled.rules:
+            result = rule(element)
             if not result:
                 name = element.xpath("local-name(.)", namespaces=self.namespaces)
                 violation = Violation(
@@ -552,14 +503,15 @@ class PTIValidator:
         document = etree.parse(source)
         txc_service_type = self.check_service_type(document)
 
-        service_observations = []
         service_observations = [
             x
-            for x in self.schema.observations
-            if x.service_type == txc_service_type or x.service_type == "All"
+            for x in self.observations
+            if x.observation.service_type in (txc_service_type, "All")
         ]
-        for observation in service_observations:
-            elements = document.xpath(observation.context, namespaces=self.namespaces)
+        # Match every context in one walk of the document, then check the
+        # observations in schema order so violations are reported in that order
+        selected = select_contexts(document, service_observations)
+        for compiled, elements in zip(service_observations, selected):
             for element in elements:
-                self.check_observation(observation, element)
+                self.check_observation(compiled, element)
         return len(self.violations) == 0
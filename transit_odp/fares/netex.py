@@ -7,8 +7,7 @@ from lxml import etree
 
 from transit_odp.common.xmlelements import XMLElement
 from transit_odp.pipelines.constants import SchemaCategory
-from transit_odp.pipelines.models import SchemaDefinition
-from transit_odp.pipelines.pipelines.xml_schema import SchemaLoader
+from transit_odp.pipelines.pipelines.xml_schema import schema_registry
 from transit_odp.validate import XMLValidator
 
 
@@ -287,6 +286,4 @@ def get_netex_schema() -> etree.XMLSchema:
     """
     Helper method to return netex scheme object
     """
-    definition = SchemaDefinition.objects.get(category=SchemaCategory.NETEX)
-    schema_loader = SchemaLoader(definition, NETEX_XSD_PATH)
-    return schema_loader.schema
+    return schema_registry.get_schema(SchemaCategory.NETEX, NETEX_XSD_PATH)
@@ -54,6 +54,7 @@ from transit_odp.fares_validator.views.functions import (
     is_time_intervals_present_in_tarrifs,
     is_uk_pi_fare_price_frame_present,
 )
+from transit_odp.validate.xpath import CompiledObservation, compile_observations
 
 
 class FaresValidator:
@@ -199,6 +200,10 @@ class FaresValidator:
             "check_resource_frame_operator_name", check_resource_frame_operator_name
         )
 
+        self.observations = compile_observations(
+            self.schema.observations, self.namespaces
+        )
+
     def register_function(self, key: str, function: Callable) -> None:
         self.fns[key] = function
 
@@ -206,10 +211,11 @@ class FaresValidator:
         self.violations.append(violation)
 
     def check_observation(
-        self, observation: Observation, element: etree._Element
+        self, compiled: CompiledObservation, element: etree._Element
     ) -> None:
-        for rule in observation.rules:
-            result = element.xpath(rule.test, namespaces=self.namespaces)
+        observation: Observation = compiled.observation
+        for rule in compiled.rules:
+            result = rule(element)
             if len(result):
                 violation = Violation(
                     line=result[1],
@@ -221,8 +227,7 @@ class FaresValidator:
 
     def is_valid(self, source: XMLFile) -> bool:
         document = etree.parse(source)
-        for observation in self.schema.observations:
-            elements = document.xpath(observation.context, namespaces=self.namespaces)
-            for element in elements:
-                self.check_observation(observation, element)
+        for compiled in self.observations:
+            for element in compiled.context(document):
+                self.check_observation(compiled, element)
         return len(self.violations) == 0
@@ -0,0 +1,164 @@
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+from lxml import etree
+
+from transit_odp.naptan.dataclasses import StopPoint
+from transit_odp.pipelines.pipelines.naptan_etl.extract import extract_stops
+
+HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<NaPTAN xmlns="http://www.naptan.org.uk/" SchemaVersion="2.4">
+  <StopPoints>
+"""
+STOP_POINT = """    <StopPoint Modification="new" RevisionNumber="1" Status="active">
+      <AtcoCode>{atco_code}</AtcoCode>
+      <NaptanCode>nap{index}</NaptanCode>
+      <Descriptor>
+        <CommonName>Stop {index}</CommonName>
+        <Street>High Street</Street>
+        <Indicator>Stop {indicator}</Indicator>
+      </Descriptor>
+      <Place>
+        <NptgLocalityRef>E{locality:07d}</NptgLocalityRef>
+        <LocalityCentre>0</LocalityCentre>
+        <Location>
+          <Translation>
+            <GridType>UKOS</GridType>
+            <Easting>{easting}</Easting>
+            <Northing>{northing}</Northing>
+            <Longitude>-1.5</Longitude>
+            <Latitude>52.5</Latitude>
+          </Translation>
+        </Location>
+      </Place>
+      <StopAreas>
+        <StopAreaRef Status="active">{admin_area:03d}G{area}</StopAreaRef>
+      </StopAreas>
+      <StopClassification>
+        <StopType>BCT</StopType>
+        <OnStreet>
+          <Bus>
+            <BusStopType>MKD</BusStopType>
+            <TimingStatus>OTH</TimingStatus>
+          </Bus>
+        </OnStreet>
+      </StopClassification>
+      <AdministrativeAreaRef>{admin_area:03d}</AdministrativeAreaRef>
+    </StopPoint>
+"""
+FOOTER = """  </StopPoints>
+</NaPTAN>
+"""
+
+
+def write_naptan_file(path: Path, stops: int, seed: int = 0):
+    """Writes a NaPTAN file of `stops` StopPoints to `path`."""
+    rng = random.Random(seed)
+    with path.open("w") as f:
+        f.write(HEADER)
+        for index in range(stops):
+            admin_area = rng.randint(1, 150)
+            f.write(
+                STOP_POINT.format(
+                    index=index,
+                    atco_code=f"{admin_area:03d}0{index:08d}",
+                    indicator=rng.choice(["A", "B", "C", "opp", "adj"]),
+                    locality=rng.randrange(45000),
+                    easting=rng.randint(100000, 600000),
+                    northing=rng.randint(100000, 900000),
+                    admin_area=admin_area,
+                    area=rng.randrange(50000),
+                )
+            )
+        f.write(FOOTER)
+
+
+def extract_stops_from_tree(xml_file_path):
+    """The extraction of stops before `extract_stops` streamed the file."""
+    tree = etree.parse(str(xml_file_path))
+    namespaces = {"naptan": "http://www.naptan.org.uk/"}
+    records = []
+    for stop in tree.iterfind("//naptan:StopPoints/naptan:StopPoint", namespaces):
+        point = StopPoint.from_xml(stop)
+        records.append(
+            {
+                "atco_code": point.atco_code,
+                "naptan_code": point.naptan_code,
+                "common_name": point.descriptor.common_name,
+                "indicator": point.descriptor.indicator,
+                "street": point.descriptor.street,
+                "locality_id": point.place.nptg_locality_ref,
+                "admin_area_id": int(point.administrative_area_ref),
+                "latitude": point.place.location.translation.latitude,
+                "longitude": point.place.location.translation.longitude,
+                "stop_areas": point.stop_areas,
+            }
+        )
+    return pd.DataFrame(records).set_index("atco_code", verify_integrity=True)
+
+
+def run_extract(extract, xml_file_path, results):
+    start = time.perf_counter()
+    df = extract(xml_file_path)
+    duration = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((duration, peak, len(df)))
+
+
+def measure(extract, xml_file_path):
+    """
+    Runs `extract` in a forked process so its peak memory is its own, plus the
+    memory of this process when it was forked.
+    """
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(
+        target=run_extract, args=(extract, xml_file_path, results)
+    )
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the time and peak memory of extracting the stops of a "
+        "generated national size NaPTAN file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stops", type=int, default=430000, help="Number of StopPoints"
+        )
+        parser.add_argument(
+            "--skip-baseline",
+            action="store_true",
+            help="Only measure the streaming extraction",
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "Naptan.xml"
+            write_naptan_file(path, options["stops"])
+            size = path.stat().st_size / 1024 / 1024
+            self.stdout.write(
+                f"Extracting {options['stops']} stops from a {size:.0f}MB file."
+            )
+
+            extracts = [("Streaming", extract_stops)]
+            if not options["skip_baseline"]:
+                extracts.append(("Whole tree", extract_stops_from_tree))
+            for name, extract in extracts:
+                duration, peak, rows = measure(extract, path.as_posix())
+                self.stdout.write(
+                    f"{name}: {duration:.1f}s, peak memory {peak:.0f}MB, "
+                    f"{rows} stops"
+                )
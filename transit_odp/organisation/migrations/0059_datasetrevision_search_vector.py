@@ -0,0 +1,81 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The search vector of transit_odp.organisation.search as it was when the field
+# was added
+FILL_SEARCH_VECTOR_SQL = """
+UPDATE organisation_datasetrevision AS revision
+SET search_vector =
+    setweight(to_tsvector('simple', revision.name), 'A')
+    || setweight(to_tsvector('simple', revision.description), 'B')
+    || setweight(
+        to_tsvector(
+            'simple',
+            coalesce(
+                (
+                    SELECT string_agg(admin_area.name, ' ')
+                    FROM organisation_datasetrevision_admin_areas
+                        AS revision_admin_area
+                    JOIN naptan_adminarea AS admin_area
+                        ON admin_area.id = revision_admin_area.adminarea_id
+                    WHERE revision_admin_area.datasetrevision_id = revision.id
+                ),
+                ''
+            )
+        ),
+        'C'
+    )
+    || setweight(
+        to_tsvector(
+            'simple',
+            coalesce(
+                (
+                    SELECT string_agg(DISTINCT admin_area.name, ' ')
+                    FROM organisation_datasetmetadata AS metadata
+                    JOIN fares_faresmetadata_stops AS fares_stop
+                        ON fares_stop.faresmetadata_id = metadata.id
+                    JOIN naptan_stoppoint AS stop_point
+                        ON stop_point.id = fares_stop.stoppoint_id
+                    JOIN naptan_adminarea AS admin_area
+                        ON admin_area.id = stop_point.admin_area_id
+                    WHERE metadata.revision_id = revision.id
+                ),
+                ''
+            )
+        ),
+        'D'
+    )
+WHERE revision.is_published
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fares", "0005_auto_20230113_1440"),
+        ("naptan", "0003_add_stop_areas_to_stoppoint"),
+        ("organisation", "0058_auto_20230113_1621"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasetrevision",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False,
+                help_text="The text searched for published revisions, see "
+                "transit_odp.organisation.search",
+                null=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="datasetrevision",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="organisation_revision_search"
+            ),
+        ),
+        migrations.RunSQL(
+            FILL_SEARCH_VECTOR_SQL, migrations.RunSQL.noop, elidable=True
+        ),
+    ]
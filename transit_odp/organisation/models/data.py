@@ -5,6 +5,8 @@ from typing import Optional, cast
 
 from django.conf import settings
 from django.contrib.postgres.fields.array import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.files.base import ContentFile
 from django.db import models
 from django.db.models import Index, Q, UniqueConstraint
@@ -279,6 +281,12 @@ class DatasetRevision(
     requestor_ref = models.CharField(
         _("Requestor ref to access the resource, if any"), max_length=255, blank=True
     )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        help_text="The text searched for published revisions, see "
+        "transit_odp.organisation.search",
+    )
 
     objects = DatasetRevisionManager()
     tracker = FieldTracker()
@@ -300,7 +308,13 @@ class DatasetRevision(
                 name="organisation_datasetrevision_unique_draft_revision",
             ),
         ]
-        indexes = [Index(fields=["is_published"])]
+        indexes = [
+            Index(fields=["is_published"]),
+            GinIndex(
+                fields=["search_vector"],
+                name="organisation_revision_search",
+            ),
+        ]
 
     def __str__(self):
         return f"id={self.id}, dataset_id={self.dataset_id}, name={self.name}"
@@ -668,37 +668,24 @@ class DatasetQuerySet(models.QuerySet):
 
     def search(self, keywords):
         """Searches the dataset and live_revision using keywords"""
-        from transit_odp.organisation.models import DatasetRevision
-
-        # The important part is to ensure no duplicate datasets are returned due
-        # to search over this many-to-many
-        # TODO - add expression indexes to AdminArea name for efficient icontains
-        # search, e.g. `CREATE INDEX admin_area_lower_email ON admin_area(upper(name));`
-        fares_icontains = Q(
-            metadata__faresmetadata__stops__admin_area__name__icontains=keywords
-        )
-        timetables_icontains = Q(admin_areas__name__icontains=keywords)
-        revisions = (
-            DatasetRevision.objects.get_live_revisions()
-            .filter(timetables_icontains | fares_icontains)
-            .order_by("id")
-            .distinct("id")
-            .values("id")
+        from transit_odp.organisation.models import Organisation
+        from transit_odp.organisation.search import (
+            BROWSE_SEARCH_WEIGHTS,
+            get_search_query,
         )
 
-        location_contains_keywords = Q(live_revision__in=revisions)
-        desc_contains_keywords = Q(live_revision__description__icontains=keywords)
-        org_name_contains_keywords = Q(organisation__name__icontains=keywords)
-        noc_contains_keywords = Q(organisation__nocs__noc__icontains=keywords)
-
-        qs = self.filter(
-            location_contains_keywords
-            | desc_contains_keywords
-            | org_name_contains_keywords
-            | noc_contains_keywords
-        ).distinct()
+        # Searched with subqueries rather than joins so no duplicate datasets
+        # are returned from the many-to-many with nocs
+        orgs_with_noc = Organisation.objects.filter(nocs__noc__icontains=keywords)
+        keywords_filter = Q(organisation__name__icontains=keywords) | Q(
+            organisation__in=orgs_with_noc.values("id")
+        )
+        # Description and location are searched in the search vector
+        query = get_search_query(keywords, BROWSE_SEARCH_WEIGHTS)
+        if query is not None:
+            keywords_filter |= Q(live_revision__search_vector=query)
 
-        return qs
+        return self.filter(keywords_filter)
 
     def get_remote(self):
         # Note we only want to consider the live_revision's data when determining if
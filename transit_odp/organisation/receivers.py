@@ -1,8 +1,9 @@
 import logging
 
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_save
 from django.dispatch import receiver
 
+from transit_odp.fares.models import FaresMetadata
 from transit_odp.notifications import get_notifications
 from transit_odp.organisation.models import (
     ConsumerStats,
@@ -22,6 +23,7 @@ from transit_odp.organisation.signals import (
     feed_monitor_fail_first_try,
     revision_publish,
 )
+from transit_odp.organisation.search import update_search_vectors
 
 logger = logging.getLogger(__name__)
 client = get_notifications()
@@ -37,6 +39,43 @@ def update_live_revision(sender, instance: DatasetRevision, **kwargs):
         dataset.save()
 
 
+@receiver(post_save, sender=DatasetRevision)
+def update_revision_search_vector(
+    sender, instance: DatasetRevision, created=False, **kwargs
+):
+    searched_fields = ("is_published", "name", "description")
+    if not instance.is_published:
+        return
+    if created or any(instance.tracker.has_changed(f) for f in searched_fields):
+        update_search_vectors([instance.id])
+
+
+@receiver(m2m_changed, sender=DatasetRevision.admin_areas.through)
+def update_search_vector_on_admin_areas(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        revisions = DatasetRevision.objects.filter(id=instance.id)
+    elif pk_set:
+        revisions = DatasetRevision.objects.filter(id__in=pk_set)
+    else:
+        return
+    revisions = revisions.filter(is_published=True)
+    update_search_vectors(revisions.values_list("id", flat=True))
+
+
+@receiver(m2m_changed, sender=FaresMetadata.stops.through)
+def update_search_vector_on_fares_stops(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear") or reverse:
+        return
+    revisions = DatasetRevision.objects.filter(
+        id=instance.revision_id, is_published=True
+    )
+    update_search_vectors(revisions.values_list("id", flat=True))
+
+
 @receiver(feed_monitor_fail_first_try)
 def feed_monitor_fail_first_try_handler(sender, dataset: Dataset, **kwargs):
     logger.debug(
@@ -0,0 +1,148 @@
+"""Full-text search of published datasets.
+
+Each published DatasetRevision has a `search_vector` built from its text with a
+weight per source, so a search can be limited to the sources it has always
+looked at:
+
+    A - the name of the revision
+    B - the description of the revision
+    C - the names of the admin areas of a timetable
+    D - the names of the admin areas of the stops of a fares dataset
+
+Keywords are matched as a phrase of word prefixes, "bus sta" finds
+"Bus Station", which is as close as a word index gets to the `icontains`
+lookups it replaces.
+"""
+import re
+from typing import Iterable, Optional
+
+from django.apps import apps
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+
+SEARCH_CONFIG = "simple"
+# Weights searched by the API and by the browse pages
+API_SEARCH_WEIGHTS = "ABC"
+BROWSE_SEARCH_WEIGHTS = "BCD"
+
+TERM_PATTERN = re.compile(r"[^\W_]+")
+
+UPDATE_SEARCH_VECTOR_SQL = """
+UPDATE {revision} AS revision
+SET search_vector =
+    setweight(to_tsvector(%(config)s, revision.name), 'A')
+    || setweight(to_tsvector(%(config)s, revision.description), 'B')
+    || setweight(
+        to_tsvector(
+            %(config)s,
+            coalesce(
+                (
+                    SELECT string_agg(admin_area.name, ' ')
+                    FROM {revision_admin_areas} AS revision_admin_area
+                    JOIN {admin_area} AS admin_area
+                        ON admin_area.id = revision_admin_area.adminarea_id
+                    WHERE revision_admin_area.datasetrevision_id = revision.id
+                ),
+                ''
+            )
+        ),
+        'C'
+    )
+    || setweight(
+        to_tsvector(
+            %(config)s,
+            coalesce(
+                (
+                    SELECT string_agg(DISTINCT admin_area.name, ' ')
+                    FROM {metadata} AS metadata
+                    JOIN {fares_stops} AS fares_stop
+                        ON fares_stop.faresmetadata_id = metadata.id
+                    JOIN {stop_point} AS stop_point
+                        ON stop_point.id = fares_stop.stoppoint_id
+                    JOIN {admin_area} AS admin_area
+                        ON admin_area.id = stop_point.admin_area_id
+                    WHERE metadata.revision_id = revision.id
+                ),
+                ''
+            )
+        ),
+        'D'
+    )
+WHERE revision.id = ANY(%(ids)s)
+"""
+
+
+def get_search_query(keywords: str, weights: str) -> Optional[SearchQuery]:
+    """
+    Returns a query matching `keywords` in the parts of the search vector
+    with `weights`, None if there are no words in `keywords`.
+    """
+    terms = TERM_PATTERN.findall(keywords)
+    if not terms:
+        return None
+    query = " <-> ".join(f"{term}:*{weights}" for term in terms)
+    return SearchQuery(query, config=SEARCH_CONFIG, search_type="raw")
+
+
+def get_update_search_vector_sql() -> str:
+    """
+    Returns the SQL to build the search vector of the revisions with the ids
+    in the `ids` parameter.
+    """
+    get_model = apps.get_model
+    revision = get_model("organisation", "DatasetRevision")
+    fares_metadata = get_model("fares", "FaresMetadata")
+    return UPDATE_SEARCH_VECTOR_SQL.format(
+        revision=revision._meta.db_table,
+        revision_admin_areas=revision.admin_areas.through._meta.db_table,
+        admin_area=get_model("naptan", "AdminArea")._meta.db_table,
+        metadata=get_model("organisation", "DatasetMetadata")._meta.db_table,
+        fares_stops=fares_metadata.stops.through._meta.db_table,
+        stop_point=get_model("naptan", "StopPoint")._meta.db_table,
+    )
+
+
+def update_search_vectors(revision_ids: Iterable[int]) -> None:
+    """
+    Builds the search vector of the revisions with `revision_ids`.
+    """
+    revision_ids = list(revision_ids)
+    if not revision_ids:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            get_update_search_vector_sql(),
+            {"config": SEARCH_CONFIG, "ids": revision_ids},
+        )
+
+
+def update_search_vectors_of_admin_areas(admin_area_ids: Iterable[int]) -> None:
+    """
+    Builds the search vector of the published revisions that have the names of
+    the admin areas with `admin_area_ids` in it.
+    """
+    admin_area_ids = list(admin_area_ids)
+    revisions = apps.get_model("organisation", "DatasetRevision").objects.filter(
+        is_published=True
+    )
+    revision_ids = set(
+        revisions.filter(admin_areas__in=admin_area_ids).values_list("id", flat=True)
+    )
+    revision_ids.update(
+        revisions.filter(
+            metadata__faresmetadata__stops__admin_area_id__in=admin_area_ids
+        ).values_list("id", flat=True)
+    )
+    update_search_vectors(revision_ids)
+
+
+def update_search_vectors_of_stops(stop_ids: Iterable[int]) -> None:
+    """
+    Builds the search vector of the published fares revisions with the stops
+    with `stop_ids`, after the admin areas of the stops changed.
+    """
+    revisions = apps.get_model("organisation", "DatasetRevision").objects.filter(
+        is_published=True, metadata__faresmetadata__stops__in=list(stop_ids)
+    )
+    update_search_vectors(set(revisions.values_list("id", flat=True)))
@@ -0,0 +1,76 @@
+import pytest
+
+from transit_odp.fares.factories import FaresMetadataFactory
+from transit_odp.naptan.factories import AdminAreaFactory, StopPointFactory
+from transit_odp.organisation.factories import DatasetFactory, DatasetRevisionFactory
+from transit_odp.organisation.models import Dataset, DatasetRevision
+from transit_odp.organisation.search import (
+    API_SEARCH_WEIGHTS,
+    BROWSE_SEARCH_WEIGHTS,
+    get_search_query,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+def search(keywords, weights=API_SEARCH_WEIGHTS):
+    query = get_search_query(keywords, weights)
+    return list(
+        DatasetRevision.objects.filter(search_vector=query).values_list("id", flat=True)
+    )
+
+
+@pytest.mark.parametrize("keywords", ["", "  ", "--", "_"])
+def test_get_search_query_without_words(keywords):
+    assert get_search_query(keywords, API_SEARCH_WEIGHTS) is None
+
+
+def test_search_vector_is_built_on_publish():
+    dataset = DatasetFactory(live_revision=None)
+    revision = DatasetRevisionFactory(
+        dataset=dataset,
+        name="Northern Routes",
+        description="Services to the Bus Station",
+        is_published=False,
+    )
+    assert search("Northern") == []
+
+    revision.publish()
+    assert search("Northern") == [revision.id]
+    assert search("bus sta") == [revision.id]
+    assert search("station bus") == []
+
+    revision.description = "Park and ride"
+    revision.save()
+    assert search("park RIDE") == [revision.id]
+    assert search("bus") == []
+
+
+def test_search_vector_includes_locations():
+    admin_area = AdminAreaFactory(name="Zyxbridge")
+    timetable = DatasetRevisionFactory(admin_areas=[admin_area], is_published=True)
+    fares = DatasetRevisionFactory(is_published=True)
+    FaresMetadataFactory(
+        revision=fares, stops=[StopPointFactory(admin_area=admin_area)]
+    )
+
+    assert search("zyx", API_SEARCH_WEIGHTS) == [timetable.id]
+    assert sorted(search("zyx", BROWSE_SEARCH_WEIGHTS)) == sorted(
+        [timetable.id, fares.id]
+    )
+
+    timetable.admin_areas.clear()
+    assert search("zyx", BROWSE_SEARCH_WEIGHTS) == [fares.id]
+
+
+def test_search_returns_each_dataset_once():
+    admin_areas = [AdminAreaFactory(name=name) for name in ["Leeds", "Leeds East"]]
+    dataset = DatasetFactory(live_revision=None)
+    DatasetRevisionFactory(
+        dataset=dataset,
+        description="Leeds services",
+        admin_areas=admin_areas,
+        is_published=True,
+    )
+
+    assert list(Dataset.objects.search("Leeds")) == [dataset]
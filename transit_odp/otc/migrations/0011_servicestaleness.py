@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("organisation", "0058_auto_20230113_1621"),
+        ("otc", "0010_inactiveservice"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ServiceStaleness",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "staleness_42_day_look_ahead",
+                    models.BooleanField(default=False),
+                ),
+                ("staleness_12_months_old", models.BooleanField(default=False)),
+                ("staleness_otc", models.BooleanField(default=False)),
+                ("requires_attention", models.BooleanField(default=True)),
+                ("evaluated", models.DateField()),
+                (
+                    "organisation",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="organisation.organisation",
+                    ),
+                ),
+                (
+                    "service",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="staleness",
+                        to="otc.service",
+                    ),
+                ),
+                (
+                    "txc_file_attributes",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="organisation.txcfileattributes",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="servicestaleness",
+            constraint=models.UniqueConstraint(
+                fields=("service", "organisation"),
+                name="unique_service_staleness_organisation",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="servicestaleness",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("organisation__isnull", True)),
+                fields=("service",),
+                name="unique_service_staleness_lta",
+            ),
+        ),
+    ]
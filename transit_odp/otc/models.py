@@ -124,3 +124,62 @@ class InactiveService(models.Model):
     )
     registration_status = models.CharField(max_length=20, blank=True, null=False)
     effective_date = models.DateField(null=True)
+
+
+class ServiceStaleness(models.Model):
+    """Whether an OTC Service requires attention, evaluated against the live
+    timetables of `organisation`, or against the live timetables of every
+    organisation when `organisation` is null, as they are for a Local Authority.
+
+    The rows are refreshed when a timetable is published, the OTC data is
+    refreshed and once a day, see `transit_odp.publish.requires_attention`.
+    """
+
+    service = models.ForeignKey(
+        Service, on_delete=models.CASCADE, related_name="staleness"
+    )
+    organisation = models.ForeignKey(
+        "organisation.Organisation",
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+    )
+    # The live TXC file of the service, null if it isn't published
+    txc_file_attributes = models.ForeignKey(
+        "organisation.TXCFileAttributes",
+        on_delete=models.CASCADE,
+        null=True,
+        related_name="+",
+    )
+    staleness_42_day_look_ahead = models.BooleanField(default=False)
+    staleness_12_months_old = models.BooleanField(default=False)
+    staleness_otc = models.BooleanField(default=False)
+    requires_attention = models.BooleanField(default=True)
+    evaluated = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["service", "organisation"],
+                name="unique_service_staleness_organisation",
+            ),
+            models.UniqueConstraint(
+                fields=["service"],
+                condition=models.Q(organisation__isnull=True),
+                name="unique_service_staleness_lta",
+            ),
+        ]
+
+    def get_staleness(self) -> tuple:
+        """
+        Returns the staleness of the service in the order of `evaluate_staleness`.
+        """
+        return (
+            self.staleness_42_day_look_ahead,
+            self.staleness_12_months_old,
+            self.staleness_otc,
+        )
+
+    @property
+    def is_stale(self) -> bool:
+        return any(self.get_staleness())
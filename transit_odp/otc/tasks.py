@@ -3,10 +3,12 @@ from logging import getLogger
 
 from celery import shared_task
 
+from transit_odp.data_quality.pti.lookups import service_code_lookup
 from transit_odp.otc.loaders import Loader
 from transit_odp.otc.registry import Registry
 from transit_odp.otc.populate_lta import PopulateLTA
 from transit_odp.otc.loaderslta import LoaderLTA
+from transit_odp.publish.requires_attention import refresh_service_staleness
 
 logger = getLogger(__name__)
 
@@ -16,6 +18,8 @@ def task_refresh_otc_data():
     registry = Registry()
     loader = Loader(registry)
     loader.load()
+    service_code_lookup.invalidate()
+    refresh_service_staleness()
 
 
 @shared_task()
@@ -23,6 +27,8 @@ def task_get_all_otc_data():
     registry = Registry()
     loader = Loader(registry)
     loader.load_into_fresh_database()
+    service_code_lookup.invalidate()
+    refresh_service_staleness()
 
 
 @shared_task(ignore_errors=True)
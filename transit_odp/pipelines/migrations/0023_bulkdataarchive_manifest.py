@@ -0,0 +1,23 @@
+# Generated by Django 3.2.20 on 2023-10-16 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pipelines", "0022_alter_datasetetltaskresult_error_code"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bulkdataarchive",
+            name="manifest",
+            field=models.JSONField(
+                blank=True,
+                null=True,
+                verbose_name=(
+                    "The dataset, live revision and zip member offset of each dataset"
+                ),
+            ),
+        ),
+    ]
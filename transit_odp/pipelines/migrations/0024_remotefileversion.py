@@ -0,0 +1,54 @@
+# Generated by Django 3.2.20 on 2023-10-30 10:15
+
+import django_extensions.db.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pipelines", "0023_bulkdataarchive_manifest"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RemoteFileVersion",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created",
+                    django_extensions.db.fields.CreationDateTimeField(
+                        auto_now_add=True, verbose_name="created"
+                    ),
+                ),
+                (
+                    "modified",
+                    django_extensions.db.fields.ModificationDateTimeField(
+                        auto_now=True, verbose_name="modified"
+                    ),
+                ),
+                ("url", models.URLField(max_length=500, unique=True)),
+                ("etag", models.CharField(blank=True, max_length=255)),
+                (
+                    "last_modified",
+                    models.CharField(
+                        blank=True,
+                        help_text="The Last-Modified header of the file",
+                        max_length=255,
+                    ),
+                ),
+                ("checksum", models.CharField(blank=True, max_length=40)),
+            ],
+            options={
+                "get_latest_by": "modified",
+                "abstract": False,
+            },
+        ),
+    ]
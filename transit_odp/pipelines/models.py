@@ -302,6 +302,11 @@ class BulkDataArchive(models.Model):
         choices=TravelineRegions.choices,
         default=TravelineRegions.ALL.value,
     )
+    manifest = models.JSONField(
+        _("The dataset, live revision and zip member offset of each dataset"),
+        null=True,
+        blank=True,
+    )
 
     class Meta:
         get_latest_by = "-created"
@@ -351,3 +356,17 @@ class SchemaDefinition(TimeStampedModel):
         self.schema = ContentFile(content, name)
         self.checksum = sha1sum(content)
         self.save()
+
+
+class RemoteFileVersion(TimeStampedModel):
+    """The version of a remote file last loaded by a pipeline, e.g. NaPTAN."""
+
+    url = models.URLField(unique=True, max_length=500)
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.CharField(
+        max_length=255, blank=True, help_text="The Last-Modified header of the file"
+    )
+    checksum = models.CharField(max_length=40, blank=True)
+
+    def __str__(self):
+        return f"RemoteFileVersion(url={self.url!r}, checksum={self.checksum!r})"
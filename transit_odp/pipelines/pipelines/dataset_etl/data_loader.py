@@ -19,7 +19,6 @@ from transit_odp.transmodel.models import (
     Service,
     ServiceLink,
     ServicePattern,
-    ServicePatternStop,
 )
 
 from .utils.dataframes import (
@@ -30,6 +29,7 @@ from .utils.dataframes import (
     get_max_date_or_none,
     get_min_date_or_none,
 )
+from .utils.loaders import add_service_pattern_to_service_pattern_stops
 
 logger = get_task_logger(__name__)
 
@@ -281,23 +281,7 @@ class DataLoader:
     def add_service_pattern_to_service_pattern_stops(
         cls, df: pd.DataFrame, service_patterns: pd.DataFrame
     ):
-        def _inner():
-            for record in df.to_dict("records"):
-                service_pattern_id = service_patterns.xs(
-                    record["service_pattern_id"], level="service_pattern_id"
-                ).iloc[0]["id"]
-                yield ServicePatternStop(
-                    service_pattern_id=service_pattern_id,
-                    sequence_number=record["order"],
-                    naptan_stop_id=record["naptan_id"],
-                    atco_code=record["stop_atco"],
-                )
-
-        stops = list(_inner())
-        if stops:
-            return ServicePatternStop.objects.bulk_create(stops)
-        else:
-            return None
+        return add_service_pattern_to_service_pattern_stops(df, service_patterns)
 
     def create_feed_name(
         self, most_common_district, first_service_start, no_of_lines, lines
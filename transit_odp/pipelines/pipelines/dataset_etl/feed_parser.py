@@ -26,7 +26,7 @@ from transit_odp.timetables.extract import (
     TransXChangeExtractor,
     TransXChangeZipExtractor,
 )
-from transit_odp.timetables.loaders import TransXChangeDataLoader
+from transit_odp.timetables.loaders import get_loader_class
 from transit_odp.timetables.transformers import TransXChangeTransformer
 from transit_odp.transmodel.models import Service, ServiceLink
 
@@ -153,7 +153,7 @@ class FeedParser(ETLUtility):
 
     def load(self, transformed: TransformedData) -> ETLReport:
         logger.info("Begin load step")
-        loader = TransXChangeDataLoader(
+        loader = get_loader_class()(
             transformed,
             self.service_cache,
             self.service_link_cache,
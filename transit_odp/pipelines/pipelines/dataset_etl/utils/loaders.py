@@ -1,6 +1,12 @@
 """ loaders.py utility functions for loading data into the BODS database."""
+import csv
+import io
 import logging
-from collections import namedtuple
+from typing import Iterable, List
+
+import pandas as pd
+from django.contrib.gis.geos import GEOSGeometry
+from django.db import connection, transaction
 
 from transit_odp.organisation.models import DatasetRevision
 from transit_odp.transmodel.models import Service, ServicePattern, ServicePatternStop
@@ -9,25 +15,136 @@ logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 2000
 
+# The marker of NULL values in the data written with COPY
+NULL = r"\N"
+
+SERVICE_ASSOCIATION_COLUMNS = ["service_id", "servicepattern_id"]
+LOCALITY_COLUMNS = ["servicepattern_id", "locality_id"]
+ADMIN_AREA_COLUMNS = ["servicepattern_id", "adminarea_id"]
+SERVICE_PATTERN_STOP_COLUMNS = [
+    "service_pattern_id",
+    "sequence_number",
+    "naptan_stop_id",
+    "atco_code",
+]
+
+
+def to_copy_value(value):
+    """Returns a value in the form it is written with COPY."""
+    if isinstance(value, (list, tuple)):
+        elements = (
+            '"' + str(element).replace("\\", "\\\\").replace('"', '\\"') + '"'
+            for element in value
+        )
+        return "{" + ",".join(elements) + "}"
+    if isinstance(value, GEOSGeometry):
+        return value.hexewkb.decode()
+    if value is None or pd.isna(value):
+        return NULL
+    if isinstance(value, float) and value.is_integer():
+        # Ids are floats in the columns of frames with missing values
+        return int(value)
+    return value
+
+
+def copy_rows(model, columns: List[str], rows: Iterable[tuple]) -> int:
+    """Writes `rows` of the `columns` of `model` into its table with COPY.
 
-def add_service_associations(services, service_patterns):
-    through_model = Service.service_patterns.through
+    Args:
+        model: The model of the table, a through model for m2m tables.
+        columns: The names of the columns in each row.
+        rows: The rows to write.
 
-    def _inner(df):
-        for record in df[["id_service", "id_service_pattern"]].to_dict("records"):
-            yield through_model(
-                service_id=record["id_service"],
-                servicepattern_id=record["id_service_pattern"],
-            )
+    Returns:
+        The number of rows written.
 
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        writer.writerow([to_copy_value(value) for value in row])
+        count += 1
+    if not count:
+        return 0
+
+    buffer.seek(0)
+    quote_name = connection.ops.quote_name
+    table = quote_name(model._meta.db_table)
+    names = ", ".join(quote_name(column) for column in columns)
+    with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table} ({names}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+            buffer,
+        )
+    return count
+
+
+def allocate_ids(model, count: int) -> List[int]:
+    """Returns `count` ids taken from the sequence of the primary key of `model`,
+    so rows copied with them can be referenced before they are written."""
+    if not count:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) "
+            "FROM generate_series(1, %s)",
+            [model._meta.db_table, model._meta.pk.column, count],
+        )
+        return sorted(id_ for (id_,) in cursor.fetchall())
+
+
+def get_service_association_rows(services, service_patterns):
+    """Returns the (service_id, servicepattern_id) of each ServicePattern of a
+    Service."""
     service_to_service_patterns = services[["id"]].merge(
         service_patterns.reset_index()[["file_id", "service_code", "id"]],
         left_index=True,
         right_on=["file_id", "service_code"],
         suffixes=["_service", "_service_pattern"],
     )
+    return list(
+        service_to_service_patterns[["id_service", "id_service_pattern"]].itertuples(
+            index=False, name=None
+        )
+    )
+
+
+def add_service_associations(services, service_patterns):
+    through_model = Service.service_patterns.through
+    rows = get_service_association_rows(services, service_patterns)
+    return through_model.objects.bulk_create(
+        through_model(service_id=service_id, servicepattern_id=service_pattern_id)
+        for service_id, service_pattern_id in rows
+    )
+
+
+def copy_service_associations(services, service_patterns):
+    """Copies the links between Services and ServicePatterns into the database."""
+    rows = get_service_association_rows(services, service_patterns)
+    copy_rows(Service.service_patterns.through, SERVICE_ASSOCIATION_COLUMNS, rows)
+
+
+def get_locality_rows(dataframe):
+    """Returns the distinct (servicepattern_id, locality_id) of the `localities`
+    of each ServicePattern in `dataframe`."""
+    localities = set()
+    for record in dataframe.to_dict("records"):
+        for locality_id in record["localities"]:
+            if locality_id and locality_id != "None":
+                localities.add((record["id"], locality_id))
+    return localities
+
 
-    return through_model.objects.bulk_create(_inner(service_to_service_patterns))
+def get_admin_area_rows(dataframe):
+    """Returns the distinct (servicepattern_id, adminarea_id) of the
+    `admin_area_codes` of each ServicePattern in `dataframe`."""
+    areas = set()
+    for record in dataframe.to_dict("records"):
+        for area_id in record["admin_area_codes"]:
+            if area_id:
+                areas.add((record["id"], area_id))
+    return areas
 
 
 def add_service_pattern_to_localities(dataframe):
@@ -41,19 +158,25 @@ def add_service_pattern_to_localities(dataframe):
 
     """
     logger.info("Adding service pattern to localities.")
-    Locality = namedtuple("Locality", "servicepattern_id,locality_id")
     LocalityThrough = ServicePattern.localities.through
-    localities = []
-    for record in dataframe.to_dict("records"):
-        for locality_id in record["localities"]:
-            if locality_id and locality_id != "None":
-                localities.append(Locality(record["id"], locality_id))
-
-    localities = set(localities)
-    localities = [LocalityThrough(**locality._asdict()) for locality in localities]
+    localities = [
+        LocalityThrough(servicepattern_id=service_pattern_id, locality_id=locality_id)
+        for service_pattern_id, locality_id in get_locality_rows(dataframe)
+    ]
     LocalityThrough.objects.bulk_create(localities, batch_size=BATCH_SIZE)
 
 
+def copy_service_pattern_to_localities(dataframe):
+    """Copies the links between ServicePattern objects and Localitys into the
+    database, see `add_service_pattern_to_localities`."""
+    logger.info("Copying service pattern to localities.")
+    copy_rows(
+        ServicePattern.localities.through,
+        LOCALITY_COLUMNS,
+        get_locality_rows(dataframe),
+    )
+
+
 def add_service_pattern_to_admin_area(dataframe):
     """Creates links between ServicePattern objects and AdminAreas.
 
@@ -66,19 +189,25 @@ def add_service_pattern_to_admin_area(dataframe):
     """
 
     logger.info("Adding service pattern to admin areas.")
-    AdminArea = namedtuple("AdminArea", "servicepattern_id,adminarea_id")
     AdminAreaThrough = ServicePattern.admin_areas.through
-    areas = []
-    for record in dataframe.to_dict("records"):
-        for area_id in record["admin_area_codes"]:
-            if area_id:
-                areas.append(AdminArea(record["id"], area_id))
-
-    areas = set(areas)
-    areas = [AdminAreaThrough(**area._asdict()) for area in areas]
+    areas = [
+        AdminAreaThrough(servicepattern_id=service_pattern_id, adminarea_id=area_id)
+        for service_pattern_id, area_id in get_admin_area_rows(dataframe)
+    ]
     AdminAreaThrough.objects.bulk_create(areas, batch_size=BATCH_SIZE)
 
 
+def copy_service_pattern_to_admin_area(dataframe):
+    """Copies the links between ServicePattern objects and AdminAreas into the
+    database, see `add_service_pattern_to_admin_area`."""
+    logger.info("Copying service pattern to admin areas.")
+    copy_rows(
+        ServicePattern.admin_areas.through,
+        ADMIN_AREA_COLUMNS,
+        get_admin_area_rows(dataframe),
+    )
+
+
 def add_service_pattern_to_localities_and_admin_area(df):
     # Get implicit through-table for m2m
     locality_through_model = ServicePattern.localities.through
@@ -124,24 +253,92 @@ def add_service_pattern_to_localities_and_admin_area(df):
     return localities, admin_areas
 
 
+def get_service_pattern_ids(service_patterns):
+    """Returns the database id of each service_pattern_id in `service_patterns`.
+
+    Args:
+        service_patterns: Pandas DataFrame of created ServicePatterns, with a
+            `service_pattern_id` index level and an `id` column.
+
+    Returns:
+        A Series of ids indexed by service_pattern_id.
+
+    """
+    ids = service_patterns.reset_index()[["service_pattern_id", "id"]]
+    # The first ServicePattern is used where a service_pattern_id is repeated
+    ids = ids.drop_duplicates("service_pattern_id")
+    return ids.set_index("service_pattern_id")["id"]
+
+
+def _to_list(series):
+    """Returns the values of a Series as Python objects, with None for NaN."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def get_service_pattern_stop_rows(df, service_patterns):
+    """Returns the (service_pattern_id, sequence_number, naptan_stop_id,
+    atco_code) of each stop in `df`, with the database id of its ServicePattern.
+    """
+    service_pattern_ids = df["service_pattern_id"].map(
+        get_service_pattern_ids(service_patterns)
+    )
+    return zip(
+        _to_list(service_pattern_ids),
+        _to_list(df["order"]),
+        _to_list(df["naptan_id"]),
+        _to_list(df["stop_atco"]),
+    )
+
+
 def add_service_pattern_to_service_pattern_stops(df, service_patterns):
+    """Creates the ServicePatternStops of the created ServicePatterns.
+
+    Args:
+        df: Pandas DataFrame of stops with a `service_pattern_id`, `order`,
+            `naptan_id` and `stop_atco`.
+        service_patterns: Pandas DataFrame of created ServicePatterns.
+
+    Returns:
+        The created ServicePatternStops, None if there are no stops.
+
+    """
     logger.info("Adding service_pattern to service pattern stops")
+    if df.empty:
+        return None
+
+    stops = [
+        ServicePatternStop(
+            service_pattern_id=service_pattern_id,
+            sequence_number=sequence_number,
+            naptan_stop_id=naptan_stop_id,
+            atco_code=atco_code,
+        )
+        for (
+            service_pattern_id,
+            sequence_number,
+            naptan_stop_id,
+            atco_code,
+        ) in get_service_pattern_stop_rows(df, service_patterns)
+    ]
+    return ServicePatternStop.objects.bulk_create(stops, batch_size=BATCH_SIZE)
+
+
+def copy_service_pattern_stops(df, service_patterns):
+    """Copies the ServicePatternStops of the created ServicePatterns into the
+    database, see `add_service_pattern_to_service_pattern_stops`.
 
-    def _inner():
-        for record in df.to_dict("records"):
-            service_pattern_id = service_patterns.xs(
-                record["service_pattern_id"], level="service_pattern_id"
-            ).iloc[0]["id"]
-            yield ServicePatternStop(
-                service_pattern_id=service_pattern_id,
-                sequence_number=record["order"],
-                naptan_stop_id=record["naptan_id"],
-                atco_code=record["stop_atco"],
-            )
-
-    stops = list(_inner())
-    if stops:
-        return ServicePatternStop.objects.bulk_create(stops, batch_size=BATCH_SIZE)
+    Returns:
+        The number of ServicePatternStops copied.
+
+    """
+    logger.info("Copying service pattern stops")
+    if df.empty:
+        return 0
+    return copy_rows(
+        ServicePatternStop,
+        SERVICE_PATTERN_STOP_COLUMNS,
+        get_service_pattern_stop_rows(df, service_patterns),
+    )
 
 
 def create_feed_name(
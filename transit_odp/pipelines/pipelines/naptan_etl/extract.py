@@ -1,26 +1,30 @@
+import hashlib
 import os
 import shutil
+from http import HTTPStatus
 from pathlib import Path
+from typing import Dict, Tuple
 
 import pandas as pd
 import requests
 from celery.utils.log import get_task_logger
 from django.conf import settings
 from lxml import etree as ET
-from requests import RequestException
 
 from transit_odp.common.loggers import LoaderAdapter
-from transit_odp.naptan.dataclasses import StopPoint
-from transit_odp.naptan.dataclasses.nptg import NationalPublicTransportGazetteer
+from transit_odp.naptan.dataclasses.naptan import transformer
+from transit_odp.pipelines.models import RemoteFileVersion
 
 ns = "http://www.naptan.org.uk/"
 namespace = {"naptan": ns}
 
-CHUNK_SIZE = 2000
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = 60
 
 DISK_PATH_FOR_NAPTAN_ZIP = "/tmp/NaptanStops.zip"
 
 DISK_PATH_FOR_NAPTAN_FOLDER = "/tmp/NaptanStops/"
+DISK_PATH_FOR_NAPTAN_XML = "/tmp/NaptanStops/Naptan.xml"
 DISK_PATH_FOR_NPTG_FOLDER = "/tmp/NPTG/"
 DISK_PATH_FOR_NPTG = "/tmp/NPTG.xml"
 
@@ -28,97 +32,215 @@ logger = get_task_logger(__name__)
 logger = LoaderAdapter("NaPTANLoader", logger)
 
 
-def get_latest_naptan_xml():
-    naptan_url = settings.NAPTAN_IMPORT_URL
-    logger.info(f"Loading NaPTAN file from {naptan_url}.")
-    xml_file_path = None
-
-    try:
-        response = requests.get(naptan_url)
-    except RequestException as exc:
-        logger.error(f"Unable to fetch NaPTAN data from {naptan_url}.", exc_info=exc)
-        return xml_file_path
-
-    try:
-        logger.info("Writing NaPTAN response data to a file on disk.")
-        if response.status_code == 200:
-            dir_path = Path(DISK_PATH_FOR_NAPTAN_FOLDER)
-            if not dir_path.exists():
-                dir_path.mkdir(parents=True, exist_ok=True)
-
-            filepath = dir_path / "Naptan.xml"
-            with filepath.open("wb") as f:
-                for chunk in response.iter_content(CHUNK_SIZE):
+class RemoteFile:
+    """
+    A NaPTAN or NPTG file that is only downloaded when it has changed since the
+    version in its RemoteFileVersion.
+
+    Conditional requests are sent with the ETag and Last-Modified of the
+    version, and files sent anyway are compared with its checksum.
+    """
+
+    def __init__(self, url: str, path: str):
+        self.url = url
+        self.path = Path(path)
+        self.version, _ = RemoteFileVersion.objects.get_or_create(url=url)
+        self.is_downloaded = False
+        self.etag = ""
+        self.last_modified = ""
+        self.checksum = ""
+
+    def get_conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.version.etag:
+            headers["If-None-Match"] = self.version.etag
+        if self.version.last_modified:
+            headers["If-Modified-Since"] = self.version.last_modified
+        return headers
+
+    def download(self, conditional: bool = True) -> bool:
+        """
+        Downloads the file to `path`, unless it is unchanged and the request is
+        `conditional`.
+
+        Returns True if the file has changed since the version.
+        """
+        headers = self.get_conditional_headers() if conditional else {}
+        logger.info(f"Downloading {self.url}.")
+        with requests.get(
+            self.url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
+            if response.status_code == HTTPStatus.NOT_MODIFIED:
+                logger.info(f"{self.url} is not modified.")
+                return False
+            response.raise_for_status()
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            checksum = hashlib.sha1()
+            with self.path.open("wb") as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
                     f.write(chunk)
+                    checksum.update(chunk)
+
+        self.is_downloaded = True
+        self.etag = response.headers.get("ETag", "")
+        self.last_modified = response.headers.get("Last-Modified", "")
+        self.checksum = checksum.hexdigest()
+        logger.info(f"Finished writing {self.url} to {self.path}.")
+
+        if self.checksum == self.version.checksum:
+            logger.info(f"{self.url} has the same content as the last load.")
+            return False
+        return True
+
+    def save_version(self) -> None:
+        """Records the downloaded file as the version that has been loaded."""
+        if not self.is_downloaded:
+            return
+        self.version.etag = self.etag
+        self.version.last_modified = self.last_modified
+        self.version.checksum = self.checksum
+        self.version.save()
+
+
+def get_remote_files() -> Tuple[RemoteFile, RemoteFile]:
+    return (
+        RemoteFile(settings.NAPTAN_IMPORT_URL, DISK_PATH_FOR_NAPTAN_XML),
+        RemoteFile(settings.NPTG_IMPORT_URL, DISK_PATH_FOR_NPTG),
+    )
 
-            logger.info("Finished NaPTAN writing to file on disk.")
-            for filename in os.listdir(DISK_PATH_FOR_NAPTAN_FOLDER):
-                if filename.endswith(".xml"):
-                    xml_file_path = os.path.join(DISK_PATH_FOR_NAPTAN_FOLDER, filename)
-    except Exception as exc:
-        logger.error("Exception while getting NaPTAN data.", exc_info=exc)
-
-    logger.info("NaPTAN file successfully extracted to disk.")
-    return xml_file_path
-
-
-def get_latest_nptg():
-    nptg_url = settings.NPTG_IMPORT_URL
-    logger.info(f"Loading NPTG from {nptg_url}.")
-    xml_file_path = None
-    try:
-        response = requests.get(nptg_url)
-        logger.info("Writing NPTG response data to a file on disk.")
-        if response.status_code == 200:
-            with open(DISK_PATH_FOR_NPTG, "wb") as f:
-                for chunk in response.iter_content(CHUNK_SIZE):
-                    f.write(chunk)
-            logger.info("Finished NPTG writing to file on disk.")
-            xml_file_path = DISK_PATH_FOR_NPTG
-
-    except Exception as e:
-        logger.warning("Exception while getting NPTG data.", exc_info=e)
 
-    logger.info("NPTG file successfully extracted to disk.")
-    return xml_file_path
+def _tag(*names):
+    return "/".join(f"{{{ns}}}{name}" for name in names)
+
+
+def iter_elements(xml_file_path, tag):
+    """
+    Yields the `tag` elements of a NaPTAN or NPTG file as it is parsed.
+
+    Each element is cleared, and removed from its parent, once the next one is
+    read so only one is held in memory at a time.
+    """
+    context = ET.iterparse(str(xml_file_path), events=("end",), tag=_tag(tag))
+    for _, element in context:
+        yield element
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+    del context
+
+
+def iter_batches(rows, columns, batch_size):
+    """
+    Yields the tuples in `rows` as DataFrames of `batch_size` rows.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield pd.DataFrame.from_records(batch, columns=columns)
+            batch = []
+    if batch:
+        yield pd.DataFrame.from_records(batch, columns=columns)
+
+
+STOP_COLUMNS = [
+    "atco_code",
+    "naptan_code",
+    "common_name",
+    "indicator",
+    "street",
+    "locality_id",
+    "admin_area_id",
+    "latitude",
+    "longitude",
+    "stop_areas",
+]
+# The columns read from the file, the location is converted in batches
+STOP_FILE_COLUMNS = STOP_COLUMNS[:7] + ["easting", "northing", "stop_areas"]
+STOP_BATCH_SIZE = 20000
+STOP_REQUIRED_COLUMNS = ["common_name", "locality_id", "admin_area_id"]
+
+# The elements of a StopPoint read into each of the `STOP_FILE_COLUMNS`
+STOP_FIELD_TAGS = [
+    _tag(name)
+    for name in [
+        "AtcoCode",
+        "NaptanCode",
+        "CommonName",
+        "Indicator",
+        "Street",
+        "NptgLocalityRef",
+        "AdministrativeAreaRef",
+        "Easting",
+        "Northing",
+    ]
+]
+STOP_AREA_REF = _tag("StopAreaRef")
+# The easting and northing of a Translation come after those of its Location and
+# are used in their place, as in `Location.from_xml`
+STOP_LOCATION_TAGS = {_tag("Easting"), _tag("Northing")}
+
+
+def iter_stop_rows(xml_file_path):
+    """
+    Yields the `STOP_FILE_COLUMNS` of each StopPoint in a NaPTAN file.
+
+    The fields are read in a single pass over the elements of the stop, which
+    is several times faster than a `findtext` for each of them. The first
+    element of each tag is used, the Descriptor and Place of a stop come before
+    its AlternativeDescriptors and alternative localities.
+    """
+    for stop in iter_elements(xml_file_path, "StopPoint"):
+        fields = {}
+        stop_areas = []
+        for element in stop.iter(*STOP_FIELD_TAGS, STOP_AREA_REF):
+            tag = element.tag
+            if tag == STOP_AREA_REF:
+                stop_areas.append(element.text)
+            elif tag not in fields or tag in STOP_LOCATION_TAGS:
+                fields[tag] = element.text
+        yield (*(fields.get(tag) for tag in STOP_FIELD_TAGS), stop_areas)
+
+
+def transform_stop_batch(df):
+    """
+    Converts the eastings and northings of a batch of stops to latitudes and
+    longitudes and the admin area refs to ids.
+    """
+    df = df.dropna(subset=["atco_code"])
+    invalid = df[STOP_REQUIRED_COLUMNS + ["easting", "northing"]].isna().any(axis=1)
+    if invalid.any():
+        logger.warning(
+            f"{invalid.sum()} StopPoints without a name, locality, admin area or "
+            f"location dropped. Sample of dropped rows:\n{df[invalid].head()}"
+        )
+        df = df[~invalid]
 
+    latitude, longitude = transformer.transform(
+        df["easting"].astype(float).to_numpy(),
+        df["northing"].astype(float).to_numpy(),
+    )
+    df = df.assign(
+        admin_area_id=df["admin_area_id"].astype(int),
+        latitude=latitude,
+        longitude=longitude,
+    )
+    return df[STOP_COLUMNS]
 
-def extract_stops(xml_file_path):
-    def inner():
-        logger.info(f"Extracting NaPTAN stops from file {xml_file_path}.")
-        tree = ET.parse(xml_file_path)
 
-        stop_point_path = "//naptan:StopPoints/naptan:StopPoint"
-        for stop in tree.iterfind(stop_point_path, namespaces=namespace):
-            point = StopPoint.from_xml(stop)
-            yield {
-                "atco_code": point.atco_code,
-                "naptan_code": point.naptan_code,
-                "common_name": point.descriptor.common_name,
-                "indicator": point.descriptor.indicator,
-                "street": point.descriptor.street,
-                "locality_id": point.place.nptg_locality_ref,
-                "admin_area_id": int(point.administrative_area_ref),
-                "latitude": point.place.location.translation.latitude,
-                "longitude": point.place.location.translation.longitude,
-                "stop_areas": point.stop_areas,
-            }
-
-    df = pd.DataFrame(
-        inner(),
-        columns=[
-            "atco_code",
-            "naptan_code",
-            "common_name",
-            "indicator",
-            "street",
-            "locality_id",
-            "admin_area_id",
-            "latitude",
-            "longitude",
-            "stop_areas",
-        ],
-    )
+def extract_stops(xml_file_path, batch_size=STOP_BATCH_SIZE):
+    logger.info(f"Extracting NaPTAN stops from file {xml_file_path}.")
+    batches = [
+        transform_stop_batch(batch)
+        for batch in iter_batches(
+            iter_stop_rows(xml_file_path), STOP_FILE_COLUMNS, batch_size
+        )
+    ]
+    if batches:
+        df = pd.concat(batches, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=STOP_COLUMNS)
     logger.info(f"A total of {len(df)} NaPTAN stops extracted.")
 
     duplicated = df["atco_code"].duplicated(keep="first")
@@ -137,21 +259,19 @@ def extract_stops(xml_file_path):
 
 
 def extract_admin_areas(xml_file_path):
+    region_code_path = _tag("RegionCode")
+
     def inner():
         logger.info(f"Extracting NPTG AdminAreas from {xml_file_path}.")
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        nptg = NationalPublicTransportGazetteer.from_xml(root)
-
-        for region in nptg.regions:
-            region_code = region.region_code
-            for area in region.administrative_areas:
-                yield {
-                    "id": int(area.administrative_area_code),
-                    "name": area.name,
-                    "traveline_region_id": region_code,
-                    "atco_code": area.atco_area_code,
-                }
+        for area in iter_elements(xml_file_path, "AdministrativeArea"):
+            # AdministrativeArea is in Region/AdministrativeAreas
+            region = area.getparent().getparent()
+            yield {
+                "id": int(area.findtext(_tag("AdministrativeAreaCode"))),
+                "name": area.findtext(_tag("Name")),
+                "traveline_region_id": region.findtext(region_code_path),
+                "atco_code": area.findtext(_tag("AtcoAreaCode")),
+            }
 
     df = pd.DataFrame(
         inner(),
@@ -164,20 +284,18 @@ def extract_admin_areas(xml_file_path):
 
 def extract_localities(xml_file_path):
     logger.info(f"Extracting NPTG Localities from {xml_file_path}.")
+    easting = _tag("Location", "Translation", "Easting")
+    northing = _tag("Location", "Translation", "Northing")
 
     def inner():
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        nptg = NationalPublicTransportGazetteer.from_xml(root)
-
-        for locality in nptg.nptg_localities:
+        for locality in iter_elements(xml_file_path, "NptgLocality"):
             yield {
-                "gazetteer_id": locality.nptg_locality_code,
-                "name": locality.descriptor.locality_name,
-                "easting": locality.location.translation.easting,
-                "northing": locality.location.translation.northing,
-                "district_id": int(locality.nptg_district_ref),
-                "admin_area_id": int(locality.administrative_area_ref),
+                "gazetteer_id": locality.findtext(_tag("NptgLocalityCode")),
+                "name": locality.findtext(_tag("Descriptor", "LocalityName")),
+                "easting": int(locality.findtext(easting)),
+                "northing": int(locality.findtext(northing)),
+                "district_id": int(locality.findtext(_tag("NptgDistrictRef"))),
+                "admin_area_id": int(locality.findtext(_tag("AdministrativeAreaRef"))),
             }
 
     df = pd.DataFrame(
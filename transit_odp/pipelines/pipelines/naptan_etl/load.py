@@ -1,140 +1,202 @@
+"""Loading of NaPTAN and NPTG data into the database.
+
+Each extracted frame is copied into a temporary staging table and upserted in a
+single statement. Rows that are already up to date aren't written, which is
+almost all of them on a typical night. The search vectors of the published
+revisions are rebuilt when the admin area names they contain change.
+"""
+import io
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+import pandas as pd
 from celery.utils.log import get_task_logger
-from django.contrib.gis.geos import Point
+from django.db import connection, transaction
 
 from transit_odp.common.loggers import LoaderAdapter
 from transit_odp.naptan.models import AdminArea, Locality, StopPoint
+from transit_odp.organisation.search import (
+    update_search_vectors_of_admin_areas,
+    update_search_vectors_of_stops,
+)
 
 logger = get_task_logger(__name__)
 logger = LoaderAdapter("NaPTANLoader", logger)
 
+NULL = r"\N"
+
+# The columns of the staging tables and their types
+STOP_STAGING_COLUMNS = {
+    "atco_code": "varchar(255)",
+    "naptan_code": "varchar(12)",
+    "common_name": "varchar(255)",
+    "indicator": "varchar(255)",
+    "street": "varchar(255)",
+    "locality_id": "varchar(8)",
+    "admin_area_id": "integer",
+    "latitude": "double precision",
+    "longitude": "double precision",
+    "stop_areas": "varchar(255)[]",
+}
+ADMIN_AREA_STAGING_COLUMNS = {
+    "id": "integer",
+    "name": "varchar(255)",
+    "traveline_region_id": "varchar(255)",
+    "atco_code": "varchar(255)",
+}
+LOCALITY_STAGING_COLUMNS = {
+    "gazetteer_id": "varchar(8)",
+    "name": "varchar(255)",
+    "easting": "integer",
+    "northing": "integer",
+    "admin_area_id": "integer",
+}
+
+# The columns loaded from the staging tables, with the expression of each
+STOP_COLUMNS = {
+    "atco_code": "atco_code",
+    "naptan_code": "naptan_code",
+    "common_name": "common_name",
+    "indicator": "indicator",
+    "street": "street",
+    "locality_id": "locality_id",
+    "admin_area_id": "admin_area_id",
+    "location": "ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)",
+    "stop_areas": "stop_areas",
+}
+ADMIN_AREA_COLUMNS = {
+    column: column for column in ["id", "name", "traveline_region_id", "atco_code"]
+}
+LOCALITY_COLUMNS = {
+    column: column
+    for column in ["gazetteer_id", "name", "easting", "northing", "admin_area_id"]
+}
+
+# The column of each model that the search vectors of revisions are built from,
+# with the function rebuilding the search vectors from the ids of changed rows
+SEARCHED_COLUMNS: Dict[type, Tuple[str, Callable[[List[int]], None]]] = {
+    AdminArea: ("name", update_search_vectors_of_admin_areas),
+    StopPoint: ("admin_area_id", update_search_vectors_of_stops),
+}
+
+
+class LoadResult(NamedTuple):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+def to_array_literal(values) -> str:
+    """Returns a list of strings as a Postgres array literal."""
+    elements = (
+        '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values
+    )
+    return "{" + ",".join(elements) + "}"
+
+
+def copy_to_staging(cursor, table: str, df: pd.DataFrame, columns: Dict[str, str]):
+    """
+    Copies the `columns` of `df` into a new temporary `table`.
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {table}")
+    definition = ", ".join(f"{name} {type_}" for name, type_ in columns.items())
+    cursor.execute(f"CREATE TEMPORARY TABLE {table} ({definition}) ON COMMIT DROP")
+
+    buffer = io.StringIO()
+    df[list(columns)].to_csv(buffer, index=False, header=False, na_rep=NULL)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} FROM STDIN WITH (FORMAT csv, NULL '{NULL}')", buffer
+    )
 
-def load_new_stops(new_stops):
-    logger.info(f"Loading {len(new_stops)} new NaPTAN StopPoints.")
-    stops_list = []
-    for row in new_stops.itertuples():
-        stops_list.append(
-            StopPoint(
-                atco_code=row.Index,
-                naptan_code=row.naptan_code,
-                common_name=row.common_name,
-                indicator=row.indicator,
-                street=row.street,
-                locality_id=row.locality_id,
-                admin_area_id=row.admin_area_id,
-                location=Point(
-                    x=float(row.longitude), y=float(row.latitude), srid=4326
-                ),
-                stop_areas=row.stop_areas,
-            )
-        )
 
-    StopPoint.objects.bulk_create(stops_list, batch_size=5000)
-    logger.info("Finished loading new StopPoints.")
-
-
-def load_existing_stops(existing_stops):
-    logger.info("Loading existing NaPTAN stops.")
-    for row in existing_stops.itertuples():
-        obj = row.obj
-        obj.atco_code = row.Index
-        obj.naptan_code = row.naptan_code
-        obj.common_name = row.common_name
-        obj.indicator = row.indicator
-        obj.street = row.street
-        obj.locality_id = row.locality_id
-        obj.admin_area_id = int(row.admin_area_id)
-        obj.location = Point(x=float(row.longitude), y=float(row.latitude), srid=4326)
-        obj.stop_areas = row.stop_areas
-
-    StopPoint.objects.bulk_update(
-        existing_stops["obj"],
-        (
-            "atco_code",
-            "naptan_code",
-            "common_name",
-            "indicator",
-            "street",
-            "locality_id",
-            "admin_area_id",
-            "location",
-            "stop_areas",
-        ),
-        batch_size=5000,
+def get_changed_ids(
+    cursor, table: str, staging: str, key: str, column: str
+) -> List[int]:
+    """
+    Returns the ids of the rows of `table` whose `column` differs from the row
+    with the same `key` in `staging`.
+    """
+    cursor.execute(
+        f"SELECT {table}.id FROM {table} "
+        f"JOIN {staging} ON {staging}.{key} = {table}.{key} "
+        f"WHERE {table}.{column} IS DISTINCT FROM {staging}.{column}"
     )
-    logger.info(f"Finished loading {len(existing_stops)} existing NaPTAN stops.")
-
-
-def load_new_admin_areas(new_admin_areas):
-    logger.info("[load_new_admin_areas]: Started")
-    admin_areas_list = []
-    for row in new_admin_areas.itertuples():
-        admin_areas_list.append(
-            AdminArea(
-                id=int(row.Index),
-                name=row.name,
-                traveline_region_id=row.traveline_region_id,
-                atco_code=row.atco_code,
-            )
-        )
-
-    AdminArea.objects.bulk_create(admin_areas_list, batch_size=100)
-    logger.info("[load_new_admin_areas]: Finished")
-
-
-def load_existing_admin_areas(existing_admin_areas):
-    logger.info("[load_existing_admin_areas]: Started")
-    for row in existing_admin_areas.itertuples():
-        obj = row.obj
-        obj.id = int(row.Index)
-        obj.name = row.name
-        obj.traveline_region_id = row.traveline_region_id
-        obj.atco_code = row.atco_code
-
-    AdminArea.objects.bulk_update(
-        existing_admin_areas["obj"],
-        (
-            "name",
-            "traveline_region_id",
-            "atco_code",
-        ),
-        batch_size=100,
+    return [id_ for (id_,) in cursor.fetchall()]
+
+
+def upsert_from_staging(
+    cursor, table: str, staging: str, key: str, columns: Dict[str, str], total: int
+) -> LoadResult:
+    """
+    Inserts the `total` rows of `staging` into `table` and updates the rows of
+    `table` that differ from them.
+    """
+    names = list(columns)
+    updated_names = [name for name in names if name != key]
+
+    def compared(prefix, name):
+        # The = of PostGIS 2 compares the bounding boxes of geometries
+        if name == "location":
+            return f"ST_AsBinary({prefix}.{name})"
+        return f"{prefix}.{name}"
+
+    target = ", ".join(compared(table, name) for name in updated_names)
+    excluded = ", ".join(compared("EXCLUDED", name) for name in updated_names)
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(names)}) "
+        f"SELECT {', '.join(columns.values())} FROM {staging} "
+        f"ON CONFLICT ({key}) DO UPDATE SET "
+        + ", ".join(f"{name} = EXCLUDED.{name}" for name in updated_names)
+        + f" WHERE ({target}) IS DISTINCT FROM ({excluded}) "
+        # xmax is 0 for inserted rows
+        "RETURNING xmax = 0"
     )
-    logger.info("[load_existing_admin_areas]: Finished")
-
-
-def load_new_localities(new_localities):
-    logger.info("[load_new_localities]: Started")
-    localities_list = []
-    for row in new_localities.itertuples():
-        localities_list.append(
-            Locality(
-                gazetteer_id=row.Index,
-                name=row.name,
-                easting=row.easting,
-                northing=row.northing,
-                # district_id=int(row.district_id),
-                admin_area_id=int(row.admin_area_id),
-            )
+    written = [inserted for (inserted,) in cursor.fetchall()]
+    inserted = sum(written)
+    updated = len(written) - inserted
+    return LoadResult(inserted, updated, total - inserted - updated)
+
+
+def load_frame(
+    df: pd.DataFrame,
+    model,
+    staging_columns: Dict[str, str],
+    columns: Dict[str, str],
+) -> LoadResult:
+    table = model._meta.db_table
+    staging = f"staging_{table}"
+    key = next(iter(columns))
+    searched_column, update_search_vectors = SEARCHED_COLUMNS.get(model, (None, None))
+    with transaction.atomic(), connection.cursor() as cursor:
+        copy_to_staging(cursor, staging, df.reset_index(), staging_columns)
+        changed_ids = []
+        if searched_column is not None:
+            changed_ids = get_changed_ids(cursor, table, staging, key, searched_column)
+        result = upsert_from_staging(
+            cursor, table, staging, key, columns, total=len(df)
         )
+        if changed_ids:
+            update_search_vectors(changed_ids)
+    logger.info(
+        f"{model.__name__}s loaded: {result.inserted} inserted, {result.updated} "
+        f"updated and {result.unchanged} unchanged."
+    )
+    return result
+
+
+def load_stops(stops: pd.DataFrame) -> LoadResult:
+    logger.info(f"Loading {len(stops)} NaPTAN StopPoints.")
+    stops = stops.assign(stop_areas=stops["stop_areas"].map(to_array_literal))
+    return load_frame(stops, StopPoint, STOP_STAGING_COLUMNS, STOP_COLUMNS)
 
-    Locality.objects.bulk_create(localities_list, batch_size=5000)
-    logger.info("[load_new_localities]: Finished")
-
-
-def load_existing_localities(existing_localities):
-    logger.info("[load_existing_localities]: Started")
-    for row in existing_localities.itertuples():
-        obj = row.obj
-        obj.gazetteer_id = row.Index
-        obj.name = row.name
-        obj.easting = row.easting
-        obj.northing = row.northing
-        # obj.district_id = int(row.district_id)
-        obj.admin_area_id = int(row.admin_area_id)
-
-    Locality.objects.bulk_update(
-        existing_localities["obj"],
-        ("name", "easting", "northing", "district_id", "admin_area_id"),
-        batch_size=5000,
+
+def load_admin_areas(admin_areas: pd.DataFrame) -> LoadResult:
+    logger.info(f"Loading {len(admin_areas)} NPTG AdminAreas.")
+    return load_frame(
+        admin_areas, AdminArea, ADMIN_AREA_STAGING_COLUMNS, ADMIN_AREA_COLUMNS
     )
-    logger.info("[load_existing_localities]: Finished")
+
+
+def load_localities(localities: pd.DataFrame) -> LoadResult:
+    logger.info(f"Loading {len(localities)} NPTG Localities.")
+    return load_frame(localities, Locality, LOCALITY_STAGING_COLUMNS, LOCALITY_COLUMNS)
@@ -6,26 +6,16 @@ from transit_odp.pipelines.pipelines.naptan_etl.extract import (
     extract_admin_areas,
     extract_localities,
     extract_stops,
-    get_latest_naptan_xml,
-    get_latest_nptg,
+    get_remote_files,
 )
 from transit_odp.pipelines.pipelines.naptan_etl.load import (
-    load_existing_admin_areas,
-    load_existing_localities,
-    load_existing_stops,
-    load_new_admin_areas,
-    load_new_localities,
-    load_new_stops,
+    load_admin_areas,
+    load_localities,
+    load_stops,
 )
 from transit_odp.pipelines.pipelines.naptan_etl.transform import (
     drop_stops_with_invalid_admin_areas,
     drop_stops_with_invalid_localities,
-    extract_admin_areas_from_db,
-    extract_districts_from_db,
-    extract_localities_from_db,
-    extract_stops_from_db,
-    get_existing_data,
-    get_new_data,
 )
 
 logger = get_task_logger(__name__)
@@ -35,45 +25,37 @@ logger = LoaderAdapter("NaPTANLoader", logger)
 def run():
     logger.info("Running NaPTAN loading pipeline.")
 
-    naptan_file_path = get_latest_naptan_xml()
-    nptg_file_path = get_latest_nptg()
+    naptan_file, nptg_file = files = get_remote_files()
+    # Both files are requested even if the first has changed
+    changed = [file.download() for file in files]
+    if not any(changed):
+        logger.info("NaPTAN and NPTG are unchanged since the last load.")
+        # Files sent with the same content can have a new ETag and Last-Modified
+        for file in files:
+            file.save_version()
+        cleanup()
+        return
 
-    stops_naptan = extract_stops(naptan_file_path)
+    # Stops are checked against the NPTG, so both files are needed to load either
+    for file in files:
+        if not file.is_downloaded:
+            file.download(conditional=False)
 
-    admin_areas_naptan = extract_admin_areas(nptg_file_path)
-    localities_naptan = extract_localities(nptg_file_path)
+    stops_naptan = extract_stops(naptan_file.path)
+
+    admin_areas_naptan = extract_admin_areas(nptg_file.path)
+    localities_naptan = extract_localities(nptg_file.path)
 
     stops_naptan = drop_stops_with_invalid_admin_areas(stops_naptan, admin_areas_naptan)
     stops_naptan = drop_stops_with_invalid_localities(stops_naptan, localities_naptan)
-    # Extract all data from DB
-    stops_from_db = extract_stops_from_db()
-    admin_areas_from_db = extract_admin_areas_from_db()
-    extract_districts_from_db()
-    localities_from_db = extract_localities_from_db()
-
-    # Transform
-    new_stops = get_new_data(stops_naptan, stops_from_db)
-    existing_stops = get_existing_data(stops_naptan, stops_from_db, "atco_code")
-    new_admin_areas = get_new_data(admin_areas_naptan, admin_areas_from_db)
-    existing_admin_areas = get_existing_data(
-        admin_areas_naptan, admin_areas_from_db, "id"
-    )
-    new_localities = get_new_data(localities_naptan, localities_from_db)
-    existing_localities = get_existing_data(
-        localities_naptan, localities_from_db, "gazetteer_id"
-    )
-
-    logger.info(f"[naptan_etl: run]: New admin_areas {len(new_admin_areas)} found")
-    load_new_admin_areas(new_admin_areas)
-    load_existing_admin_areas(existing_admin_areas)
 
-    logger.info(f"[naptan_etl: run]: New localities {len(new_localities)} found")
-    load_new_localities(new_localities)
-    load_existing_localities(existing_localities)
+    # Only the rows that have changed are written
+    load_admin_areas(admin_areas_naptan)
+    load_localities(localities_naptan)
+    load_stops(stops_naptan)
 
-    logger.info(f"[naptan_etl: run]: New stops {len(new_stops)} found")
-    load_new_stops(new_stops)
-    load_existing_stops(existing_stops)
+    for file in files:
+        file.save_version()
 
     cleanup()
     logger.info("[run] finished")
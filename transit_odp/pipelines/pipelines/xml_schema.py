@@ -1,7 +1,9 @@
+import fcntl
 import logging
+from contextlib import contextmanager
 from functools import cached_property
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from zipfile import ZipFile
 
 import requests
@@ -13,6 +15,8 @@ from transit_odp.pipelines.constants import SCHEMA_DIR
 from transit_odp.pipelines.models import SchemaDefinition
 
 TIMEOUT = 30
+CHECKSUM_FILENAME = ".checksum"
+LOCK_FILENAME = ".lock"
 logger = logging.getLogger(__name__)
 
 
@@ -81,31 +85,61 @@ class SchemaLoader:
         self._schema_dir: str = SCHEMA_DIR
 
     @property
-    def path(self) -> Path:
+    def directory(self) -> Path:
+        return Path(self._schema_dir) / self.definition.category
+
+    @contextmanager
+    def locked(self, operation: int = fcntl.LOCK_SH):
         """
-        Returns path of main XSD file for use in schema validation.
-        If the path doesnt exist in the local filesystem it is re acquired
+        Holds a lock on the extracted files, which are shared by every process
+        on the host. The files are only extracted under an exclusive lock so
+        they are never read while they're being rewritten.
         """
-        directory = Path(self._schema_dir) / self.definition.category
+        directory = self.directory
         if not directory.exists():
-            directory.mkdir(parents=True)
+            directory.mkdir(parents=True, exist_ok=True)
             logger.info(f"Directory {directory} created")
 
+        with (directory / LOCK_FILENAME).open("a") as lock:
+            fcntl.flock(lock, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _extract(self, directory: Path) -> None:
+        with ZipFile(self.definition.schema) as zin:
+            for filepath in zin.namelist():
+                # Not sure why this is necessary but the netex zip triggers
+                # zip bomb warning and a couple of examples cant be extracted
+                # This is probably fine because these are known zip files from
+                # DfT
+                try:
+                    zin.extract(filepath, directory)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not extract {filepath} - {e}")
+                    # We probably want to fail the pipeline if there are any other
+                    # exceptions
+        (directory / CHECKSUM_FILENAME).write_text(self.definition.checksum)
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns path of main XSD file for use in schema validation.
+        If the path doesnt exist in the local filesystem it is re acquired
+        """
+        directory = self.directory
         path = directory / self._path
+        checksum_path = directory / CHECKSUM_FILENAME
 
-        if not path.exists():
-            with ZipFile(self.definition.schema) as zin:
-                for filepath in zin.namelist():
-                    # Not sure why this is necessary but the netex zip triggers
-                    # zip bomb warning and a couple of examples cant be extracted
-                    # This is probably fine because these are known zip files from
-                    # DfT
-                    try:
-                        zin.extract(filepath, directory)
-                    except (OSError, ValueError) as e:
-                        logger.warning(f"Could not extract {filepath} - {e}")
-                        # We probably want to fail the pipeline if there are any other
-                        # exceptions
+        with self.locked(fcntl.LOCK_EX):
+            # The definition may have been updated since it was last extracted
+            is_current = (
+                checksum_path.exists()
+                and checksum_path.read_text() == self.definition.checksum
+            )
+            if not path.exists() or not is_current:
+                self._extract(directory)
 
         return path
 
@@ -114,6 +148,47 @@ class SchemaLoader:
         """
         Return a complete XSD XMLSchema object
         """
-        with self.path.open("r") as f:
+        path = self.path
+        # The XSDs a schema includes are read as it's compiled
+        with self.locked(fcntl.LOCK_SH), path.open("r") as f:
             doc = etree.parse(f)
             return etree.XMLSchema(doc)
+
+
+class SchemaRegistry:
+    """
+    Process-wide cache of compiled XSD schemas.
+
+    Compiling a schema (NeTEx in particular) takes several seconds so each
+    SchemaDefinition is only compiled once per process. Compiled schemas are
+    keyed by the checksum of the definition, if the definition is updated the
+    schema is recompiled the next time it is requested.
+    """
+
+    def __init__(self):
+        self._schemas: Dict[str, Tuple[str, etree.XMLSchema]] = {}
+
+    def get_schema(self, category: str, xsd_path: str) -> etree.XMLSchema:
+        """
+        Returns the compiled XMLSchema for the SchemaDefinition with `category`.
+        """
+        definition = SchemaDefinition.objects.get(category=category)
+        key = f"{definition.checksum}:{xsd_path}"
+
+        cached = self._schemas.get(category)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        logger.info(f"Compiling {category} schema {xsd_path}.")
+        schema = SchemaLoader(definition, xsd_path).schema
+        self._schemas[category] = (key, schema)
+        return schema
+
+    def clear(self) -> None:
+        """
+        Removes all the compiled schemas.
+        """
+        self._schemas.clear()
+
+
+schema_registry = SchemaRegistry()
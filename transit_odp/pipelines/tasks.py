@@ -3,12 +3,13 @@ from collections import namedtuple
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
+from transit_odp.data_quality.pti.lookups import stop_area_lookup
 from transit_odp.data_quality.tasks import run_dqs_monitoring
 from transit_odp.fares.netex import NETEX_SCHEMA_ZIP_URL
 from transit_odp.pipelines.constants import SchemaCategory
 from transit_odp.pipelines.models import SchemaDefinition
 from transit_odp.pipelines.pipelines.naptan_etl import main
-from transit_odp.pipelines.pipelines.xml_schema import SchemaUpdater
+from transit_odp.pipelines.pipelines.xml_schema import SchemaUpdater, schema_registry
 from transit_odp.timetables.constants import TXC_SCHEMA_ZIP_URL
 
 logger = get_task_logger(__name__)
@@ -25,6 +26,7 @@ def task_dqs_monitor():
 @shared_task(ignore_result=True)
 def task_run_naptan_etl():
     main.run()
+    stop_area_lookup.invalidate()
 
 
 @shared_task
@@ -37,3 +39,6 @@ def task_update_xsd_zip_cache():
         definition, _ = SchemaDefinition.objects.get_or_create(category=detail.category)
         schema = SchemaUpdater(definition, detail.url)
         schema.update_definition()
+
+    # Other processes recompile when they see the new checksum
+    schema_registry.clear()
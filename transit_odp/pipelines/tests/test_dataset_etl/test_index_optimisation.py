@@ -2,7 +2,7 @@ import datetime
 import os
 
 from django.core.files import File
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from transit_odp.naptan.factories import (
     AdminAreaFactory,
@@ -21,7 +21,7 @@ from transit_odp.pipelines.tests.test_dataset_etl.helpers import (
     create_naptan_stops,
 )
 from transit_odp.timetables.etl import TransXChangePipeline
-from transit_odp.transmodel.models import ServicePatternStop
+from transit_odp.transmodel.models import ServicePattern, ServicePatternStop
 
 
 class IndexOptimisationTestCase(TestCase):
@@ -190,6 +190,50 @@ class IndexOptimisationTestCase(TestCase):
             ).count(),
         )
 
+    @override_settings(TXC_LOAD_WITH_COPY=True)
+    def test_overall_indexing_zip_multiple_files_with_copy(self):
+        file = os.path.join(self.cur_dir, "data/2lines.zip")
+        revision = DatasetRevisionFactory(
+            is_published=False, status=FeedStatus.pending.value
+        )
+        revision.associate_file(file)
+        revision.save()
+
+        feed_progress = DatasetETLTaskResultFactory.create(revision=revision)
+        self.feed_parser = FeedParser(revision, feed_progress)
+        self.pipeline = TransXChangePipeline(revision)
+        localities = create_naptan_localities(
+            self.feed_parser,
+            File(file, name="test_file"),
+            self.admin_area,
+            self.district,
+        )
+        create_naptan_stops(
+            self.feed_parser, File(file, name="test_file"), localities, self.admin_area
+        )
+
+        self.pipeline.run()
+
+        self.assertEqual(2, revision.num_of_lines)
+        self.assertEqual(
+            "2099-04-13T23:59:00+00:00", revision.first_expiring_service.isoformat()
+        )
+        self.assertEqual(1, revision.admin_areas.count())
+        self.assertEqual(2, revision.services.count())
+        self.assertEqual(3, revision.localities.count())
+        self.assertEqual(4, revision.service_patterns.count())
+        self.assertEqual(
+            21,
+            ServicePatternStop.objects.filter(
+                service_pattern__revision=revision
+            ).count(),
+        )
+        service_patterns = ServicePattern.objects.filter(revision=revision)
+        for service_pattern in service_patterns.filter(geom__isnull=False):
+            self.assertEqual(4326, service_pattern.geom.srid)
+        for service_pattern in service_patterns:
+            self.assertEqual(1, service_pattern.services.count())
+
     def test_overall_indexing_xml_transxchangeparser(self):
         file = os.path.join(self.cur_dir, "data/NW_01_ANW_2_1.xml")
         revision = DatasetRevisionFactory(
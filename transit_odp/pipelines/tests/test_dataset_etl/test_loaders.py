@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+from transit_odp.pipelines.pipelines.dataset_etl.utils.loaders import (
+    NULL,
+    add_service_pattern_to_service_pattern_stops,
+    copy_service_pattern_stops,
+    get_service_pattern_ids,
+    to_copy_value,
+)
+from transit_odp.transmodel.factories import ServicePatternFactory
+from transit_odp.transmodel.models import ServicePatternStop
+
+
+def make_service_patterns(ids):
+    return pd.DataFrame(
+        {
+            "file_id": ["file1", "file1", "file2"],
+            "service_pattern_id": ["PB01-1", "PB01-2", "PB01-1"],
+            "id": ids,
+        }
+    ).set_index(["file_id", "service_pattern_id"])
+
+
+def test_get_service_pattern_ids_uses_first_service_pattern():
+    ids = get_service_pattern_ids(make_service_patterns([10, 11, 12]))
+    assert ids.to_dict() == {"PB01-1": 10, "PB01-2": 11}
+
+
+@pytest.mark.django_db
+def test_add_service_pattern_to_service_pattern_stops():
+    first, second, duplicate = ServicePatternFactory.create_batch(3)
+    service_patterns = make_service_patterns([first.id, second.id, duplicate.id])
+    df = pd.DataFrame(
+        {
+            "service_pattern_id": ["PB01-1", "PB01-1", "PB01-2"],
+            "order": [0, 1, 0],
+            "naptan_id": [None, None, None],
+            "stop_atco": ["0100000001", "0100000002", "0100000003"],
+        }
+    )
+
+    stops = add_service_pattern_to_service_pattern_stops(df, service_patterns)
+
+    assert [
+        (stop.service_pattern_id, stop.sequence_number, stop.atco_code)
+        for stop in stops
+    ] == [
+        (first.id, 0, "0100000001"),
+        (first.id, 1, "0100000002"),
+        (second.id, 0, "0100000003"),
+    ]
+    assert first.service_pattern_stops.count() == 2
+    assert duplicate.service_pattern_stops.count() == 0
+
+
+def test_add_service_pattern_to_service_pattern_stops_without_stops():
+    df = pd.DataFrame(columns=["service_pattern_id", "order", "naptan_id", "stop_atco"])
+    service_patterns = make_service_patterns([1, 2, 3])
+    assert add_service_pattern_to_service_pattern_stops(df, service_patterns) is None
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, NULL),
+        (float("nan"), NULL),
+        (12.0, 12),
+        ("", ""),
+        (["1", 'Line "2"'], '{"1","Line \\"2\\""}'),
+    ],
+)
+def test_to_copy_value(value, expected):
+    assert to_copy_value(value) == expected
+
+
+@pytest.mark.django_db
+def test_copy_service_pattern_stops():
+    first, second, duplicate = ServicePatternFactory.create_batch(3)
+    service_patterns = make_service_patterns([first.id, second.id, duplicate.id])
+    df = pd.DataFrame(
+        {
+            "service_pattern_id": ["PB01-1", "PB01-1", "PB01-2"],
+            "order": [0, 1, 0],
+            "naptan_id": [None, None, None],
+            "stop_atco": ["0100000001", "0100000002", "0100000003"],
+        }
+    )
+
+    assert copy_service_pattern_stops(df, service_patterns) == 3
+    stops = ServicePatternStop.objects.order_by("atco_code").values_list(
+        "service_pattern_id", "sequence_number", "naptan_stop_id", "atco_code"
+    )
+    assert list(stops) == [
+        (first.id, 0, None, "0100000001"),
+        (first.id, 1, None, "0100000002"),
+        (second.id, 0, None, "0100000003"),
+    ]
@@ -53,6 +53,21 @@ class TestNaptanNptgExtract(TestCase):
 
         self.assertTrue(check_frame_equal(actual_stops, expected_stops))
 
+    def test_extract_stops_in_batches(self):
+        stops = extract_stops(self.naptan_path, batch_size=1)
+
+        assert stops.index.tolist() == ["010000001", "010000002"]
+        stop = stops.loc["010000001"]
+        assert stop["naptan_code"] == "bstpgit"
+        assert stop["common_name"] == "Cassell Road"
+        assert stop["indicator"] == "SW-bound"
+        assert stop["street"] == "Downend Road"
+        assert stop["locality_id"] == "E0035604"
+        assert stop["admin_area_id"] == 9
+        assert stop["latitude"] == pytest.approx(51.484333, abs=1e-4)
+        assert stop["longitude"] == pytest.approx(-2.517014, abs=1e-4)
+        assert stop["stop_areas"] == []
+
     def test_extract_admin_areas(self):
         # Test
         actual_admin_areas = extract_admin_areas(self.nptg_path)
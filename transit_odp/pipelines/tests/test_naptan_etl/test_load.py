@@ -8,14 +8,16 @@ from transit_odp.naptan.factories import (
     LocalityFactory,
     StopPointFactory,
 )
+from transit_odp.fares.factories import FaresMetadataFactory
 from transit_odp.naptan.models import AdminArea, Locality, StopPoint
+from transit_odp.organisation.factories import DatasetRevisionFactory
+from transit_odp.organisation.models import DatasetRevision
+from transit_odp.organisation.search import BROWSE_SEARCH_WEIGHTS, get_search_query
 from transit_odp.pipelines.pipelines.naptan_etl.load import (
-    load_existing_admin_areas,
-    load_existing_localities,
-    load_existing_stops,
-    load_new_admin_areas,
-    load_new_localities,
-    load_new_stops,
+    LoadResult,
+    load_admin_areas,
+    load_localities,
+    load_stops,
 )
 
 
@@ -42,9 +44,10 @@ class TestNaptanLoad(TestCase):
         ).set_index("atco_code")
 
         # Test
-        load_new_stops(new_stops)
+        result = load_stops(new_stops)
 
         # Assert
+        self.assertEqual(result, LoadResult(1, 0, 0))
         created_stop = StopPoint.objects.all()[0]
 
         self.assertEqual(len(StopPoint.objects.all()), 1)
@@ -65,7 +68,7 @@ class TestNaptanLoad(TestCase):
         # Setup
         admin_area = AdminAreaFactory(id=9, atco_code="123")
         locality = LocalityFactory(gazetteer_id="E0035604")
-        stop = StopPointFactory(
+        StopPointFactory(
             admin_area=admin_area,
             locality=locality,
             atco_code="010000001",
@@ -85,15 +88,15 @@ class TestNaptanLoad(TestCase):
                     "latitude": "51.4843326109",
                     "longitude": "-2.51701423067",
                     "stop_areas": ["stop1"],
-                    "obj": stop,
                 },
             ]
         ).set_index("atco_code")
 
         # Test
-        load_existing_stops(existing_stops)
+        result = load_stops(existing_stops)
 
         # Assert
+        self.assertEqual(result, LoadResult(0, 1, 0))
         updated_stop = StopPoint.objects.all()[0]
 
         self.assertEqual(len(StopPoint.objects.all()), 1)
@@ -124,9 +127,10 @@ class TestNaptanLoad(TestCase):
         ).set_index("id")
 
         # Test
-        load_new_admin_areas(new_admin_areas)
+        result = load_admin_areas(new_admin_areas)
 
         # Assert
+        self.assertEqual(result, LoadResult(1, 0, 0))
         created_admin_area = AdminArea.objects.all()[0]
 
         self.assertEqual(len(AdminArea.objects.all()), 1)
@@ -137,7 +141,7 @@ class TestNaptanLoad(TestCase):
 
     def test_update_existing_admin_areas(self):
         # Setup
-        admin_area = AdminAreaFactory(
+        AdminAreaFactory(
             id=1, name="TestAdminArea", traveline_region_id="GB", atco_code="123"
         )
         existing_admin_areas = pd.DataFrame(
@@ -147,15 +151,15 @@ class TestNaptanLoad(TestCase):
                     "name": "AdminArea1",
                     "traveline_region_id": "NW",
                     "atco_code": "234",
-                    "obj": admin_area,
                 },
             ]
         ).set_index("id")
 
         # Test
-        load_existing_admin_areas(existing_admin_areas)
+        result = load_admin_areas(existing_admin_areas)
 
         # Assert
+        self.assertEqual(result, LoadResult(0, 1, 0))
         updated_admin_area = AdminArea.objects.all()[0]
 
         self.assertEqual(len(AdminArea.objects.all()), 1)
@@ -182,9 +186,10 @@ class TestNaptanLoad(TestCase):
         ).set_index("gazetteer_id")
 
         # Test
-        load_new_localities(new_localities)
+        result = load_localities(new_localities)
 
         # Assert
+        self.assertEqual(result, LoadResult(1, 0, 0))
         created_locality = Locality.objects.all()[0]
 
         self.assertEqual(len(Locality.objects.all()), 1)
@@ -201,7 +206,7 @@ class TestNaptanLoad(TestCase):
         district = DistrictFactory(id=20)
         AdminAreaFactory(id=9)
         DistrictFactory(id=10)
-        locality = LocalityFactory(
+        LocalityFactory(
             gazetteer_id="N1",
             name="TestLocality",
             admin_area=admin_area,
@@ -218,15 +223,15 @@ class TestNaptanLoad(TestCase):
                     "northing": 34567,
                     "admin_area_id": 9,
                     "district_id": 10,
-                    "obj": locality,
                 },
             ]
         ).set_index("gazetteer_id")
 
         # Test
-        load_existing_localities(existing_localities)
+        result = load_localities(existing_localities)
 
         # Assert
+        self.assertEqual(result, LoadResult(0, 1, 0))
         updated_locality = Locality.objects.all()[0]
 
         self.assertEqual(len(Locality.objects.all()), 1)
@@ -236,3 +241,97 @@ class TestNaptanLoad(TestCase):
         self.assertEqual(updated_locality.northing, 34567)
         self.assertEqual(updated_locality.admin_area_id, 9)
         # self.assertEqual(updated_locality.district_id, 10)
+
+    def test_unchanged_stops_are_not_written(self):
+        # Setup
+        AdminAreaFactory(id=9, atco_code="123")
+        LocalityFactory(gazetteer_id="E0035604")
+        stops = pd.DataFrame(
+            [
+                {
+                    "atco_code": f"01000000{index}",
+                    "naptan_code": None,
+                    "common_name": f"Stop {index}",
+                    "indicator": "",
+                    "street": "Downend Road",
+                    "locality_id": "E0035604",
+                    "admin_area_id": 9,
+                    "latitude": 51.4843326109,
+                    "longitude": -2.51701423067,
+                    "stop_areas": ['Area "A"', "Area\\B"],
+                }
+                for index in range(3)
+            ]
+        ).set_index("atco_code")
+        load_stops(stops)
+        stops.loc["010000001", "latitude"] = 51.5
+
+        # Test
+        result = load_stops(stops)
+
+        # Assert
+        self.assertEqual(result, LoadResult(0, 1, 2))
+        stop = StopPoint.objects.get(atco_code="010000000")
+        self.assertIsNone(stop.naptan_code)
+        self.assertEqual(stop.indicator, "")
+        self.assertEqual(stop.stop_areas, ['Area "A"', "Area\\B"])
+        self.assertEqual(StopPoint.objects.get(atco_code="010000001").location.y, 51.5)
+
+    def test_search_vectors_are_rebuilt_for_changed_admin_areas(self):
+        # Setup
+        admin_area = AdminAreaFactory(
+            id=1, name="Oldtown", traveline_region_id="GB", atco_code="123"
+        )
+        AdminAreaFactory(id=2, name="Zyxbridge", traveline_region_id="GB")
+        timetable = DatasetRevisionFactory(admin_areas=[admin_area], is_published=True)
+        stop = StopPointFactory(admin_area=admin_area, locality=None)
+        fares = DatasetRevisionFactory(is_published=True)
+        FaresMetadataFactory(revision=fares, stops=[stop])
+        admin_areas = pd.DataFrame(
+            [
+                {
+                    "id": 1,
+                    "name": "Newtown",
+                    "traveline_region_id": "GB",
+                    "atco_code": "123",
+                },
+            ]
+        ).set_index("id")
+        stops = pd.DataFrame(
+            [
+                {
+                    "atco_code": str(stop.atco_code),
+                    "naptan_code": stop.naptan_code,
+                    "common_name": stop.common_name,
+                    "indicator": stop.indicator,
+                    "street": stop.street,
+                    "locality_id": None,
+                    "admin_area_id": 2,
+                    "latitude": stop.location.y,
+                    "longitude": stop.location.x,
+                    "stop_areas": stop.stop_areas,
+                }
+            ]
+        ).set_index("atco_code")
+
+        def search(keywords):
+            query = get_search_query(keywords, BROWSE_SEARCH_WEIGHTS)
+            return set(
+                DatasetRevision.objects.filter(search_vector=query).values_list(
+                    "id", flat=True
+                )
+            )
+
+        # Test
+        load_admin_areas(admin_areas)
+
+        # Assert
+        self.assertEqual(search("newtown"), {timetable.id, fares.id})
+        self.assertEqual(search("oldtown"), set())
+
+        # Test
+        load_stops(stops)
+
+        # Assert
+        self.assertEqual(search("newtown"), {timetable.id})
+        self.assertEqual(search("zyxbridge"), {fares.id})
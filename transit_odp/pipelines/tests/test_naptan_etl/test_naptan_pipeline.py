@@ -1,67 +1,176 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
+from transit_odp.common.utils import sha1sum
 from transit_odp.naptan.factories import (
     AdminAreaFactory,
     LocalityFactory,
     StopPointFactory,
 )
 from transit_odp.naptan.models import StopPoint
+from transit_odp.pipelines.models import RemoteFileVersion
+from transit_odp.pipelines.pipelines.naptan_etl import main
 from transit_odp.pipelines.pipelines.naptan_etl.main import run
 
 pytestmark = pytest.mark.django_db
 mut = "transit_odp.pipelines.pipelines.naptan_etl.main"
+EXTRACT_MODULE = "transit_odp.pipelines.pipelines.naptan_etl.extract"
 HERE = Path(__file__)
 TEST_DATA_DIR = HERE.parent / "data"
 NPTG = TEST_DATA_DIR / "Nptg_localities_in_one_admin_area.xml"
 NAPTAN = TEST_DATA_DIR / "naptan_data_variations"
 
 
-@patch(f"{mut}.get_latest_naptan_xml")
-@patch(f"{mut}.get_latest_nptg")
-def test_naptan_pipeline_runs(get_latest_nptg, get_latest_naptan_xml):
-    get_latest_nptg.return_value = str(NPTG)
-    get_latest_naptan_xml.return_value = str(NAPTAN / "match_nptg.xml")
+class FileHandler(BaseHTTPRequestHandler):
+    """Serves the files of a FileServer, with ETags if it uses them."""
+
+    def do_GET(self):
+        content = self.server.files[self.path]
+        etag = f'"{sha1sum(content)}"'
+        if_none_match = self.headers.get("If-None-Match")
+        self.server.requests.append((self.path, if_none_match))
+
+        if self.server.use_etags and if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.server.use_etags:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FileServer(ThreadingHTTPServer):
+    """A local stand-in for the NaPTAN API."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FileHandler)
+        self.files = {}
+        self.requests = []
+        self.use_etags = True
+
+    def serve(self, naptan_path: Path, nptg_path: Path = NPTG):
+        self.files = {
+            "/naptan": naptan_path.read_bytes(),
+            "/nptg": nptg_path.read_bytes(),
+        }
+
+
+@pytest.fixture
+def naptan_server(settings, tmp_path, mocker):
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    settings.NAPTAN_IMPORT_URL = f"{url}/naptan"
+    settings.NPTG_IMPORT_URL = f"{url}/nptg"
+    mocker.patch(
+        f"{EXTRACT_MODULE}.DISK_PATH_FOR_NAPTAN_XML", str(tmp_path / "Naptan.xml")
+    )
+    mocker.patch(f"{EXTRACT_MODULE}.DISK_PATH_FOR_NPTG", str(tmp_path / "NPTG.xml"))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_naptan_pipeline_runs(naptan_server):
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
 
     run()
     assert StopPoint.objects.count() == 4
 
 
-@patch(f"{mut}.get_latest_naptan_xml")
-@patch(f"{mut}.get_latest_nptg")
-def test_naptan_missing_admin_area(get_latest_nptg, get_latest_naptan_xml):
-    get_latest_nptg.return_value = str(NPTG)
-    get_latest_naptan_xml.return_value = str(NAPTAN / "missing_admin_area.xml")
+def test_naptan_missing_admin_area(naptan_server):
+    naptan_server.serve(NAPTAN / "missing_admin_area.xml")
 
     run()
     assert StopPoint.objects.count() == 3
 
 
-@patch(f"{mut}.get_latest_naptan_xml")
-@patch(f"{mut}.get_latest_nptg")
-def test_naptan_missing_locality(get_latest_nptg, get_latest_naptan_xml):
-    get_latest_nptg.return_value = str(NPTG)
-    get_latest_naptan_xml.return_value = str(NAPTAN / "missing_locality.xml")
+def test_naptan_missing_locality(naptan_server):
+    naptan_server.serve(NAPTAN / "missing_locality.xml")
 
     run()
     assert StopPoint.objects.count() == 3
 
 
-@patch(f"{mut}.get_latest_naptan_xml")
-@patch(f"{mut}.get_latest_nptg")
-def test_naptan_pipeline_updates_data(get_latest_nptg, get_latest_naptan_xml):
+def test_naptan_pipeline_updates_data(naptan_server):
     aa = AdminAreaFactory(name="Oldton")
     locality = LocalityFactory(name="OldVille", admin_area=aa)
     for index in range(1, 5):
         # These stop points are in the xml and datebase so we test update code
         StopPointFactory(atco_code=f"01000000{index}", admin_area=aa, locality=locality)
 
-    get_latest_nptg.return_value = str(NPTG)
-    get_latest_naptan_xml.return_value = str(NAPTAN / "match_nptg.xml")
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
     run()
 
     for stop in StopPoint.objects.all():
         assert stop.admin_area.name == "National - National Rail"
         assert stop.locality.name == "Ashgrove"
+
+
+def test_naptan_pipeline_skips_unmodified_files(naptan_server, mocker):
+    load_stops = mocker.spy(main, "load_stops")
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
+    run()
+    etag = f'"{sha1sum(naptan_server.files["/naptan"])}"'
+    version = RemoteFileVersion.objects.get(url__endswith="/naptan")
+    assert version.etag == etag
+
+    naptan_server.requests = []
+    run()
+
+    assert load_stops.call_count == 1
+    assert ("/naptan", etag) in naptan_server.requests
+
+
+def test_naptan_pipeline_skips_unchanged_content(naptan_server, mocker):
+    load_stops = mocker.spy(main, "load_stops")
+    naptan_server.use_etags = False
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
+    run()
+    run()
+
+    assert load_stops.call_count == 1
+
+
+def test_naptan_pipeline_saves_version_of_unchanged_content(naptan_server, mocker):
+    load_stops = mocker.spy(main, "load_stops")
+    naptan_server.use_etags = False
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
+    run()
+
+    naptan_server.use_etags = True
+    run()
+    etag = f'"{sha1sum(naptan_server.files["/naptan"])}"'
+    version = RemoteFileVersion.objects.get(url__endswith="/naptan")
+    assert version.etag == etag
+
+    naptan_server.requests = []
+    run()
+
+    assert load_stops.call_count == 1
+    assert ("/naptan", etag) in naptan_server.requests
+
+
+def test_naptan_pipeline_loads_changed_naptan(naptan_server):
+    naptan_server.serve(NAPTAN / "missing_admin_area.xml")
+    run()
+    assert StopPoint.objects.count() == 3
+
+    naptan_server.serve(NAPTAN / "match_nptg.xml")
+    naptan_server.requests = []
+    run()
+
+    # The NPTG isn't modified but is needed to load the stops
+    assert naptan_server.requests[-1] == ("/nptg", None)
+    assert StopPoint.objects.count() == 4
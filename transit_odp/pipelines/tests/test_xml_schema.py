@@ -1,3 +1,5 @@
+import fcntl
+import threading
 from pathlib import Path
 
 import pytest
@@ -5,10 +7,15 @@ import requests_mock
 from requests.exceptions import ConnectionError
 
 from transit_odp.pipelines.factories import SchemaDefinitionFactory
-from transit_odp.pipelines.pipelines.xml_schema import SchemaLoader, SchemaUpdater
+from transit_odp.pipelines.pipelines.xml_schema import (
+    SchemaLoader,
+    SchemaRegistry,
+    SchemaUpdater,
+)
 from transit_odp.timetables.constants import TXC_XSD_PATH
 
 pytestmark = pytest.mark.django_db
+XML_SCHEMA = "transit_odp.pipelines.pipelines.xml_schema"
 HERE = Path(__file__)
 DATA = HERE.parent / "data"
 
@@ -77,3 +84,58 @@ def test_schema_loader_can_unzip(tmp_path):
     loader._schema_dir = tmp_path
     assert loader.path == tmp_path / "TxC" / Path(TXC_XSD_PATH)
     assert loader.path.exists()
+
+
+def test_schema_loader_extracts_updated_definition(tmp_path):
+    schema = SchemaDefinitionFactory(
+        schema__from_path=DATA / "TransXChange_schema_2.4.zip"
+    )
+    loader = SchemaLoader(schema, TXC_XSD_PATH)
+    loader._schema_dir = tmp_path
+    assert (loader.path.parent / ".checksum").read_text() == schema.checksum
+
+    # The files are extracted again when the definition is updated
+    schema.checksum = "updated"
+    assert loader.path.exists()
+    assert (loader.path.parent / ".checksum").read_text() == "updated"
+
+
+def test_schema_registry_compiles_once_per_checksum(mocker):
+    schema = SchemaDefinitionFactory()
+    loader = mocker.patch(f"{XML_SCHEMA}.SchemaLoader")
+    registry = SchemaRegistry()
+
+    first = registry.get_schema(schema.category, TXC_XSD_PATH)
+    second = registry.get_schema(schema.category, TXC_XSD_PATH)
+    assert first is second
+    loader.assert_called_once()
+
+    schema.checksum = "updated"
+    schema.save()
+    registry.get_schema(schema.category, TXC_XSD_PATH)
+    assert loader.call_count == 2
+
+    registry.clear()
+    registry.get_schema(schema.category, TXC_XSD_PATH)
+    assert loader.call_count == 3
+
+
+def test_schema_loader_waits_for_readers_before_extracting(tmp_path):
+    schema = SchemaDefinitionFactory(
+        schema__from_path=DATA / "TransXChange_schema_2.4.zip"
+    )
+    loader = SchemaLoader(schema, TXC_XSD_PATH)
+    loader._schema_dir = tmp_path
+    checksum_path = loader.path.parent / ".checksum"
+
+    schema.checksum = "updated"
+    with loader.locked(fcntl.LOCK_SH):
+        # Another process compiling the schema holds a shared lock
+        extract = threading.Thread(target=lambda: loader.path)
+        extract.start()
+        extract.join(timeout=0.5)
+        assert extract.is_alive()
+        assert checksum_path.read_text() != "updated"
+
+    extract.join()
+    assert checksum_path.read_text() == "updated"
@@ -6,4 +6,4 @@ class PublishConfig(AppConfig):
     verbose_name = "Publish"
 
     def ready(self):
-        pass
+        import transit_odp.publish.receivers  # noqa: F401
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from transit_odp.otc.models import ServiceStaleness
+from transit_odp.publish.requires_attention import refresh_service_staleness
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluates the staleness of every OTC service. Run on deploy to fill "
+        "ServiceStaleness, which is otherwise only filled when timetables are "
+        "published, the OTC data is refreshed and once a day."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Only evaluate the services if ServiceStaleness is empty",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and ServiceStaleness.objects.exists():
+            self.stdout.write("ServiceStaleness is already filled.")
+            return
+        refresh_service_staleness()
+        self.stdout.write(
+            f"ServiceStaleness has {ServiceStaleness.objects.count()} rows."
+        )
@@ -0,0 +1,29 @@
+import logging
+
+from django.db import transaction
+from django.dispatch import receiver
+
+from transit_odp.organisation.constants import TimetableType
+from transit_odp.organisation.models import Dataset, DatasetRevision
+from transit_odp.organisation.signals import revision_publish
+from transit_odp.publish.tasks import task_refresh_service_staleness
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(revision_publish)
+def refresh_service_staleness_handler(
+    sender: DatasetRevision, dataset: Dataset, **kwargs
+):
+    """
+    Listens on revision_publish and dispatches a Celery job to refresh the
+    staleness of the services of the organisation that published a timetable
+    """
+    if dataset.dataset_type != TimetableType:
+        return
+
+    logger.debug(
+        f"refresh_service_staleness_handler called for DatasetRevision {sender.id}"
+    )
+    organisation_id = dataset.organisation_id
+    transaction.on_commit(lambda: task_refresh_service_staleness.delay(organisation_id))
@@ -1,50 +1,54 @@
-from typing import Dict, List
+from datetime import timedelta
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Set
 
-from django.db.models import Subquery
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q, QuerySet, Subquery
 from django.utils.timezone import now
 
+from transit_odp.organisation.models import Licence as BODSLicence
+from transit_odp.organisation.models import Organisation
 from transit_odp.organisation.models.data import TXCFileAttributes
 from transit_odp.otc.models import Service as OTCService
-from datetime import timedelta
+from transit_odp.otc.models import ServiceStaleness
 
+logger = getLogger(__name__)
 
-def get_otc_map(org_id: int) -> Dict[str, OTCService]:
-    """
-    Get a list of dictionaries which includes all OTC Services for an organisation,
-    excluding exempted services and Out of Season seasonal services.
-    """
-    return {
-        service.registration_number.replace("/", ":"): service
-        for service in OTCService.objects.get_otc_data_for_organisation(org_id)
-    }
+STALENESS_BATCH_SIZE = 2000
+# First key of the advisory locks taken while refreshing ServiceStaleness, the
+# second key is the organisation id, 0 for the rows of Local Authorities
+STALENESS_LOCK_ID = 5317
 
 
-def get_otc_map_lta(lta_list) -> Dict[str, OTCService]:
+def get_txc_map(org_id: int) -> Dict[str, TXCFileAttributes]:
     """
-    Get a list of dictionaries which includes all OTC Services for a LTA,
-    excluding exempted services and Out of Season seasonal services.
+    Get a list of dictionaries of live TXCFileAttributes for an organisation
+    with relevant effective staleness dates annotated.
     """
-    otc_data_lta_queryset = OTCService.objects.get_otc_data_for_lta(lta_list)
-    if otc_data_lta_queryset is not None:
-        return {
-            service.registration_number.replace("/", ":"): service
-            for service in otc_data_lta_queryset
-        }
-    else:
-        return {}
+    return _get_latest_by_service_code(
+        TXCFileAttributes.objects.filter(revision__dataset__organisation_id=org_id)
+    )
 
 
-def get_txc_map(org_id: int) -> Dict[str, TXCFileAttributes]:
+def get_live_txc_map(
+    service_codes: Optional[Iterable[str]] = None,
+) -> Dict[str, TXCFileAttributes]:
     """
-    Get a list of dictionaries of live TXCFileAttributes for an organisation
-    with relevant effective staleness dates annotated.
+    Get a dictionary of the live TXCFileAttributes of every organisation, or of
+    `service_codes` only, with relevant effective staleness dates annotated.
     """
+    txc_file_attributes = TXCFileAttributes.objects.all()
+    if service_codes is not None:
+        txc_file_attributes = txc_file_attributes.filter(service_code__in=service_codes)
+    return _get_latest_by_service_code(txc_file_attributes)
+
+
+def _get_latest_by_service_code(
+    txc_file_attributes: QuerySet,
+) -> Dict[str, TXCFileAttributes]:
     return {
         txcfa.service_code: txcfa
-        for txcfa in TXCFileAttributes.objects.filter(
-            revision__dataset__organisation_id=org_id
-        )
-        .get_active_live_revisions()
+        for txcfa in txc_file_attributes.get_active_live_revisions()
         .add_staleness_dates()
         .order_by(
             "service_code",
@@ -58,51 +62,66 @@ def get_txc_map(org_id: int) -> Dict[str, TXCFileAttributes]:
     }
 
 
-def get_txc_map_lta(lta_list) -> Dict[str, TXCFileAttributes]:
+def _get_lta_services_subquery(lta_list) -> Optional[QuerySet]:
     """
-    Get a list of dictionaries of live TXCFileAttributes for a LTA
-    with relevant effective staleness dates annotated.
+    Returns the ids of the OTC Services of the LTAs in `lta_list`, None if they
+    don't have any.
     """
     services_subquery_list = [
         x.registration_numbers.values("id")
         for x in lta_list
         if x.registration_numbers.values("id")
     ]
-    if services_subquery_list:
-        final_subquery = None
-        for service_queryset in services_subquery_list:
-            if final_subquery is None:
-                final_subquery = service_queryset
-            else:
-                final_subquery = final_subquery | service_queryset
-        final_subquery = final_subquery.distinct()
-
-        service_code_subquery = Subquery(
-            OTCService.objects.filter(id__in=Subquery(final_subquery.values("id")))
-            .add_service_code()
-            .values("service_code")
-        )
-        return {
-            txcfa.service_code: txcfa
-            for txcfa in TXCFileAttributes.objects.filter(
-                service_code__in=service_code_subquery
-            )
-            .get_active_live_revisions()
-            .add_staleness_dates()
-            .add_organisation_name()
-            .order_by(
-                "service_code",
-                "-revision__published_at",
-                "-revision_number",
-                "-modification_datetime",
-                "-operating_period_start_date",
-                "-filename",
-            )
-            .distinct("service_code")
-        }
-    else:
+    if not services_subquery_list:
+        return None
+
+    final_subquery = None
+    for service_queryset in services_subquery_list:
+        if final_subquery is None:
+            final_subquery = service_queryset
+        else:
+            final_subquery = final_subquery | service_queryset
+    return final_subquery.distinct()
+
+
+def get_txc_map_lta(lta_list) -> Dict[str, TXCFileAttributes]:
+    """
+    Get a list of dictionaries of live TXCFileAttributes for a LTA
+    with relevant effective staleness dates annotated.
+
+    The live TXCFileAttributes of each service are read from ServiceStaleness.
+    """
+    staleness = get_staleness_map_lta(lta_list)
+    txc_file_attributes_ids = [
+        service_staleness.txc_file_attributes_id
+        for service_staleness in staleness.values()
+        if service_staleness.txc_file_attributes_id is not None
+    ]
+    return {
+        txcfa.service_code: txcfa
+        for txcfa in TXCFileAttributes.objects.filter(id__in=txc_file_attributes_ids)
+        .add_staleness_dates()
+        .add_organisation_name()
+    }
+
+
+def get_staleness_map_lta(lta_list) -> Dict[int, ServiceStaleness]:
+    """
+    Get a dictionary of the ServiceStaleness of every OTC Service of a LTA,
+    keyed by OTC Service id.
+    """
+    final_subquery = _get_lta_services_subquery(lta_list)
+    if final_subquery is None:
         return {}
 
+    return {
+        service_staleness.service_id: service_staleness
+        for service_staleness in ServiceStaleness.objects.filter(
+            organisation__isnull=True,
+            service_id__in=Subquery(final_subquery.values("id")),
+        )
+    }
+
 
 def _update_data(object_list: List[Dict[str, str]], service: OTCService) -> None:
     """
@@ -192,47 +211,227 @@ def is_stale(service: OTCService, file_attribute: TXCFileAttributes) -> bool:
     return any(evaluate_staleness(service, file_attribute))
 
 
+def requires_attention(staleness: Optional[ServiceStaleness]) -> bool:
+    """
+    Returns whether the OTC Service of `staleness` requires attention, which
+    agrees with `get_requires_attention_filter`.
+
+    Services that haven't been evaluated yet, ie. `staleness` is None, require
+    attention.
+    """
+    return staleness is None or staleness.requires_attention
+
+
+def get_requires_attention_filter(organisation_id: Optional[int]) -> Exists:
+    """
+    Returns a filter on OTC Services that aren't known to be live and up to date
+    in the timetables of `organisation_id`, or of every organisation if None.
+
+    Services that haven't been evaluated yet require attention.
+    """
+    return ~Exists(
+        ServiceStaleness.objects.filter(
+            service=OuterRef("id"),
+            organisation_id=organisation_id,
+            requires_attention=False,
+        )
+    )
+
+
+def filter_requires_attention(
+    services: QuerySet, organisation_id: Optional[int]
+) -> QuerySet:
+    """
+    Returns the OTC Services of `services` that require attention.
+
+    `services` picks one OTC Service of each registration with DISTINCT ON, which
+    is applied before any filter. It's used as a subquery so that a registration
+    is evaluated on the Service it picks rather than on its other Services.
+    """
+    return OTCService.objects.filter(id__in=services.values("id")).filter(
+        get_requires_attention_filter(organisation_id)
+    )
+
+
 def get_requires_attention_data(org_id: int) -> List[Dict[str, str]]:
     """
-    Compares an organisation's OTC Services dictionaries list with TXCFileAttributes
-    dictionaries list to determine which OTC Services require attention ie. not live
+    Get the OTC Services of an organisation that require attention ie. not live
     in BODS at all, or live but meeting new Staleness conditions.
 
     Returns list of objects of each service requiring attention for an organisation.
     """
     object_list = []
+    services = (
+        filter_requires_attention(
+            OTCService.objects.get_otc_data_for_organisation(org_id), org_id
+        )
+        .annotate(otc_licence_number=F("licence__number"))
+        .order_by("licence__number", "registration_number", "service_number")
+    )
+    for service in services:
+        _update_data(object_list, service)
+    return object_list
 
-    otc_map = get_otc_map(org_id)
-    txcfa_map = get_txc_map(org_id)
 
-    for service_code, service in otc_map.items():
-        file_attribute = txcfa_map.get(service_code)
+def get_requires_attention_data_lta(lta_list: List) -> int:
+    """
+    Get the OTC Services of a LTA that require attention ie. not live in BODS at
+    all, or live but meeting new Staleness conditions.
+
+    Returns the number of services requiring attention for a LTA.
+    """
+    services = OTCService.objects.get_otc_data_for_lta(lta_list)
+    if services is None:
+        return 0
+    return filter_requires_attention(services, None).count()
+
+
+def evaluate_services(
+    services: Iterable[OTCService],
+    txcfa_map: Dict[str, TXCFileAttributes],
+    organisation_id: Optional[int],
+) -> List[ServiceStaleness]:
+    """
+    Returns the ServiceStaleness of `services` against the live TXCFileAttributes
+    in `txcfa_map`.
+    """
+    today = now().date()
+    object_list = []
+    for service in services:
+        file_attribute = txcfa_map.get(service.registration_number.replace("/", ":"))
         if file_attribute is None:
-            _update_data(object_list, service)
-        elif is_stale(service, file_attribute):
-            _update_data(object_list, service)
+            staleness = (False, False, False)
+        else:
+            staleness = evaluate_staleness(service, file_attribute)
+        object_list.append(
+            ServiceStaleness(
+                service=service,
+                organisation_id=organisation_id,
+                txc_file_attributes=file_attribute,
+                staleness_42_day_look_ahead=staleness[0],
+                staleness_12_months_old=staleness[1],
+                staleness_otc=staleness[2],
+                requires_attention=file_attribute is None or any(staleness),
+                evaluated=today,
+            )
+        )
     return object_list
 
 
-def get_requires_attention_data_lta(lta_list: List) -> int:
+def lock_staleness(organisation_id: Optional[int]) -> None:
     """
-    Compares an organisation's OTC Services dictionaries list with TXCFileAttributes
-    dictionaries list to determine which OTC Services require attention ie. not live
-    in BODS at all, or live but meeting new Staleness conditions.
+    Waits for other refreshes of the ServiceStaleness of `organisation_id`, or of
+    Local Authorities if None, and keeps them waiting until the transaction ends.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(%s, %s)",
+            [STALENESS_LOCK_ID, organisation_id or 0],
+        )
+
 
-    Returns list of objects of each service requiring attention for a LTA.
+def refresh_organisation_staleness(organisation_id: int) -> None:
     """
-    object_list = []
-    lta_services_requiring_attention = 0
-    otc_map = get_otc_map_lta(lta_list)
-    txcfa_map = get_txc_map_lta(lta_list)
+    Replaces the ServiceStaleness of an organisation's OTC Services.
 
-    for service_code, service in otc_map.items():
-        file_attribute = txcfa_map.get(service_code)
-        if file_attribute is None:
-            _update_data(object_list, service)
-        elif is_stale(service, file_attribute):
-            _update_data(object_list, service)
-    lta_services_requiring_attention = len(object_list)
+    Every OTC Service is evaluated, including the Services sharing a
+    registration number.
+    """
+    org_licences = BODSLicence.objects.filter(organisation_id=organisation_id)
+    services = (
+        OTCService.objects.add_otc_stale_date()
+        .add_otc_association_date()
+        .filter(licence__number__in=Subquery(org_licences.values("number")))
+        .order_by("id")
+    )
+    with transaction.atomic():
+        lock_staleness(organisation_id)
+        object_list = evaluate_services(
+            services, get_txc_map(organisation_id), organisation_id
+        )
+        ServiceStaleness.objects.filter(organisation_id=organisation_id).delete()
+        ServiceStaleness.objects.bulk_create(
+            object_list, batch_size=STALENESS_BATCH_SIZE
+        )
 
-    return lta_services_requiring_attention
+
+def refresh_lta_staleness(service_codes: Optional[Set[str]] = None) -> None:
+    """
+    Replaces the ServiceStaleness of the OTC Services with `service_codes`, or of
+    every OTC Service if None, against the live timetables of every organisation.
+    """
+    services = (
+        OTCService.objects.add_service_code()
+        .add_otc_stale_date()
+        .add_otc_association_date()
+        .order_by("id")
+    )
+    if service_codes is not None:
+        services = services.filter(service_code__in=service_codes)
+
+    with transaction.atomic():
+        lock_staleness(None)
+        services = list(services)
+        object_list = evaluate_services(services, get_live_txc_map(service_codes), None)
+        stale_rows = ServiceStaleness.objects.filter(organisation__isnull=True)
+        if service_codes is not None:
+            stale_rows = stale_rows.filter(service__in=services)
+        stale_rows.delete()
+        ServiceStaleness.objects.bulk_create(
+            object_list, batch_size=STALENESS_BATCH_SIZE
+        )
+
+
+def get_organisation_service_codes(organisation_id: int) -> Set[str]:
+    """
+    Returns the service codes whose staleness can change when an organisation
+    publishes a timetable: the codes of its OTC Services, of its live timetables
+    and of the timetables it was live with when last evaluated.
+    """
+    otc_codes = OTCService.objects.get_all_in_organisation(organisation_id).values_list(
+        "service_code", flat=True
+    )
+    txc_codes = (
+        TXCFileAttributes.objects.filter(
+            revision__dataset__organisation_id=organisation_id
+        )
+        .get_active_live_revisions()
+        .values_list("service_code", flat=True)
+    )
+    evaluated_codes = ServiceStaleness.objects.filter(
+        organisation__isnull=True,
+        txc_file_attributes__revision__dataset__organisation_id=organisation_id,
+    ).values_list("txc_file_attributes__service_code", flat=True)
+
+    service_codes = set(otc_codes)
+    service_codes.update(txc_codes)
+    service_codes.update(evaluated_codes)
+    return service_codes
+
+
+def refresh_service_staleness(organisation_id: Optional[int] = None) -> None:
+    """
+    Refreshes the ServiceStaleness affected by an organisation's timetables, or
+    every ServiceStaleness if `organisation_id` is None.
+    """
+    if organisation_id is None:
+        organisation_ids = list(
+            Organisation.objects.filter(licences__isnull=False)
+            .distinct()
+            .values_list("id", flat=True)
+        )
+        ServiceStaleness.objects.exclude(
+            Q(organisation__isnull=True) | Q(organisation_id__in=organisation_ids)
+        ).delete()
+        service_codes = None
+    else:
+        organisation_ids = [organisation_id]
+        service_codes = get_organisation_service_codes(organisation_id)
+
+    for org_id in organisation_ids:
+        refresh_organisation_staleness(org_id)
+    refresh_lta_staleness(service_codes)
+    logger.info(
+        f"Refreshed the staleness of services of {len(organisation_ids)} "
+        "organisations."
+    )
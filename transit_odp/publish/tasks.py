@@ -1,5 +1,6 @@
 import io
 import logging
+from typing import Optional
 from zipfile import ZIP_DEFLATED, ZipFile
 
 from celery import shared_task
@@ -14,6 +15,7 @@ from transit_odp.organisation.csv.consumer_interactions import (
 from transit_odp.organisation.models import Organisation
 from transit_odp.organisation.models.data import ConsumerStats
 from transit_odp.publish.constants import INTERACTIONS_DEFINITION
+from transit_odp.publish.requires_attention import refresh_service_staleness
 from transit_odp.publish.stats import get_all_consumer_interaction_stats
 from transit_odp.publish.views.reporting import ASSETS
 
@@ -77,3 +79,12 @@ def task_generate_consumer_interaction_stats():
         records,
         fields=["weekly_unique_consumers", "weekly_downloads", "weekly_api_hits"],
     )
+
+
+@shared_task
+def task_refresh_service_staleness(organisation_id: Optional[int] = None):
+    """
+    Refreshes the staleness of the services affected by an organisation's
+    timetables, or of every service if `organisation_id` is None.
+    """
+    refresh_service_staleness(organisation_id)
@@ -0,0 +1,143 @@
+from datetime import date, timedelta
+
+import pytest
+from django.utils.timezone import now
+
+from transit_odp.organisation.factories import DatasetFactory
+from transit_odp.organisation.factories import LicenceFactory as BODSLicenceFactory
+from transit_odp.organisation.factories import (
+    OrganisationFactory,
+    TXCFileAttributesFactory,
+)
+from transit_odp.otc.factories import LicenceModelFactory, ServiceModelFactory
+from transit_odp.otc.models import ServiceStaleness
+from transit_odp.publish.requires_attention import (
+    get_requires_attention_data,
+    refresh_service_staleness,
+)
+
+pytestmark = pytest.mark.django_db
+
+LICENCE_NUMBER = "PD5000123"
+
+
+def create_services(organisation, total_services):
+    BODSLicenceFactory(organisation=organisation, number=LICENCE_NUMBER)
+    otc_licence = LicenceModelFactory(number=LICENCE_NUMBER)
+    return [
+        ServiceModelFactory(
+            licence=otc_licence,
+            registration_number=f"{LICENCE_NUMBER}/{n}",
+            effective_date=date(year=2020, month=1, day=1),
+        )
+        for n in range(total_services)
+    ]
+
+
+def test_refresh_service_staleness():
+    org = OrganisationFactory()
+    services = create_services(org, 3)
+    dataset = DatasetFactory(organisation=org)
+    # Not stale
+    TXCFileAttributesFactory(
+        revision=dataset.live_revision,
+        service_code=f"{LICENCE_NUMBER}:0",
+        operating_period_end_date=date.today() + timedelta(days=50),
+        modification_datetime=now(),
+    )
+    # Stale - 12 months old
+    TXCFileAttributesFactory(
+        revision=dataset.live_revision,
+        service_code=f"{LICENCE_NUMBER}:1",
+        operating_period_end_date=None,
+        modification_datetime=now() - timedelta(weeks=100),
+    )
+
+    refresh_service_staleness()
+
+    staleness = {
+        (service_staleness.service_id, service_staleness.organisation_id): (
+            service_staleness
+        )
+        for service_staleness in ServiceStaleness.objects.all()
+    }
+    assert len(staleness) == 6
+    for organisation_id in (org.id, None):
+        assert not staleness[(services[0].id, organisation_id)].requires_attention
+        stale = staleness[(services[1].id, organisation_id)]
+        assert stale.get_staleness() == (False, True, False)
+        assert stale.requires_attention
+        not_published = staleness[(services[2].id, organisation_id)]
+        assert not_published.txc_file_attributes is None
+        assert not_published.requires_attention
+
+    requires_attention = get_requires_attention_data(org.id)
+    assert sorted(service["service_code"] for service in requires_attention) == [
+        f"{LICENCE_NUMBER}/1",
+        f"{LICENCE_NUMBER}/2",
+    ]
+
+
+def test_refresh_service_staleness_of_organisation():
+    org = OrganisationFactory()
+    (service,) = create_services(org, 1)
+    refresh_service_staleness()
+
+    # The service is published by another organisation
+    other_org = OrganisationFactory()
+    dataset = DatasetFactory(organisation=other_org)
+    file_attributes = TXCFileAttributesFactory(
+        revision=dataset.live_revision,
+        service_code=f"{LICENCE_NUMBER}:0",
+        operating_period_end_date=date.today() + timedelta(days=50),
+        modification_datetime=now(),
+    )
+    refresh_service_staleness(other_org.id)
+
+    lta_staleness = ServiceStaleness.objects.get(
+        service=service, organisation__isnull=True
+    )
+    assert lta_staleness.txc_file_attributes == file_attributes
+    assert not lta_staleness.requires_attention
+    org_staleness = ServiceStaleness.objects.get(service=service, organisation=org)
+    assert org_staleness.txc_file_attributes is None
+    assert org_staleness.requires_attention
+
+
+def test_services_sharing_a_registration_number():
+    org = OrganisationFactory()
+    BODSLicenceFactory(organisation=org, number=LICENCE_NUMBER)
+    otc_licence = LicenceModelFactory(number=LICENCE_NUMBER)
+    registration_number = f"{LICENCE_NUMBER}/0"
+    first = ServiceModelFactory(
+        licence=otc_licence,
+        registration_number=registration_number,
+        service_number="1",
+        effective_date=date(year=2020, month=1, day=1),
+    )
+    # Stale - OTC variation, the timetable was modified before its association date
+    second = ServiceModelFactory(
+        licence=otc_licence,
+        registration_number=registration_number,
+        service_number="2",
+        effective_date=date.today() + timedelta(days=30),
+    )
+    dataset = DatasetFactory(organisation=org)
+    TXCFileAttributesFactory(
+        revision=dataset.live_revision,
+        service_code=f"{LICENCE_NUMBER}:0",
+        operating_period_end_date=date.today() + timedelta(days=50),
+        modification_datetime=now() - timedelta(days=50),
+    )
+
+    refresh_service_staleness(org.id)
+
+    for service, requires_attention in ((first, False), (second, True)):
+        assert (
+            ServiceStaleness.objects.get(
+                service=service, organisation=org
+            ).requires_attention
+            is requires_attention
+        )
+    # The registration is evaluated on the Service it's listed with
+    assert get_requires_attention_data(org.id) == []
@@ -42,6 +42,7 @@ from transit_odp.organisation.models import Dataset, DatasetRevision
 from transit_odp.otc.factories import LicenceModelFactory, ServiceModelFactory
 from transit_odp.pipelines.factories import DatasetETLTaskResultFactory
 from transit_odp.publish.forms import FeedUploadForm
+from transit_odp.publish.requires_attention import refresh_service_staleness
 from transit_odp.publish.tasks import task_generate_consumer_interaction_stats
 from transit_odp.publish.views.timetable.create import FeedUploadWizard
 from transit_odp.publish.views.timetable.update import FeedUpdateWizard
@@ -1114,6 +1115,7 @@ class TestPublishView:
 
         client.force_login(user=user)
         url = reverse("feed-list", host=host, kwargs={"pk1": org1.id})
+        refresh_service_staleness()
         response = client.get(url)
 
         assert response.status_code == 200
@@ -1790,6 +1792,7 @@ def test_require_attention_empty_search_box(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -1839,6 +1842,7 @@ def test_require_attention_field_in_search_box(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": "006"}, follow=True)
 
     assert response.status_code == 200
@@ -1877,6 +1881,7 @@ def test_require_attention_search_no_results(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": "xxxYYyzz123"}, follow=True)
 
     assert response.status_code == 200
@@ -1931,6 +1936,7 @@ def test_require_attention_seasonal_services(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -1987,6 +1993,7 @@ def test_require_attention_stale_otc_effective_date(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -2044,6 +2051,7 @@ def test_require_attention_stale_end_date(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -2102,6 +2110,7 @@ def test_require_attention_stale_last_modified_date(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -2192,6 +2201,7 @@ def test_require_attention_all_variations(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
@@ -2253,6 +2263,7 @@ def test_require_attention_compliant(publish_client):
 
     publish_client.force_login(user=user)
     url = reverse("requires-attention", host=host, kwargs={"pk1": org1.id})
+    refresh_service_staleness()
     response = publish_client.get(url, data={"q": ""}, follow=True)
 
     assert response.status_code == 200
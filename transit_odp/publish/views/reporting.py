@@ -35,9 +35,8 @@ class ConsumerFeedbackView(OrgUserViewMixin, View):
 
         with ZipFile(buffer_, mode="w", compression=ZIP_DEFLATED) as zin:
             builder = ConsumerFeedbackCSV(organisation_id=organisation_id)
-            output = builder.to_string()
             if builder.count() > 0:
-                zin.writestr(csv_filename, output)
+                builder.to_zip(zin, csv_filename)
                 zin.write(ASSETS / FEEDBACK_DEFINITION, FEEDBACK_DEFINITION)
 
         buffer_.seek(0)
@@ -13,17 +13,16 @@ class OneSessionPerUserMiddleware:
         # Code to be executed for each request before
         # the view (and later middleware) are called.
         if request.user.is_authenticated:
-            stored_session_key = LoggedInUser.objects.get_or_create(user=request.user)[
-                0
-            ].session_key
+            # The stored session key is cached, the database is only written to
+            # when the user starts a new session
+            stored_session_key = LoggedInUser.get_session_key(request.user.id)
             current_session_key = request.session.session_key
 
             # if there is a stored_session_key  in our database and it is
             # different from the current session, delete the stored_session_key
             # session_key with from the Session table
             if stored_session_key != current_session_key:
-                request.user.logged_in_user.session_key = current_session_key
-                request.user.logged_in_user.save()
+                LoggedInUser.set_session_key(request.user.id, current_session_key)
 
                 if stored_session_key:
                     # We could extend this to only allow one session per IP address
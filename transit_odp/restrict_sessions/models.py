@@ -1,4 +1,7 @@
+from typing import Optional
+
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 
 User = settings.AUTH_USER_MODEL
@@ -14,3 +17,35 @@ class LoggedInUser(models.Model):
 
     def __str__(self):
         return self.user.email
+
+    @staticmethod
+    def get_cache_key(user_id: int) -> str:
+        return f"restrict-sessions-session-key-{user_id}"
+
+    @classmethod
+    def get_session_key(cls, user_id: int) -> Optional[str]:
+        """
+        Returns the session key stored for a user, the key is read from the
+        cache and only loaded from the database when it isn't cached.
+        """
+        cache_key = cls.get_cache_key(user_id)
+        # An empty string is cached when the user has no session key stored
+        session_key = cache.get(cache_key)
+        if session_key is None:
+            session_key = cls.objects.get_or_create(user_id=user_id)[0].session_key
+            cache.set(cache_key, session_key or "", settings.SESSION_COOKIE_AGE)
+        return session_key or None
+
+    @classmethod
+    def set_session_key(cls, user_id: int, session_key: Optional[str]) -> None:
+        cls.objects.update_or_create(
+            user_id=user_id, defaults={"session_key": session_key}
+        )
+        cache.set(
+            cls.get_cache_key(user_id), session_key or "", settings.SESSION_COOKIE_AGE
+        )
+
+    @classmethod
+    def clear_session_key(cls, user_id: int) -> None:
+        cls.objects.filter(user_id=user_id).delete()
+        cache.delete(cls.get_cache_key(user_id))
@@ -8,4 +8,6 @@ from transit_odp.restrict_sessions.models import LoggedInUser
 
 @receiver(user_logged_out)
 def on_user_logged_out(sender, **kwargs):
-    LoggedInUser.objects.filter(user=kwargs.get("user")).delete()
+    user = kwargs.get("user")
+    if user is not None:
+        LoggedInUser.clear_session_key(user.id)
@@ -1,7 +1,9 @@
 import config.hosts
 import pytest
+from django.core.cache import cache
 from django_hosts.resolvers import reverse
 
+from transit_odp.restrict_sessions.models import LoggedInUser
 from transit_odp.users.constants import AccountType
 
 pytestmark = pytest.mark.django_db
@@ -36,3 +38,27 @@ class TestRestrictedSession:
         response = client1.get(self.url)
         assert response.status_code == 302, "Check first client is now redirected..."
         assert response.url.startswith("/account/login/"), "...to the login page"
+
+    def test_session_key_is_cached(
+        self, user_factory, client_factory, django_assert_num_queries
+    ):
+        user = user_factory(account_type=AccountType.org_admin.value)
+        client = client_factory(host=self.host)
+        client.force_login(user=user)
+        response = client.get(self.url)
+        assert response.status_code == 200
+
+        session_key = client.session.session_key
+        assert LoggedInUser.objects.get(user=user).session_key == session_key
+        with django_assert_num_queries(0):
+            assert LoggedInUser.get_session_key(user.id) == session_key
+
+    def test_session_key_is_loaded_when_not_cached(self, user_factory):
+        user = user_factory(account_type=AccountType.org_admin.value)
+        session_key = "a" * 32
+        LoggedInUser.objects.create(user=user, session_key=session_key)
+        cache.delete(LoggedInUser.get_cache_key(user.id))
+
+        assert LoggedInUser.get_session_key(user.id) == session_key
+        LoggedInUser.objects.filter(user=user).delete()
+        assert LoggedInUser.get_session_key(user.id) == session_key
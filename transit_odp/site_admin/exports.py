@@ -1,26 +1,39 @@
-import io
 import logging
 import tempfile
 import zipfile
-from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import date, datetime
 from math import floor
-from typing import BinaryIO, Optional
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Type
 from zipfile import ZIP_DEFLATED
 
 from django.contrib.auth import get_user_model
 from django.core.files.base import File
-from django.db.models import Avg, Case, CharField, OuterRef, Q, Subquery, Value, When
+from django.db import connection
+from django.db.models import (
+    Avg,
+    Case,
+    CharField,
+    Model,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
 from django.db.models.expressions import F
 from django.db.models.functions import Concat
 from django_hosts.resolvers import reverse
-from waffle import flag_is_active
+from waffle import flag_is_active, get_waffle_flag_model
 
 import config.hosts
 from transit_odp.avl.constants import MORE_DATA_NEEDED, UNDERGOING
 from transit_odp.avl.csv.catalogue import get_avl_data_catalogue_csv
+from transit_odp.avl.models import PostPublishingCheckReport
 from transit_odp.avl.post_publishing_checks.constants import NO_PPC_DATA
 from transit_odp.avl.proxies import AVLDataset
+from transit_odp.browse.data_archive.bulk_data_archive import copy_zip_member
 from transit_odp.browse.exports import (
     FARES_FILENAME,
     LOCATION_FILENAME,
@@ -35,21 +48,47 @@ from transit_odp.common.utils import (
     get_dataset_type_from_path_info,
     remove_query_string_param,
 )
+from transit_odp.data_quality.models.report import (
+    DataQualityReport,
+    PTIObservation,
+    PTIValidationResult,
+)
+from transit_odp.fares.models import DataCatalogueMetaData, FaresMetadata
 from transit_odp.fares_validator.csv import get_fares_data_catalogue_csv
+from transit_odp.fares_validator.models import FaresValidationResult
 from transit_odp.feedback.models import Feedback, SatisfactionRating
 from transit_odp.organisation.constants import EXPIRED, INACTIVE, AVLType, DatasetType
 from transit_odp.organisation.csv import EmptyDataFrame
 from transit_odp.organisation.csv.consumer_feedback import ConsumerFeedbackAdminCSV
 from transit_odp.organisation.csv.organisation import get_organisation_catalogue_csv
 from transit_odp.organisation.csv.overall import get_overall_data_catalogue_csv
-from transit_odp.organisation.models import Dataset, ServiceCodeExemption
+from transit_odp.organisation.models import (
+    AVLComplianceCache,
+    Dataset,
+    DatasetMetadata,
+    DatasetRevision,
+    OperatorCode,
+    Organisation,
+    SeasonalService,
+    ServiceCodeExemption,
+    TXCFileAttributes,
+)
+from transit_odp.organisation.models import Licence as BODSLicence
+from transit_odp.otc.models import Licence as OTCLicence
+from transit_odp.otc.models import Operator as OTCOperator
+from transit_odp.otc.models import Service as OTCService
 from transit_odp.site_admin.csv import (
     DAILY_AGGREGATES_FILENAME,
     DAILY_CONSUMER_FILENAME,
     get_consumer_breakdown_csv,
     get_daily_aggregates_csv,
 )
-from transit_odp.site_admin.models import APIRequest, MetricsArchive, OperationalStats
+from transit_odp.site_admin.models import (
+    APIRequest,
+    DocumentArchive,
+    MetricsArchive,
+    OperationalStats,
+)
 from transit_odp.timetables.csv import get_timetable_catalogue_csv
 from transit_odp.users.constants import (
     AgentUserType,
@@ -60,7 +99,7 @@ from transit_odp.users.constants import (
 from transit_odp.users.models import Invitation
 
 User = get_user_model()
-CSVFile = namedtuple("CSVFile", "name, builder")
+Flag = get_waffle_flag_model()
 logger = logging.getLogger(__name__)
 
 
@@ -373,63 +412,247 @@ class ServiceCodeExemptionsCSV(CSVBuilder):
         )
 
 
-def create_operational_exports_file() -> BinaryIO:
-    buffer_ = io.BytesIO()
+@dataclass(frozen=True)
+class OperationalExport:
+    """A member of the operational exports archive.
+
+    `sources` are the models the member is built from. The member is copied from
+    the previous archive when none of their tables have changed since, on the
+    same day. Members without sources are built every time.
+    """
+
+    name: str
+    write: Callable[[zipfile.ZipFile, str], None]
+    sources: Tuple[Type[Model], ...] = ()
+    # Warning logged when the member is skipped because it has no data
+    empty_warning: Optional[str] = None
+
+
+def get_table_watermark(model: Type[Model]) -> str:
+    """
+    Returns the number of rows inserted, updated and deleted in the table of
+    `model` so far.
+
+    The counts are the statistics Postgres keeps for every table, so reading
+    them costs the same whatever the size of the table and they change however
+    a row is written, e.g. with QuerySet.update or bulk_update which don't set
+    a modified field. They are published shortly after a transaction commits,
+    so a write made just before an archive is built may only be picked up by
+    the next archive.
+    """
+    query = (
+        "SELECT n_tup_ins, n_tup_upd, n_tup_del FROM pg_stat_user_tables "
+        "WHERE relid = %s::regclass"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(query, [connection.ops.quote_name(model._meta.db_table)])
+        inserted, updated, deleted = cursor.fetchone()
+    return f"{inserted}:{updated}:{deleted}"
+
+
+def get_export_watermark(
+    export: OperationalExport, today: date, tables: Dict[str, str]
+) -> Optional[dict]:
+    """
+    Returns the watermark of `export`, None if it has no sources. The
+    watermarks of tables are cached in `tables`.
+    """
+    if not export.sources:
+        return None
+    for model in export.sources:
+        if model._meta.label not in tables:
+            tables[model._meta.label] = get_table_watermark(model)
+    return {
+        "date": today.isoformat(),
+        "tables": {
+            model._meta.label: tables[model._meta.label] for model in export.sources
+        },
+    }
+
+
+def builder_export(Builder: Type[CSVBuilder]) -> Callable[[zipfile.ZipFile, str], None]:
+    def write(archive: zipfile.ZipFile, name: str) -> None:
+        Builder().to_zip(archive, name)
+
+    return write
+
+
+def dataframe_export(
+    get_csv: Callable[[], str]
+) -> Callable[[zipfile.ZipFile, str], None]:
+    def write(archive: zipfile.ZipFile, name: str) -> None:
+        archive.writestr(name, get_csv())
+
+    return write
+
+
+def get_operational_exports() -> List[OperationalExport]:
     today = date.today().isoformat()
-    files = (
-        CSVFile("publishers.csv", PublisherCSV),
-        CSVFile("consumers.csv", ConsumerCSV),
-        CSVFile("stats.csv", OperationalStatsCSV),
-        CSVFile("agents.csv", AgentUserCSV),
-        CSVFile("datasetpublishing.csv", DatasetPublishingCSV),
-        CSVFile("feedback_report_operator_breakdown.csv", ConsumerFeedbackAdminCSV),
-        CSVFile("websiteFeedbackResponses.csv", WebsiteFeedbackCSV),
-        CSVFile(
+    dataset_sources = (
+        Organisation,
+        Dataset,
+        DatasetRevision,
+        AVLComplianceCache,
+        PostPublishingCheckReport,
+        User,
+    )
+    timetable_sources = (
+        Organisation,
+        Dataset,
+        DatasetRevision,
+        TXCFileAttributes,
+        DataQualityReport,
+        PTIValidationResult,
+        PTIObservation,
+        SeasonalService,
+        ServiceCodeExemption,
+        BODSLicence,
+        OTCLicence,
+        OTCOperator,
+        OTCService,
+    )
+    organisation_sources = timetable_sources + (
+        User,
+        Invitation,
+        OperatorCode,
+        AVLComplianceCache,
+        PostPublishingCheckReport,
+        DatasetMetadata,
+        FaresMetadata,
+        FaresValidationResult,
+        Flag,
+    )
+    fares_sources = (
+        Organisation,
+        Dataset,
+        DatasetRevision,
+        DatasetMetadata,
+        FaresMetadata,
+        DataCatalogueMetaData,
+        FaresValidationResult,
+        OperatorCode,
+    )
+    exports = [
+        OperationalExport("publishers.csv", builder_export(PublisherCSV)),
+        OperationalExport("consumers.csv", builder_export(ConsumerCSV)),
+        OperationalExport("stats.csv", builder_export(OperationalStatsCSV)),
+        OperationalExport("agents.csv", builder_export(AgentUserCSV)),
+        OperationalExport(
+            "datasetpublishing.csv",
+            builder_export(DatasetPublishingCSV),
+            sources=dataset_sources,
+        ),
+        OperationalExport(
+            "feedback_report_operator_breakdown.csv",
+            builder_export(ConsumerFeedbackAdminCSV),
+        ),
+        OperationalExport(
+            "websiteFeedbackResponses.csv", builder_export(WebsiteFeedbackCSV)
+        ),
+        OperationalExport(
             f"{today}-Service codes exempt from BODS reporting.csv",
-            ServiceCodeExemptionsCSV,
+            builder_export(ServiceCodeExemptionsCSV),
         ),
-    )
-    is_fares_validator_active = flag_is_active("", "is_fares_validator_active")
-
-    with zipfile.ZipFile(buffer_, mode="w", compression=ZIP_DEFLATED) as zin:
-        for file_ in files:
-            Builder = file_.builder
-            zin.writestr(file_.name, Builder().to_string())
-
-        prefix = "Pandas - to_csv - "
-        logger.info(prefix + f"Generating {ORGANISATION_FILENAME}")
-        try:
-            zin.writestr(ORGANISATION_FILENAME, get_organisation_catalogue_csv())
-        except EmptyDataFrame as exc:
-            logger.warning(OTC_EMPTY_WARNING, exc_info=exc)
-
-        logger.info(prefix + f"Generating {TIMETABLE_FILENAME}")
-        try:
-            zin.writestr(TIMETABLE_FILENAME, get_timetable_catalogue_csv())
-
-        except EmptyDataFrame as exc:
-            logger.warning(OTC_EMPTY_WARNING, exc_info=exc)
-
-        logger.info(prefix + f"Generating {OVERALL_FILENAME}")
-        try:
-            zin.writestr(OVERALL_FILENAME, get_overall_data_catalogue_csv())
-        except EmptyDataFrame:
-            pass
-
-        logger.info(prefix + f"Generating {LOCATION_FILENAME}")
-        try:
-            zin.writestr(LOCATION_FILENAME, get_avl_data_catalogue_csv())
-        except EmptyDataFrame:
-            pass
-
-        if is_fares_validator_active:
-            try:
-                zin.writestr(FARES_FILENAME, get_fares_data_catalogue_csv())
-            except EmptyDataFrame:
-                pass
-
-    buffer_.seek(0)
-    return buffer_
+        OperationalExport(
+            ORGANISATION_FILENAME,
+            dataframe_export(get_organisation_catalogue_csv),
+            sources=organisation_sources,
+            empty_warning=OTC_EMPTY_WARNING,
+        ),
+        OperationalExport(
+            TIMETABLE_FILENAME,
+            dataframe_export(get_timetable_catalogue_csv),
+            sources=timetable_sources,
+            empty_warning=OTC_EMPTY_WARNING,
+        ),
+        OperationalExport(
+            OVERALL_FILENAME,
+            dataframe_export(get_overall_data_catalogue_csv),
+            sources=dataset_sources
+            + (TXCFileAttributes, DataCatalogueMetaData, OperatorCode, Flag),
+        ),
+        OperationalExport(
+            LOCATION_FILENAME,
+            dataframe_export(get_avl_data_catalogue_csv),
+            sources=dataset_sources,
+        ),
+    ]
+    if flag_is_active("", "is_fares_validator_active"):
+        exports.append(
+            OperationalExport(
+                FARES_FILENAME,
+                dataframe_export(get_fares_data_catalogue_csv),
+                sources=fares_sources,
+            )
+        )
+    return exports
+
+
+def create_operational_exports_file(
+    file_: BinaryIO, previous: Optional[DocumentArchive] = None
+) -> Dict[str, dict]:
+    """
+    Writes the operational exports archive into `file_`.
+
+    Members whose watermark is the same as in the manifest of the `previous`
+    archive are copied from that archive. Returns the manifest of the archive,
+    the watermark of each member that has one.
+    """
+    today = date.today()
+    manifest = {}
+    tables = {}
+    copied = 0
+    with open_previous_document_archive(previous) as (zin, previous_manifest):
+        with zipfile.ZipFile(file_, mode="w", compression=ZIP_DEFLATED) as zout:
+            for export in get_operational_exports():
+                watermark = get_export_watermark(export, today, tables)
+                if (
+                    watermark is not None
+                    and zin is not None
+                    and previous_manifest.get(export.name) == watermark
+                    and export.name in zin.NameToInfo
+                ):
+                    copy_zip_member(zin, zin.getinfo(export.name), zout)
+                    manifest[export.name] = watermark
+                    copied += 1
+                    continue
+
+                logger.info(f"Generating {export.name}")
+                try:
+                    export.write(zout, export.name)
+                except EmptyDataFrame as exc:
+                    if export.empty_warning:
+                        logger.warning(export.empty_warning, exc_info=exc)
+                    continue
+                if watermark is not None:
+                    manifest[export.name] = watermark
+
+    logger.info(f"Copied {copied} unchanged operational exports from {previous}")
+    file_.seek(0)
+    return manifest
+
+
+@contextmanager
+def open_previous_document_archive(
+    previous: Optional[DocumentArchive],
+) -> Iterator[Tuple[Optional[zipfile.ZipFile], Dict[str, dict]]]:
+    """Opens the zip of `previous` and returns it with its manifest. Returns no
+    zip if there isn't a usable previous archive.
+    """
+    if previous is None or not previous.manifest:
+        yield None, {}
+        return
+
+    try:
+        fin = previous.archive.open("rb")
+        zin = zipfile.ZipFile(fin)
+    except (OSError, zipfile.BadZipFile):
+        logger.warning(f"Could not open {previous}, creating all operational exports")
+        yield None, {}
+        return
+
+    with fin, zin:
+        yield zin, previous.manifest
 
 
 class RawConsumerRequestCSV(CSVBuilder):
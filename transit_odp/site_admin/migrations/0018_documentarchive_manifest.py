@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2023-10-18 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("site_admin", "0017_add_unique_together_to_resource_counter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentarchive",
+            name="manifest",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
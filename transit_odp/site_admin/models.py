@@ -1,10 +1,9 @@
-from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import F, Q, UniqueConstraint
+from django.db.models import Q, UniqueConstraint
 from django.http import HttpRequest
 from django.http.response import FileResponse
 from django_extensions.db.models import TimeStampedModel
@@ -95,18 +94,18 @@ class ResourceRequestCounter(models.Model):
         return nice_repr(self)
 
     @classmethod
-    def from_request(cls, request: HttpRequest):
-        user = request.user if not request.user.is_anonymous else None
-        today = datetime.now().date()
-        resource_counter, _ = cls.objects.get_or_create(
-            requestor=user,
-            path_info=request.path,
-            date=today,
-            defaults={"counter": 0},
+    def from_request(cls, request: HttpRequest) -> None:
+        """
+        Counts a request for a resource, the count is added to the counter of
+        the requestor for the day when the request log is flushed.
+        """
+        from transit_odp.site_admin.request_log import (
+            record_event,
+            resource_request_event,
         )
-        resource_counter.counter = F("counter") + 1
-        resource_counter.save()
-        return resource_counter
+
+        user = request.user if not request.user.is_anonymous else None
+        record_event(resource_request_event(user and user.id, request.path))
 
 
 class MetricsArchive(models.Model):
@@ -134,6 +133,8 @@ class DocumentArchive(TimeStampedModel):
         default=ArchiveCategory.OPERATIONAL_METRICS.value,
         max_length=50,
     )
+    # The change watermark of each member of the archive
+    manifest = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return (
@@ -0,0 +1,223 @@
+"""Buffered logging of API requests and resource downloads.
+
+Events are pushed to a Redis list in the response path and written to
+APIRequest and ResourceRequestCounter in batches by `flush_request_log`, which
+runs every few seconds in `task_flush_request_log`. Events are only removed from
+the list once they have been saved, so a failed flush saves them again on the
+next run rather than losing them. A batch the database rejects is saved one
+event at a time, and the events that can't be saved are moved to a dead letter
+list so that they don't hold up the rest.
+
+The lists are kept in the Redis of REQUEST_LOG_REDIS_URL, the Celery broker by
+default, rather than in the cache. They have no expiry, so they are safe as long
+as that Redis doesn't evict keys without an expiry (its maxmemory-policy is
+noeviction or one of the volatile policies), which the Celery broker relies on
+too.
+"""
+import json
+from collections import Counter
+from functools import lru_cache
+from logging import getLogger
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, connection, transaction
+from django.utils import timezone
+from psycopg2.extras import execute_values
+from redis import Redis
+
+from transit_odp.site_admin.models import APIRequest, ResourceRequestCounter
+
+logger = getLogger(__name__)
+
+REQUEST_LOG_KEY = "site-admin-request-log"
+REQUEST_LOG_DEAD_LETTER_KEY = "site-admin-request-log-dead-letter"
+REQUEST_LOG_LOCK = "site-admin-request-log-flush"
+REQUEST_LOG_LOCK_TIMEOUT = 5 * 60
+API_REQUEST = "api"
+RESOURCE_REQUEST = "resource"
+
+CounterKey = Tuple[str, Optional[int], str]
+RequestEvent = Dict[str, Any]
+
+# Errors of an event that can't be saved, saving it again would fail again
+UNSAVEABLE_EVENT_ERRORS = (DataError, IntegrityError, KeyError, ValueError)
+
+
+@lru_cache(maxsize=None)
+def _get_redis(url: str) -> Redis:
+    return Redis.from_url(url)
+
+
+def get_request_log_redis() -> Redis:
+    """Returns a client of the Redis the request log is kept in."""
+    return _get_redis(settings.REQUEST_LOG_REDIS_URL)
+
+
+def api_request_event(
+    requestor_id: int, path_info: str, query_string: str
+) -> RequestEvent:
+    return {
+        "type": API_REQUEST,
+        "created": timezone.now().isoformat(),
+        "requestor_id": requestor_id,
+        "path_info": path_info,
+        "query_string": query_string,
+    }
+
+
+def resource_request_event(requestor_id: Optional[int], path_info: str) -> RequestEvent:
+    return {
+        "type": RESOURCE_REQUEST,
+        "date": timezone.localdate().isoformat(),
+        "requestor_id": requestor_id,
+        "path_info": path_info,
+    }
+
+
+def record_event(event: RequestEvent) -> None:
+    """
+    Adds an event to the request log, the event is saved straight away if
+    the log isn't buffered.
+    """
+    if not settings.REQUEST_LOG_BUFFERED:
+        save_events([event])
+        return
+    get_request_log_redis().rpush(REQUEST_LOG_KEY, json.dumps(event))
+
+
+def _insert_api_requests(rows: Iterable[tuple]) -> None:
+    # Inserted with SQL as bulk_create would replace the time of the requests
+    # with the time of the flush
+    table = APIRequest._meta.db_table
+    with connection.cursor() as cursor:
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} "
+            "(created, modified, requestor_id, path_info, query_string) VALUES %s",
+            rows,
+        )
+
+
+def _upsert_counters(counters: Dict[CounterKey, int]) -> None:
+    table = ResourceRequestCounter._meta.db_table
+    # There is a unique constraint for counters with and without a requestor
+    conflict_targets = {
+        True: "(date, requestor_id, path_info)",
+        False: "(date, path_info) WHERE requestor_id IS NULL",
+    }
+    for has_requestor, target in conflict_targets.items():
+        rows = [
+            (date_, requestor_id, path_info, count)
+            for (date_, requestor_id, path_info), count in counters.items()
+            if (requestor_id is not None) == has_requestor
+        ]
+        if not rows:
+            continue
+        with connection.cursor() as cursor:
+            execute_values(
+                cursor,
+                f"INSERT INTO {table} (date, requestor_id, path_info, counter) "
+                f"VALUES %s ON CONFLICT {target} DO UPDATE "
+                f"SET counter = {table}.counter + EXCLUDED.counter",
+                rows,
+            )
+
+
+def save_events(events: Iterable[RequestEvent]) -> None:
+    """
+    Saves request events, the resource requests are added to the counters of
+    their day.
+    """
+    api_requests = []
+    counters = Counter()
+    for event in events:
+        if event["type"] == API_REQUEST:
+            api_requests.append(
+                (
+                    event["created"],
+                    event["created"],
+                    event["requestor_id"],
+                    event["path_info"],
+                    event["query_string"],
+                )
+            )
+        elif event["type"] == RESOURCE_REQUEST:
+            key = (event["date"], event["requestor_id"], event["path_info"])
+            counters[key] += 1
+        else:
+            logger.warning(f"Unknown request event {event!r} is ignored.")
+
+    with transaction.atomic():
+        if api_requests:
+            _insert_api_requests(api_requests)
+        if counters:
+            _upsert_counters(counters)
+        # Checks the deferred foreign keys now rather than on commit, so that the
+        # events of a deleted requestor fail in this block
+        connection.check_constraints()
+
+
+def save_items_one_by_one(items: List[bytes]) -> List[bytes]:
+    """
+    Saves each event of `items` in its own transaction.
+
+    Returns the items of the events that can't be saved.
+    """
+    failed = []
+    for item in items:
+        try:
+            save_events([json.loads(item)])
+        except UNSAVEABLE_EVENT_ERRORS:
+            logger.exception(
+                f"Request event {item!r} can't be saved, it's moved to "
+                f"{REQUEST_LOG_DEAD_LETTER_KEY}."
+            )
+            failed.append(item)
+    return failed
+
+
+def flush_request_log(batch_size: Optional[int] = None) -> int:
+    """
+    Saves the events in the request log.
+
+    Returns the number of events saved.
+    """
+    batch_size = batch_size or settings.REQUEST_LOG_FLUSH_BATCH_SIZE
+    client = get_request_log_redis()
+    lock = client.lock(REQUEST_LOG_LOCK, timeout=REQUEST_LOG_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        logger.info("Request log is already being flushed.")
+        return 0
+
+    flushed = 0
+    try:
+        while True:
+            items = client.lrange(REQUEST_LOG_KEY, 0, batch_size - 1)
+            if not items:
+                break
+            failed = []
+            try:
+                save_events(json.loads(item) for item in items)
+            except UNSAVEABLE_EVENT_ERRORS:
+                logger.warning(
+                    f"Saving a batch of {len(items)} request events failed, saving "
+                    "them one at a time.",
+                    exc_info=True,
+                )
+                failed = save_items_one_by_one(items)
+
+            pipeline = client.pipeline()
+            if failed:
+                pipeline.rpush(REQUEST_LOG_DEAD_LETTER_KEY, *failed)
+            pipeline.ltrim(REQUEST_LOG_KEY, len(items), -1)
+            pipeline.execute()
+            flushed += len(items) - len(failed)
+            if len(items) < batch_size:
+                break
+    finally:
+        lock.release()
+
+    if flushed:
+        logger.info(f"Saved {flushed} request events.")
+    return flushed
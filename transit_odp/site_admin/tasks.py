@@ -1,4 +1,5 @@
 import logging
+import tempfile
 from datetime import timedelta
 
 from celery import shared_task
@@ -24,6 +25,7 @@ from transit_odp.site_admin.models import (
     OperationalStats,
     ResourceRequestCounter,
 )
+from transit_odp.site_admin.request_log import flush_request_log
 from transit_odp.site_admin.stats import (
     get_active_dataset_counts,
     get_operator_count,
@@ -122,8 +124,6 @@ def task_backfill_metrics_archive():
 @shared_task()
 def task_create_operational_exports_archive():
     filename = ARCHIVE_CATEGORY_FILENAME[OperationalMetrics]
-    buffer_ = create_operational_exports_file()
-    archive = File(buffer_, name=filename)
 
     logger.info("[OperationalMetricsArchive] Creating operational metrics export.")
     metrics = (
@@ -131,10 +131,22 @@ def task_create_operational_exports_archive():
         .order_by("modified")
         .last()
     )
-    if metrics is None:
-        DocumentArchive.objects.create(archive=archive, category=OperationalMetrics)
-    else:
-        metrics.archive.save(filename, archive)
+    with tempfile.TemporaryFile() as file_:
+        manifest = create_operational_exports_file(file_, previous=metrics)
+        archive = File(file_, name=filename)
+        if metrics is None:
+            DocumentArchive.objects.create(
+                archive=archive, category=OperationalMetrics, manifest=manifest
+            )
+        else:
+            metrics.manifest = manifest
+            metrics.archive.save(filename, archive)
+
+
+@shared_task(ignore_result=True)
+def task_flush_request_log():
+    """Saves the API requests and resource downloads buffered since the last run"""
+    flush_request_log()
 
 
 @shared_task()
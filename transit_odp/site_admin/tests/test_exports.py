@@ -32,6 +32,7 @@ from transit_odp.organisation.factories import (
     OrganisationFactory,
     ServiceCodeExemptionFactory,
 )
+from transit_odp.site_admin.constants import OperationalMetrics
 from transit_odp.site_admin.csv.dailyaggregates import (
     get_daily_aggregates_csv,
     get_daily_aggregates_df,
@@ -54,7 +55,8 @@ from transit_odp.site_admin.factories import (
     OperationalStatsFactory,
     ResourceRequestCounterFactory,
 )
-from transit_odp.site_admin.models import MetricsArchive
+from transit_odp.site_admin.models import DocumentArchive, MetricsArchive
+from transit_odp.site_admin.tasks import task_create_operational_exports_archive
 from transit_odp.users.constants import (
     AgentUserType,
     DeveloperType,
@@ -864,3 +866,51 @@ class TestServiceCodeExemptionsCSV:
         assert lines[3][2] == "PA000001/1"
         assert lines[4][2] == "PA000001/2"
         assert lines[5][2] == "PS000001/1"
+
+
+class TestOperationalExportsArchive:
+    def get_archive(self):
+        return DocumentArchive.objects.get(category=OperationalMetrics)
+
+    def test_unchanged_members_are_copied(self, mocker):
+        DatasetFactory()
+        to_zip = mocker.spy(DatasetPublishingCSV, "to_zip")
+        task_create_operational_exports_archive()
+        archive = self.get_archive()
+        with zipfile.ZipFile(archive.archive.open("rb")) as zf:
+            expected = zf.read("datasetpublishing.csv")
+
+        task_create_operational_exports_archive()
+
+        assert to_zip.call_count == 1
+        archive = self.get_archive()
+        assert "datasetpublishing.csv" in archive.manifest
+        with zipfile.ZipFile(archive.archive.open("rb")) as zf:
+            assert zf.testzip() is None
+            assert zf.read("datasetpublishing.csv") == expected
+
+    def test_changed_members_are_created(self, mocker):
+        DatasetFactory()
+        to_zip = mocker.spy(DatasetPublishingCSV, "to_zip")
+        task_create_operational_exports_archive()
+
+        dataset = DatasetFactory()
+        task_create_operational_exports_archive()
+
+        assert to_zip.call_count == 2
+        archive = self.get_archive()
+        with zipfile.ZipFile(archive.archive.open("rb")) as zf:
+            content = zf.read("datasetpublishing.csv").decode()
+        lines = list(csv.reader(content.splitlines()))
+        assert len(lines) == 3
+        assert lines[2][2] == str(dataset.id)
+
+    def test_members_are_created_every_day(self, mocker):
+        DatasetFactory()
+        to_zip = mocker.spy(DatasetPublishingCSV, "to_zip")
+        with freeze_time("2023-10-16"):
+            task_create_operational_exports_archive()
+        with freeze_time("2023-10-17"):
+            task_create_operational_exports_archive()
+
+        assert to_zip.call_count == 2
@@ -0,0 +1,162 @@
+import json
+from datetime import date, datetime
+
+import pytest
+import pytz
+from django_hosts.resolvers import reverse
+from freezegun import freeze_time
+
+import config
+from transit_odp.site_admin.models import APIRequest, ResourceRequestCounter
+from transit_odp.site_admin.request_log import (
+    REQUEST_LOG_DEAD_LETTER_KEY,
+    REQUEST_LOG_KEY,
+    api_request_event,
+    flush_request_log,
+    resource_request_event,
+    save_events,
+)
+from transit_odp.users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+REQUEST_LOG_MODULE = "transit_odp.site_admin.request_log"
+
+
+class FakeLock:
+    def acquire(self, blocking=True):
+        return True
+
+    def release(self):
+        pass
+
+
+class FakeRedis:
+    """The Redis list commands used by the request log."""
+
+    def __init__(self):
+        self.lists = {}
+
+    def lock(self, name, timeout=None):
+        return FakeLock()
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(value.encode() for value in values)
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start : end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists.get(key, [])[start:]
+
+    def pipeline(self):
+        return self
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def redis(mocker, settings):
+    settings.REQUEST_LOG_BUFFERED = True
+    client = FakeRedis()
+    mocker.patch(f"{REQUEST_LOG_MODULE}.get_request_log_redis", return_value=client)
+    return client
+
+
+def test_save_events_keeps_request_time():
+    user = UserFactory()
+    with freeze_time("2023-01-01 12:00:00"):
+        events = [
+            api_request_event(user.id, "/api/v1/dataset/", "limit=10"),
+            resource_request_event(user.id, "/timetable/download/bulk_archive"),
+            resource_request_event(user.id, "/timetable/download/bulk_archive"),
+            resource_request_event(None, "/timetable/download/bulk_archive"),
+        ]
+
+    save_events(events)
+
+    api_request = APIRequest.objects.get()
+    assert api_request.requestor == user
+    assert api_request.query_string == "limit=10"
+    assert api_request.created == datetime(2023, 1, 1, 12, tzinfo=pytz.utc)
+    counters = {
+        counter.requestor_id: counter
+        for counter in ResourceRequestCounter.objects.all()
+    }
+    assert len(counters) == 2
+    assert counters[user.id].counter == 2
+    assert counters[user.id].date == date(2023, 1, 1)
+    assert counters[None].counter == 1
+
+
+def test_save_events_adds_to_counters():
+    user = UserFactory()
+    path_info = "/timetable/download/bulk_archive"
+    ResourceRequestCounter.objects.create(
+        requestor=user, path_info=path_info, date=date.today(), counter=3
+    )
+    ResourceRequestCounter.objects.create(
+        requestor=None, path_info=path_info, date=date.today(), counter=1
+    )
+
+    save_events(
+        [
+            resource_request_event(user.id, path_info),
+            resource_request_event(None, path_info),
+        ]
+    )
+
+    assert ResourceRequestCounter.objects.count() == 2
+    assert ResourceRequestCounter.objects.get(requestor=user).counter == 4
+    assert ResourceRequestCounter.objects.get(requestor=None).counter == 2
+
+
+def test_api_requests_are_buffered(redis, client_factory):
+    host = config.hosts.DATA_HOST
+    url = reverse("api:fares-api-list", host=host)
+    client = client_factory(host=host)
+    user = UserFactory()
+    client.force_login(user=user)
+
+    client.get(url, {"noc": "BLAH"})
+    client.get(url, {"noc": "BLAH"})
+    assert APIRequest.objects.count() == 0
+    assert len(redis.lists[REQUEST_LOG_KEY]) == 2
+
+    assert flush_request_log(batch_size=1) == 2
+    assert APIRequest.objects.filter(requestor=user).count() == 2
+    assert redis.lists[REQUEST_LOG_KEY] == []
+
+
+def test_failed_flush_keeps_events(redis, mocker):
+    user = UserFactory()
+    event = resource_request_event(user.id, "/timetable/download/bulk_archive")
+    redis.rpush(REQUEST_LOG_KEY, json.dumps(event))
+    mocker.patch(f"{REQUEST_LOG_MODULE}.save_events", side_effect=Exception)
+
+    with pytest.raises(Exception):
+        flush_request_log()
+    assert len(redis.lists[REQUEST_LOG_KEY]) == 1
+
+
+def test_unsaveable_events_are_moved_to_dead_letter_list(redis):
+    user = UserFactory()
+    path_info = "/timetable/download/bulk_archive"
+    deleted_user = UserFactory()
+    unsaveable = resource_request_event(deleted_user.id, path_info)
+    deleted_user.delete()
+    for event in (
+        resource_request_event(user.id, path_info),
+        unsaveable,
+        resource_request_event(None, path_info),
+    ):
+        redis.rpush(REQUEST_LOG_KEY, json.dumps(event))
+    redis.rpush(REQUEST_LOG_KEY, "not json")
+
+    assert flush_request_log() == 2
+    assert ResourceRequestCounter.objects.count() == 2
+    assert redis.lists[REQUEST_LOG_KEY] == []
+    assert [item.decode() for item in redis.lists[REQUEST_LOG_DEAD_LETTER_KEY]] == [
+        json.dumps(unsaveable),
+        "not json",
+    ]
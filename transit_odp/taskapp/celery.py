@@ -134,6 +134,10 @@ class CeleryAppConfig(AppConfig):
                 "task": ADMIN_TASKS + "task_create_operational_exports_archive",
                 "schedule": 1.0 * 60.0 * 60.0,
             },
+            "flush_request_log": {
+                "task": ADMIN_TASKS + "task_flush_request_log",
+                "schedule": settings.REQUEST_LOG_FLUSH_INTERVAL,
+            },
             "task_delete_unwanted_data": {
                 "task": ADMIN_TASKS + "task_delete_unwanted_data",
                 "schedule": crontab(minute=45, hour=0),
@@ -142,6 +146,12 @@ class CeleryAppConfig(AppConfig):
                 "task": BROWSE_TASKS + "task_create_data_catalogue_archive",
                 "schedule": 1.0 * 60.0 * 60.0,
             },
+            # staleness depends on the date, the services are evaluated again
+            # every day
+            "refresh_service_staleness": {
+                "task": PUBLISH_TASKS + "task_refresh_service_staleness",
+                "schedule": crontab(minute=5, hour=0),
+            },
             "update_otc_data": {
                 "task": OTC_TASKS + "task_refresh_otc_data",
                 "schedule": crontab(minute=30, hour=23),
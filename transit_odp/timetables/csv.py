@@ -1,15 +1,14 @@
 import datetime
 from collections import OrderedDict
-from typing import Optional
+from typing import List, Optional
 
 import numpy as np
 import pandas as pd
-from pandas import Series
 
 from transit_odp.common.collections import Column
 from transit_odp.organisation.csv import EmptyDataFrame
+from transit_odp.organisation.models import Licence as BODSLicence
 from transit_odp.organisation.models import (
-    Organisation,
     SeasonalService,
     ServiceCodeExemption,
     TXCFileAttributes,
@@ -291,28 +290,56 @@ TIMETABLE_COLUMN_MAP = OrderedDict(
 )
 
 
-def add_operator_name(row: Series) -> str:
-    if row["organisation_name"] is None or pd.isna(row["organisation_name"]):
-        otc_licence_number = row["otc_licence_number"]
-        operator_name = Organisation.objects.get_organisation_name(otc_licence_number)
+def get_licence_organisation_names() -> pd.DataFrame:
+    """
+    Returns the name of the organisation of each BODS licence number, the
+    first by name when the number is held by more than one organisation.
+    """
+    licences_df = pd.DataFrame.from_records(
+        BODSLicence.objects.values_list("number", "organisation__name"),
+        columns=["otc_licence_number", "licence_organisation_name"],
+    )
+    return (
+        licences_df.dropna()
+        .groupby("otc_licence_number", as_index=False)["licence_organisation_name"]
+        .min()
+    )
+
+
+def add_operator_name(df: pd.DataFrame, licence_names_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fills in the organisation name of services that are only in the OTC with the
+    organisation that holds their licence in BODS.
+    """
+    licence_names = licence_names_df.set_index("otc_licence_number")[
+        "licence_organisation_name"
+    ]
+    operator_name = df["otc_licence_number"].map(licence_names)
+    operator_name = operator_name.where(
+        operator_name.notna() & (operator_name != ""), "Organisation not yet created"
+    )
+    df["organisation_name"] = df["organisation_name"].where(
+        df["organisation_name"].notna(), operator_name
+    )
+    return df
 
-        if not operator_name:
-            return "Organisation not yet created"
-        else:
-            return operator_name
-    else:
-        return row["organisation_name"]
+
+def get_exempted_registration_numbers() -> List[str]:
+    return list(
+        ServiceCodeExemption.objects.add_registration_number().values_list(
+            "registration_number", flat=True
+        )
+    )
 
 
-def add_status_columns(df: pd.DataFrame) -> pd.DataFrame:
+def add_status_columns(
+    df: pd.DataFrame, exempted_registration_numbers: List[str]
+) -> pd.DataFrame:
     exists_in_bods = np.invert(pd.isna(df["dataset_id"]))
     exists_in_otc = np.invert(pd.isna(df["otc_licence_number"]))
-    exempted_reg_numbers = (
-        ServiceCodeExemption.objects.add_registration_number()
-        .values_list("registration_number", flat=True)
-        .all()
+    registration_number_exempted = df["registration_number"].isin(
+        exempted_registration_numbers
     )
-    registration_number_exempted = df["registration_number"].isin(exempted_reg_numbers)
 
     df["published_status"] = np.where(exists_in_bods, "Published", "Unpublished")
     df["otc_status"] = np.where(exists_in_otc, "Registered", "Unregistered")
@@ -322,20 +349,25 @@ def add_status_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def add_seasonal_status(df: pd.DataFrame, today: datetime.date) -> pd.DataFrame:
-    seasonal_services_df = pd.DataFrame.from_records(
+def get_seasonal_services() -> pd.DataFrame:
+    return pd.DataFrame.from_records(
         SeasonalService.objects.add_registration_number().values(
             *SEASONAL_SERVICE_COLUMNS
         )
     )
+
+
+def add_seasonal_status(
+    df: pd.DataFrame, today: datetime.date, seasonal_services_df: pd.DataFrame
+) -> pd.DataFrame:
     if seasonal_services_df.empty:
         df["seasonal_start"] = pd.NaT
         df["seasonal_end"] = pd.NaT
         df["seasonal_status"] = "Not Seasonal"
         return df
 
-    seasonal_services_df.rename(
-        columns={"start": "seasonal_start", "end": "seasonal_end"}, inplace=True
+    seasonal_services_df = seasonal_services_df.rename(
+        columns={"start": "seasonal_start", "end": "seasonal_end"}
     )
     annotated_df = pd.merge(
         df, seasonal_services_df, on="registration_number", how="left"
@@ -364,12 +396,10 @@ def add_staleness_metrics(df: pd.DataFrame, today: datetime.date) -> pd.DataFram
     df["effective_stale_date_from_end_date"] = df[
         "operating_period_end_date"
     ] - pd.Timedelta(days=42)
-    defer_one_year = (
-        lambda d: d if pd.isna(d) else datetime.date(d.year + 1, d.month, d.day)
-    )
-    df["effective_stale_date_from_last_modified"] = df[
-        "effective_last_modified_date"
-    ].apply(defer_one_year)
+    # 29 February is deferred to 28 February
+    df["effective_stale_date_from_last_modified"] = (
+        pd.to_datetime(df["effective_last_modified_date"]) + pd.DateOffset(years=1)
+    ).dt.date
     df["effective_stale_date_from_otc_effective"] = df["effective_date"] - pd.Timedelta(
         days=42
     )
@@ -458,15 +488,19 @@ def cast_boolean_to_string(value: Optional[bool]) -> str:
         return "NO"
 
 
-def _get_timetable_catalogue_dataframe() -> pd.DataFrame:
-    today = datetime.date.today()
-
-    txc_df = pd.DataFrame.from_records(
-        TXCFileAttributes.objects.get_active_txc_files().values(*TXC_COLUMNS)
-    )
-    otc_df = pd.DataFrame.from_records(
-        OTCService.objects.add_timetable_data_annotations().values(*OTC_COLUMNS)
-    )
+def build_timetable_catalogue(
+    txc_df: pd.DataFrame,
+    otc_df: pd.DataFrame,
+    licence_names_df: pd.DataFrame,
+    exempted_registration_numbers: List[str],
+    seasonal_services_df: pd.DataFrame,
+    today: datetime.date,
+) -> pd.DataFrame:
+    """
+    Returns the timetable catalogue of the TXC files in `txc_df` and the OTC
+    services in `otc_df`, the columns are computed from the lookup frames
+    rather than querying the database for each row.
+    """
     if txc_df.empty or otc_df.empty:
         raise EmptyDataFrame()
 
@@ -484,9 +518,9 @@ def _get_timetable_catalogue_dataframe() -> pd.DataFrame:
         merged[field] = merged[field].astype(type_)
 
     merged.sort_values("dataset_id", inplace=True)
-    merged["organisation_name"] = merged.apply(lambda x: add_operator_name(x), axis=1)
-    merged = add_status_columns(merged)
-    merged = add_seasonal_status(merged, today)
+    merged = add_operator_name(merged, licence_names_df)
+    merged = add_status_columns(merged, exempted_registration_numbers)
+    merged = add_seasonal_status(merged, today, seasonal_services_df)
     merged = add_staleness_metrics(merged, today)
     merged = add_requires_attention_column(merged, today)
 
@@ -498,5 +532,27 @@ def _get_timetable_catalogue_dataframe() -> pd.DataFrame:
     return merged
 
 
+def _get_timetable_catalogue_dataframe() -> pd.DataFrame:
+    today = datetime.date.today()
+
+    txc_df = pd.DataFrame.from_records(
+        TXCFileAttributes.objects.get_active_txc_files().values(*TXC_COLUMNS)
+    )
+    otc_df = pd.DataFrame.from_records(
+        OTCService.objects.add_timetable_data_annotations().values(*OTC_COLUMNS)
+    )
+    if txc_df.empty or otc_df.empty:
+        raise EmptyDataFrame()
+
+    return build_timetable_catalogue(
+        txc_df,
+        otc_df,
+        get_licence_organisation_names(),
+        get_exempted_registration_numbers(),
+        get_seasonal_services(),
+        today,
+    )
+
+
 def get_timetable_catalogue_csv():
     return _get_timetable_catalogue_dataframe().to_csv(index=False)
@@ -22,9 +22,10 @@ from transit_odp.pipelines.pipelines.dataset_etl.utils.stats import (
 )
 from transit_odp.timetables.extract import (
     TransXChangeExtractor,
-    TransXChangeZipExtractor,
+    TransXChangeStoreExtractor,
 )
-from transit_odp.timetables.loaders import TransXChangeDataLoader
+from transit_odp.timetables.loaders import get_loader_class
+from transit_odp.timetables.store import TXCDocumentStore
 from transit_odp.timetables.transformers import TransXChangeTransformer
 from transit_odp.transmodel.models import AdminArea, Locality, Service
 
@@ -61,7 +62,8 @@ class TransXChangePipeline:
         logger.info("Begin extraction step")
         filename = self.file_obj.file.name
         if self.file_obj.file.name.endswith("zip"):
-            extractor = TransXChangeZipExtractor(self.file_obj, self.start_time)
+            store = TXCDocumentStore(self.revision)
+            extractor = TransXChangeStoreExtractor(store, self.start_time)
         elif self.file_obj.file.name.endswith("xml"):
             extractor = TransXChangeExtractor(self.file_obj, self.start_time)
         else:
@@ -83,7 +85,7 @@ class TransXChangePipeline:
 
     def load(self, transformed: TransformedData) -> ETLReport:
         logger.info("Begin load step")
-        loader = TransXChangeDataLoader(
+        loader = get_loader_class()(
             transformed,
             self.service_cache,
             self.service_link_cache,
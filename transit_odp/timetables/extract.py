@@ -1,8 +1,15 @@
+import os
+import pickle
+import time
 import zipfile
-from datetime import datetime
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
 
+import attr
 import pandas as pd
 from celery.utils.log import get_task_logger
+from django.conf import settings
 from django.core.files.base import File
 from shapely.geometry import Point
 
@@ -26,10 +33,110 @@ from transit_odp.timetables.dataframes import (
     stop_point_refs_to_dataframe,
 )
 from transit_odp.timetables.exceptions import MissingLines
+from transit_odp.timetables.store import TXCDocumentStore
 from transit_odp.timetables.transxchange import TransXChangeDocument
 
 logger = get_task_logger(__name__)
 
+EXTRACT_CACHE_NAME = "extracts"
+EXTRACT_CACHE_MAX_AGE = timedelta(days=7)
+# Increment when a change to TransXChangeExtractor changes what it extracts, so
+# extracts cached by the previous version aren't used
+EXTRACTOR_VERSION = 1
+
+# The fields of ExtractedData with a file_id in their index
+FILE_ID_FIELDS = (
+    "services",
+    "journey_patterns",
+    "jp_to_jps",
+    "jp_sections",
+    "timing_links",
+    "routes",
+    "route_to_route_links",
+    "route_links",
+)
+
+
+def set_file_id(extracted: ExtractedData, file_id: int) -> ExtractedData:
+    """
+    Returns a copy of `extracted` with the file_id of every DataFrame set to
+    `file_id`.
+    """
+    changes = {}
+    for field in FILE_ID_FIELDS:
+        df = getattr(extracted, field)
+        if "file_id" in df.index.names:
+            names = list(df.index.names)
+            df = df.reset_index()
+            df["file_id"] = file_id
+            df = df.set_index(names)
+        changes[field] = df
+    return attr.evolve(extracted, **changes)
+
+
+class TXCExtractCache:
+    """A local cache of the ExtractedData of TransXChange files keyed by the sha1
+    hash of the file, the version of the extractor and the version of pandas
+    the entry was pickled with.
+
+    A file that is unchanged between revisions of a dataset is only extracted
+    once per worker. Entries that haven't been used for `EXTRACT_CACHE_MAX_AGE`
+    are removed by `prune`, which runs on every worker that extracts files.
+
+    Args:
+        root: The directory the cache is kept in, defaults to
+            `settings.TXC_DOCUMENT_STORE_DIR`.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        root = root or settings.TXC_DOCUMENT_STORE_DIR
+        self.directory = Path(root) / EXTRACT_CACHE_NAME
+
+    def get_path(self, hash_: str) -> Path:
+        version = f"v{EXTRACTOR_VERSION}-pandas{pd.__version__}"
+        return self.directory / f"{hash_}.{version}.pickle"
+
+    def get(self, hash_: str) -> Optional[ExtractedData]:
+        path = self.get_path(hash_)
+        if not path.exists():
+            return None
+
+        try:
+            with path.open("rb") as f:
+                extracted = pickle.load(f)
+        except Exception:
+            logger.warning(f"Unable to read cached extract {path}.", exc_info=True)
+            return None
+
+        path.touch()
+        return extracted
+
+    def set(self, hash_: str, extracted: ExtractedData) -> None:
+        # Write to a temporary file first so a partial entry is never read
+        temp_path = self.directory / f"{hash_}.{os.getpid()}.tmp"
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with temp_path.open("wb") as f:
+                pickle.dump(extracted, f, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_path.replace(self.get_path(hash_))
+        except OSError:
+            logger.warning(f"Unable to cache extract {hash_}.", exc_info=True)
+
+    def prune(self, max_age: timedelta = EXTRACT_CACHE_MAX_AGE) -> int:
+        """
+        Removes the entries that haven't been used within `max_age`.
+        """
+        if not self.directory.exists():
+            return 0
+
+        removed = 0
+        cutoff = time.time() - max_age.total_seconds()
+        for path in self.directory.glob("*.pickle"):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
 
 class TransXChangeExtractor:
     """An API equivalent replacement for XmlFileParser."""
@@ -234,6 +341,9 @@ class TransXChangeZipExtractor:
                     extracted = extractor.extract()
                     extracts.append(extracted)
 
+        return self.aggregate(extracts)
+
+    def aggregate(self, extracts: List[ExtractedData]) -> ExtractedData:
         return ExtractedData(
             services=concat_and_dedupe((extract.services for extract in extracts)),
             stop_points=concat_and_dedupe(
@@ -270,3 +380,57 @@ class TransXChangeZipExtractor:
                 concat_and_dedupe((extract.stop_points for extract in extracts))
             ),
         )
+
+
+class TransXChangeStoreExtractor(TransXChangeZipExtractor):
+    """Extracts the files of a zipped revision from its TXCDocumentStore rather
+    than unpacking the zip file again.
+
+    Files that have been extracted before, e.g. files that are unchanged from
+    the live revision, are read from the TXCExtractCache instead of being parsed.
+    """
+
+    def __init__(
+        self,
+        store: TXCDocumentStore,
+        start_time,
+        cache: Optional[TXCExtractCache] = None,
+    ):
+        super().__init__(store.revision.upload_file, start_time)
+        self.store = store
+        self.cache = cache or TXCExtractCache()
+
+    def extract(self) -> ExtractedData:
+        logger.info(f"Extracting files from {self.store}")
+        try:
+            return self.extract_stored_files()
+        except zipfile.BadZipFile as e:
+            raise exceptions.FileError(filename=self.file_obj.name) from e
+        except exceptions.PipelineException:
+            raise
+        except Exception as e:
+            raise exceptions.PipelineException from e
+
+    def extract_stored_files(self) -> ExtractedData:
+        extracts = []
+        stored_files = self.store.get_stored_files()
+        logger.info(f"Total files in store: {len(stored_files)}")
+
+        # Each worker has its own cache, so it's pruned wherever files are extracted
+        self.cache.prune()
+        for file_id, stored in enumerate(stored_files):
+            extracted = self.cache.get(stored.hash)
+            if extracted is None:
+                logger.info(f"Extracting: {stored.name}")
+                file_obj = File(self.store.open(stored), name=stored.name)
+                extractor = TransXChangeExtractor(file_obj, self.start_time)
+                extracted = extractor.extract()
+                self.cache.set(stored.hash, extracted)
+            else:
+                logger.info(f"{stored.name} unchanged, using cached extract.")
+                extracted = attr.evolve(extracted, import_datetime=self.start_time)
+
+            # Cached extracts carry the file_id of the run that extracted them
+            extracts.append(set_file_id(extracted, file_id))
+
+        return self.aggregate(extracts)
@@ -0,0 +1,71 @@
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from transit_odp.organisation.models import DatasetRevision, TXCFileAttributes
+from transit_odp.timetables.store import StoredFile
+
+
+class LiveRevisionFiles:
+    """The TransXChange files of the live revision of a draft revision's dataset.
+
+    Files are identified by the sha1 hash recorded in the TXCFileAttributes of the
+    live revision, so the files of the live revision never have to be read. A file
+    in the draft revision with the same hash as a file in the live revision is
+    unchanged and the results of processing it when the live revision was
+    published can be reused instead of processing it again.
+
+    Args:
+        revision: The draft revision being processed.
+
+    Example:
+        live_files = LiveRevisionFiles(revision)
+        for stored in live_files.get_changed(store.get_stored_files()):
+            validate(store.open(stored))
+    """
+
+    def __init__(self, revision: DatasetRevision):
+        self.revision = revision
+        self._attributes: Optional[Dict[str, TXCFileAttributes]] = None
+
+    @property
+    def attributes(self) -> Dict[str, TXCFileAttributes]:
+        """
+        Returns the TXCFileAttributes of the live revision keyed by hash.
+        """
+        if self._attributes is not None:
+            return self._attributes
+
+        self._attributes = {}
+        live_revision_id = self.revision.dataset.live_revision_id
+        if live_revision_id is not None and live_revision_id != self.revision.id:
+            attributes = TXCFileAttributes.objects.filter(
+                revision_id=live_revision_id
+            ).exclude(hash="")
+            self._attributes = {attrs.hash: attrs for attrs in attributes}
+        return self._attributes
+
+    def get_hashes(self) -> Set[str]:
+        return set(self.attributes)
+
+    def is_unchanged(self, stored: StoredFile) -> bool:
+        return stored.hash in self.attributes
+
+    def get_changed(self, stored_files: Iterable[StoredFile]) -> List[StoredFile]:
+        """
+        Returns the files in `stored_files` that aren't in the live revision.
+        """
+        return [stored for stored in stored_files if not self.is_unchanged(stored)]
+
+    def copy_attributes(self, stored: StoredFile) -> TXCFileAttributes:
+        """
+        Returns a copy of the live TXCFileAttributes of an unchanged file for
+        the draft revision.
+        """
+        live = self.attributes[stored.hash]
+        fields = {
+            field.attname: getattr(live, field.attname)
+            for field in TXCFileAttributes._meta.concrete_fields
+            if not field.primary_key
+        }
+        fields.update(revision_id=self.revision.id, filename=Path(stored.name).name)
+        return TXCFileAttributes(**fields)
@@ -1,11 +1,16 @@
+from typing import List
+
 import numpy as np
 import pandas as pd
 from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db import connection
 from django.db.models import Q
 
 from transit_odp.common.loggers import get_dataset_adapter_from_revision
 from transit_odp.pipelines import exceptions
 from transit_odp.pipelines.pipelines.dataset_etl.utils.dataframes import (
+    create_service_link_df,
     create_service_link_df_from_queryset,
     df_to_service_links,
     df_to_service_patterns,
@@ -21,6 +26,12 @@ from transit_odp.pipelines.pipelines.dataset_etl.utils.loaders import (
     add_service_pattern_to_admin_area,
     add_service_pattern_to_localities,
     add_service_pattern_to_service_pattern_stops,
+    allocate_ids,
+    copy_rows,
+    copy_service_associations,
+    copy_service_pattern_stops,
+    copy_service_pattern_to_admin_area,
+    copy_service_pattern_to_localities,
     create_feed_name,
 )
 from transit_odp.pipelines.pipelines.dataset_etl.utils.models import TransformedData
@@ -33,6 +44,32 @@ from transit_odp.transmodel.models import Service, ServiceLink, ServicePattern
 BATCH_SIZE = 2000
 logger = get_task_logger(__name__)
 
+SERVICE_COLUMNS = [
+    "id",
+    "revision_id",
+    "service_code",
+    "name",
+    "other_names",
+    "start_date",
+    "end_date",
+]
+SERVICE_PATTERN_COLUMNS = [
+    "id",
+    "revision_id",
+    "service_pattern_id",
+    "origin",
+    "destination",
+    "description",
+    "geom",
+]
+SERVICE_LINK_COLUMNS = [
+    "id",
+    "from_stop_atco",
+    "to_stop_atco",
+    "from_stop_id",
+    "to_stop_id",
+]
+
 
 class TransXChangeDataLoader:
     def __init__(self, transformed: TransformedData, service_cache, service_link_cache):
@@ -108,8 +145,7 @@ class TransXChangeDataLoader:
         # as the services dataframe
         services = self.transformed.services
         services.reset_index(inplace=True)
-        service_objs = list(df_to_services(revision, services))
-        created = Service.objects.bulk_create(service_objs, batch_size=BATCH_SIZE)
+        created = self.create_services(revision, services)
         services["id"] = pd.Series((obj.id for obj in created))
 
         # set index back again
@@ -150,12 +186,7 @@ class TransXChangeDataLoader:
             # Select missing service_links from input data
             missing = service_links.loc[sorted(missing_links)]
 
-            service_link_objs = list(df_to_service_links(missing))
-            created = create_service_link_df_from_queryset(
-                ServiceLink.objects.bulk_create(
-                    service_link_objs, batch_size=BATCH_SIZE
-                )
-            )
+            created = self.create_service_links(missing)
 
             # Update cache with fetched and newly created
             service_link_cache = pd.concat(
@@ -172,22 +203,7 @@ class TransXChangeDataLoader:
         service_pattern_stops = self.transformed.service_pattern_stops
 
         adapter.info("Bulk creating service patterns.")
-        service_pattern_objs = df_to_service_patterns(revision, service_patterns)
-        created = ServicePattern.objects.bulk_create(
-            service_pattern_objs, batch_size=BATCH_SIZE
-        )
-
-        created = pd.DataFrame(
-            (
-                {
-                    "service_pattern_id": obj.service_pattern_id,
-                    "id": obj.id,
-                    "instance": obj,
-                }
-                for obj in created
-            )
-        )
-
+        created = self.create_service_patterns(revision, service_patterns)
         if not created.empty:
             created = created.set_index("service_pattern_id")
 
@@ -203,22 +219,180 @@ class TransXChangeDataLoader:
 
         # Create ServicePatternStops and add to ServicePattern
         adapter.info("Creating service pattern stops.")
-        add_service_pattern_to_service_pattern_stops(
-            service_pattern_stops, service_patterns
-        )
+        self.create_service_pattern_stops(service_pattern_stops, service_patterns)
 
         # Add ServiceLinks, ServicePatternStops, Localities, AdminAreas to
         # ServicePattern
         adapter.info("Adding localities.")
-        add_service_pattern_to_localities(service_patterns)
+        self.add_localities(service_patterns)
 
         adapter.info("Adding administrative areas.")
-        add_service_pattern_to_admin_area(service_patterns)
+        self.add_admin_areas(service_patterns)
 
         # Add ServicePatterns to Service
         adapter.info("Adding service associations.")
         if not service_patterns.empty:
-            add_service_associations(services, service_patterns)
+            self.add_service_associations(services, service_patterns)
 
         adapter.info("Finished loading service patterns.")
         return service_patterns
+
+    def create_services(self, revision, services: pd.DataFrame) -> List[Service]:
+        """Creates the Services of `services`, in the same order."""
+        service_objs = list(df_to_services(revision, services))
+        return Service.objects.bulk_create(service_objs, batch_size=BATCH_SIZE)
+
+    def create_service_links(self, service_links: pd.DataFrame) -> pd.DataFrame:
+        """Creates the ServiceLinks of `service_links` and returns them as a
+        service link frame."""
+        service_link_objs = list(df_to_service_links(service_links))
+        return create_service_link_df_from_queryset(
+            ServiceLink.objects.bulk_create(service_link_objs, batch_size=BATCH_SIZE)
+        )
+
+    def create_service_patterns(
+        self, revision, service_patterns: pd.DataFrame
+    ) -> pd.DataFrame:
+        """Creates the ServicePatterns of `service_patterns` and returns the
+        `service_pattern_id` and `id` of each."""
+        service_pattern_objs = df_to_service_patterns(revision, service_patterns)
+        created = ServicePattern.objects.bulk_create(
+            service_pattern_objs, batch_size=BATCH_SIZE
+        )
+        return pd.DataFrame(
+            (
+                {
+                    "service_pattern_id": obj.service_pattern_id,
+                    "id": obj.id,
+                    "instance": obj,
+                }
+                for obj in created
+            )
+        )
+
+    def create_service_pattern_stops(
+        self, service_pattern_stops: pd.DataFrame, service_patterns: pd.DataFrame
+    ):
+        add_service_pattern_to_service_pattern_stops(
+            service_pattern_stops, service_patterns
+        )
+
+    def add_localities(self, service_patterns: pd.DataFrame):
+        add_service_pattern_to_localities(service_patterns)
+
+    def add_admin_areas(self, service_patterns: pd.DataFrame):
+        add_service_pattern_to_admin_area(service_patterns)
+
+    def add_service_associations(
+        self, services: pd.DataFrame, service_patterns: pd.DataFrame
+    ):
+        add_service_associations(services, service_patterns)
+
+
+def with_srid(geometry, srid: int):
+    """Returns `geometry` with `srid` if it doesn't have one, as it is saved by
+    a geometry field."""
+    if geometry is None or geometry.srid is not None:
+        return geometry
+    geometry = geometry.clone()
+    geometry.srid = srid
+    return geometry
+
+
+class CopyTransXChangeDataLoader(TransXChangeDataLoader):
+    """
+    Loads TransXChange data with COPY rather than bulk_create.
+
+    The ids of Services, ServicePatterns and ServiceLinks are taken from the
+    sequences of their tables before they are copied, so the rows that reference
+    them can be copied too. Every table is written in its own transaction, as it
+    is with bulk_create.
+    """
+
+    def create_services(self, revision, services: pd.DataFrame) -> List[Service]:
+        service_objs = list(df_to_services(revision, services))
+        ids = allocate_ids(Service, len(service_objs))
+        for obj, id_ in zip(service_objs, ids):
+            obj.id = id_
+            obj._state.adding = False
+            obj._state.db = connection.alias
+        copy_rows(
+            Service,
+            SERVICE_COLUMNS,
+            (
+                tuple(getattr(obj, column) for column in SERVICE_COLUMNS)
+                for obj in service_objs
+            ),
+        )
+        return service_objs
+
+    def create_service_links(self, service_links: pd.DataFrame) -> pd.DataFrame:
+        service_links = service_links.reset_index().reindex(
+            columns=SERVICE_LINK_COLUMNS
+        )
+        service_links["id"] = allocate_ids(ServiceLink, len(service_links))
+        copy_rows(
+            ServiceLink,
+            SERVICE_LINK_COLUMNS,
+            service_links.itertuples(index=False, name=None),
+        )
+        return create_service_link_df(service_links.to_dict("records"))
+
+    def create_service_patterns(
+        self, revision, service_patterns: pd.DataFrame
+    ) -> pd.DataFrame:
+        if service_patterns.empty:
+            return pd.DataFrame()
+
+        service_patterns = service_patterns.reset_index()
+        ids = allocate_ids(ServicePattern, len(service_patterns))
+        srid = ServicePattern._meta.get_field("geom").srid
+        copy_rows(
+            ServicePattern,
+            SERVICE_PATTERN_COLUMNS,
+            (
+                (
+                    id_,
+                    revision.id,
+                    service_pattern_id,
+                    "",
+                    "",
+                    "",
+                    with_srid(geom, srid),
+                )
+                for id_, service_pattern_id, geom in zip(
+                    ids,
+                    service_patterns["service_pattern_id"],
+                    service_patterns["geometry"],
+                )
+            ),
+        )
+        return pd.DataFrame(
+            {
+                "service_pattern_id": service_patterns["service_pattern_id"],
+                "id": ids,
+            }
+        )
+
+    def create_service_pattern_stops(
+        self, service_pattern_stops: pd.DataFrame, service_patterns: pd.DataFrame
+    ):
+        copy_service_pattern_stops(service_pattern_stops, service_patterns)
+
+    def add_localities(self, service_patterns: pd.DataFrame):
+        copy_service_pattern_to_localities(service_patterns)
+
+    def add_admin_areas(self, service_patterns: pd.DataFrame):
+        copy_service_pattern_to_admin_area(service_patterns)
+
+    def add_service_associations(
+        self, services: pd.DataFrame, service_patterns: pd.DataFrame
+    ):
+        copy_service_associations(services, service_patterns)
+
+
+def get_loader_class():
+    """Returns the TransXChange loader selected by `TXC_LOAD_WITH_COPY`."""
+    if settings.TXC_LOAD_WITH_COPY:
+        return CopyTransXChangeDataLoader
+    return TransXChangeDataLoader
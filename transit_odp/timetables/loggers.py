@@ -1,4 +1,10 @@
-from transit_odp.common.loggers import LoggerContext
+from functools import wraps
+from logging import getLogger
+from time import perf_counter
+
+from transit_odp.common.loggers import LoggerContext, PipelineAdapter
+
+logger = getLogger(__name__)
 
 
 class TaskLoggerContext(LoggerContext):
@@ -17,3 +23,23 @@ class DQSLoggerContext(LoggerContext):
 
 class DQSTaskLogger(DQSLoggerContext):
     class_name = "DataQualityTask"
+
+
+def log_stage_duration(func):
+    """Decorator that logs how long a stage of the timetable pipeline takes
+    for a revision. The wrapped function must take `revision_id` as its first
+    argument.
+    """
+
+    @wraps(func)
+    def wrapper(revision_id, *args, **kwargs):
+        context = RevisionLoggerContext(object_id=revision_id)
+        adapter = PipelineAdapter(logger, {"context": context})
+        start = perf_counter()
+        try:
+            return func(revision_id, *args, **kwargs)
+        finally:
+            duration = perf_counter() - start
+            adapter.info(f"Stage {func.__name__} took {duration:.3f} seconds.")
+
+    return wrapper
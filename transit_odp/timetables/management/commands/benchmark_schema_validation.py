@@ -0,0 +1,67 @@
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from transit_odp.timetables.utils import get_transxchange_schema_loader
+from transit_odp.timetables.validate import validate_files
+
+SAMPLE_FILE = (
+    Path(__file__).parents[2] / "tests" / "data" / "ea_20-1A-A-y08-1.xml"
+).as_posix()
+
+
+class Command(BaseCommand):
+    help = "Benchmarks parallel TransXChange schema validation on a generated zip"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--files", type=int, default=1000, help="Number of files in the zip"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 2, 4, 8],
+            help="Number of worker threads to benchmark",
+        )
+        parser.add_argument(
+            "--source", default=SAMPLE_FILE, help="TransXChange file to copy"
+        )
+
+    def handle(self, *args, **options):
+        content = Path(options["source"]).read_bytes()
+        loader = get_transxchange_schema_loader()
+        schema_path = str(loader.path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            zip_path = directory / "benchmark.zip"
+            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+                for index in range(options["files"]):
+                    zf.writestr(f"file_{index}.xml", content)
+
+            with zipfile.ZipFile(zip_path) as zf:
+                zf.extractall(directory / "files")
+
+            files = [
+                (str(directory / "files" / name), name, False)
+                for name in sorted(zf.namelist())
+            ]
+            self.stdout.write(f"Validating {len(files)} files.")
+
+            baseline = None
+            for max_workers in options["workers"]:
+                start = time.perf_counter()
+                results = validate_files(
+                    files, schema_path, max_workers, lock=loader.locked
+                )
+                violations = sum(len(v) for v, _ in results)
+                duration = time.perf_counter() - start
+                baseline = baseline or duration
+                self.stdout.write(
+                    f"{max_workers} workers: {duration:.2f}s "
+                    f"({baseline / duration:.2f}x), {violations} violations"
+                )
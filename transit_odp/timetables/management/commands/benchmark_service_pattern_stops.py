@@ -0,0 +1,128 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transit_odp.pipelines.pipelines.dataset_etl.utils.loaders import (
+    add_service_pattern_to_service_pattern_stops,
+    copy_service_pattern_stops,
+    get_service_pattern_ids,
+)
+from transit_odp.transmodel.models import ServicePattern, ServicePatternStop
+
+
+class Rollback(Exception):
+    pass
+
+
+def make_frames(patterns: int, stops: int, ids=None):
+    """Returns frames of `stops` service pattern stops over `patterns` service
+    patterns, in the form they reach the loader."""
+    service_pattern_ids = [f"PB0000{index}-{index % 7}" for index in range(patterns)]
+    if ids is None:
+        ids = np.arange(patterns) + 1
+    service_patterns = pd.DataFrame(
+        {
+            "file_id": ["file"] * patterns,
+            "service_pattern_id": service_pattern_ids,
+            "id": ids,
+        }
+    ).set_index(["file_id", "service_pattern_id"])
+    service_pattern_stops = pd.DataFrame(
+        {
+            "service_pattern_id": [
+                service_pattern_ids[index * patterns // stops] for index in range(stops)
+            ],
+            "order": np.arange(stops) % max(stops // patterns, 1),
+            "naptan_id": [None] * stops,
+            "stop_atco": [f"0100{index:08d}" for index in range(stops)],
+        }
+    )
+    return service_pattern_stops, service_patterns
+
+
+def resolve_ids_by_lookup(df, service_patterns):
+    """The lookup of service pattern ids before they were resolved with a map."""
+    return [
+        service_patterns.xs(
+            record["service_pattern_id"], level="service_pattern_id"
+        ).iloc[0]["id"]
+        for record in df.to_dict("records")
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks creating the ServicePatternStops of a revision. The service "
+        "patterns and stops are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stops", type=int, default=100000, help="Number of pattern stops"
+        )
+        parser.add_argument(
+            "--patterns", type=int, default=2000, help="Number of service patterns"
+        )
+        parser.add_argument(
+            "--sample",
+            type=int,
+            default=5000,
+            help="Number of stops resolved with the previous lookup, which is "
+            "extrapolated to all the stops",
+        )
+
+    def handle(self, *args, **options):
+        stops, patterns = options["stops"], options["patterns"]
+        self.stdout.write(
+            f"Loading {stops} stops of {patterns} service patterns for a revision."
+        )
+
+        df, service_patterns = make_frames(patterns, stops)
+        sample = df.head(options["sample"])
+        start = time.perf_counter()
+        resolve_ids_by_lookup(sample, service_patterns)
+        lookup = (time.perf_counter() - start) * len(df) / len(sample)
+        start = time.perf_counter()
+        df["service_pattern_id"].map(get_service_pattern_ids(service_patterns))
+        mapped = time.perf_counter() - start
+        self.stdout.write(
+            f"Resolving pattern ids: lookup {lookup:.2f}s (extrapolated), "
+            f"map {mapped:.3f}s"
+        )
+
+        try:
+            with transaction.atomic():
+                created = ServicePattern.objects.bulk_create(
+                    ServicePattern(
+                        service_pattern_id=service_pattern_id,
+                        origin="Town Centre",
+                        destination="Bus Station",
+                        description="",
+                    )
+                    for service_pattern_id in service_patterns.index.get_level_values(
+                        "service_pattern_id"
+                    )
+                )
+                df, service_patterns = make_frames(
+                    patterns, stops, ids=[pattern.id for pattern in created]
+                )
+                start = time.perf_counter()
+                add_service_pattern_to_service_pattern_stops(df, service_patterns)
+                duration = time.perf_counter() - start
+                ServicePatternStop.objects.filter(
+                    service_pattern_id__in=[pattern.id for pattern in created]
+                ).delete()
+                start = time.perf_counter()
+                copy_service_pattern_stops(df, service_patterns)
+                copy_duration = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        self.stdout.write(
+            f"Created {stops} ServicePatternStops in {duration:.2f}s with "
+            f"bulk_create and {copy_duration:.2f}s with COPY, the lookup alone "
+            f"would take {lookup:.2f}s"
+        )
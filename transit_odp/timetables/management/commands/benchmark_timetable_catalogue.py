@@ -0,0 +1,166 @@
+import datetime
+import random
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from transit_odp.timetables.csv import build_timetable_catalogue
+
+
+def make_catalogue_frames(services: int, files: int, licences: int, seed: int = 0):
+    """Returns the frames `build_timetable_catalogue` is built from, with
+    `services` OTC services and `files` published services.
+
+    Most published services are registered in the OTC, the rest are unregistered,
+    and the licences of a third of the organisations aren't in BODS.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+
+    def some_date(days):
+        return today + datetime.timedelta(days=rng.randint(-days, days))
+
+    licence_numbers = [f"PB{index:07d}" for index in range(licences)]
+    otc_records = []
+    for index in range(services):
+        licence_number = licence_numbers[index % licences]
+        registration_number = f"{licence_number}/{index}"
+        otc_records.append(
+            {
+                "service_code": registration_number.replace("/", ":"),
+                "otc_operator_id": index % licences,
+                "operator_name": f"Operator {index % licences}",
+                "address": f"{index} High Street",
+                "otc_licence_number": licence_number,
+                "licence_status": "Valid",
+                "registration_number": registration_number,
+                "service_type_description": "Normal Stopping",
+                "variation_number": rng.randint(0, 10),
+                "service_number": str(index % 500),
+                "start_point": "Town Centre",
+                "finish_point": "Bus Station",
+                "via": "",
+                "granted_date": some_date(3000),
+                "expiry_date": some_date(3000),
+                "effective_date": some_date(400),
+                "received_date": some_date(500),
+                "service_type_other_details": "",
+            }
+        )
+
+    txc_records = []
+    for index in range(files):
+        if index % 10 == 9:
+            service_code = f"UZ{index:09d}"
+            licence_number = ""
+        else:
+            otc = otc_records[rng.randrange(services)]
+            service_code = otc["service_code"]
+            licence_number = otc["otc_licence_number"]
+        txc_records.append(
+            {
+                "organisation_name": f"Organisation {index % licences}",
+                "dataset_id": index,
+                "filename": f"file_{index}.xml",
+                "licence_number": licence_number,
+                "modification_datetime": pd.Timestamp(
+                    some_date(400), tz="UTC"
+                ).to_pydatetime(),
+                "national_operator_code": f"OP{index % licences:02d}",
+                "service_code": service_code,
+                "public_use": True,
+                "operating_period_start_date": some_date(400),
+                "operating_period_end_date": some_date(400),
+                "revision_number": rng.randint(0, 50),
+                "string_lines": "1 1A",
+                "origin": "Town Centre",
+                "destination": "Bus Station",
+            }
+        )
+    # Published services are unique by service code
+    txc_df = pd.DataFrame.from_records(txc_records).drop_duplicates("service_code")
+    otc_df = pd.DataFrame.from_records(otc_records)
+
+    licence_names_df = pd.DataFrame(
+        {
+            "otc_licence_number": licence_numbers[: licences * 2 // 3],
+            "licence_organisation_name": [
+                f"Organisation {index}" for index in range(licences * 2 // 3)
+            ],
+        }
+    )
+    exempted = [otc["registration_number"] for otc in otc_records[::100]]
+    seasonal_services_df = pd.DataFrame.from_records(
+        {
+            "registration_number": otc["registration_number"],
+            "start": some_date(100),
+            "end": some_date(100),
+        }
+        for otc in otc_records[::50]
+    )
+    return txc_df, otc_df, licence_names_df, exempted, seasonal_services_df
+
+
+class Command(BaseCommand):
+    help = "Benchmarks building the timetable catalogue at national scale"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--services", type=int, default=30000, help="Number of OTC services"
+        )
+        parser.add_argument(
+            "--files", type=int, default=25000, help="Number of published services"
+        )
+        parser.add_argument(
+            "--licences", type=int, default=1500, help="Number of OTC licences"
+        )
+        parser.add_argument(
+            "--query-latency",
+            type=float,
+            default=0.0005,
+            help="Seconds per query of the row by row baseline",
+        )
+
+    def handle(self, *args, **options):
+        frames = make_catalogue_frames(
+            options["services"], options["files"], options["licences"]
+        )
+        txc_df, otc_df, licence_names_df, *_ = frames
+        today = datetime.date.today()
+        self.stdout.write(
+            f"Building the catalogue of {len(otc_df)} OTC services and "
+            f"{len(txc_df)} published services."
+        )
+
+        start = time.perf_counter()
+        catalogue = build_timetable_catalogue(*frames, today)
+        duration = time.perf_counter() - start
+        self.stdout.write(f"Vectorised: {duration:.2f}s, {len(catalogue)} rows")
+
+        # The previous builder looked up the organisation of every OTC only row
+        # with a query, those queries are replaced with a wait of the latency.
+        licence_names = licence_names_df.set_index("otc_licence_number")[
+            "licence_organisation_name"
+        ].to_dict()
+        latency = options["query_latency"]
+
+        def get_organisation_name(licence_number):
+            time.sleep(latency)
+            return licence_names.get(licence_number)
+
+        def add_operator_name(row):
+            if pd.isna(row["organisation_name"]):
+                name = get_organisation_name(row["otc_licence_number"])
+                return name or "Organisation not yet created"
+            return row["organisation_name"]
+
+        merged = pd.merge(otc_df, txc_df, on="service_code", how="outer")
+        start = time.perf_counter()
+        merged.apply(add_operator_name, axis=1)
+        baseline = time.perf_counter() - start
+        queries = int(merged["organisation_name"].isna().sum())
+        self.stdout.write(
+            f"Row by row organisation names: {baseline:.2f}s, {queries} queries "
+            f"({baseline / duration:.1f}x the whole vectorised build)"
+        )
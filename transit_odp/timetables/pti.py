@@ -1,17 +1,17 @@
 from __future__ import annotations
 
-import zipfile
 from logging import getLogger
 from pathlib import Path
-from typing import BinaryIO, Iterable, List
+from typing import BinaryIO, Iterable, List, Set
 
 from transit_odp.common.loggers import DatasetPipelineLoggerContext, PipelineAdapter
 from transit_odp.common.types import JSONFile
-from transit_odp.common.utils import sha1sum
 from transit_odp.data_quality.pti.models import Violation
 from transit_odp.data_quality.pti.validators import PTIValidator
 from transit_odp.organisation.models import DatasetRevision
+from transit_odp.timetables.incremental import LiveRevisionFiles
 from transit_odp.timetables.proxies import TimetableDatasetRevision
+from transit_odp.timetables.store import TXCDocumentStore
 
 PTI_PATH = Path(__file__).parent / "pti_schema.json"
 
@@ -25,42 +25,29 @@ class DatasetPTIValidator:
     def iter_get_files(self, revision: DatasetRevision) -> Iterable[BinaryIO]:
         context = DatasetPipelineLoggerContext(object_id=revision.dataset_id)
         adapter = PipelineAdapter(logger, {"context": context})
-        file_ = revision.upload_file
-        if zipfile.is_zipfile(file_):
-            with zipfile.ZipFile(file_) as zf:
-                names = [n for n in zf.namelist() if n.endswith(".xml")]
-                file_count = len(names)
-                for index, name in enumerate(names, start=1):
-                    adapter.info(
-                        f"PTI Validation of file {index} of {file_count} - {name}."
-                    )
-                    with zf.open(name) as f:
-                        yield f
-        else:
-            file_.seek(0)
-            yield file_
+        live_hashes = self.get_live_hashes(revision)
 
-    def get_live_hashes(self, revision: TimetableDatasetRevision) -> List[str]:
-        live_revision_id = revision.dataset.live_revision_id
-        try:
-            live_revision = TimetableDatasetRevision.objects.get(id=live_revision_id)
-        except TimetableDatasetRevision.DoesNotExist:
-            return []
+        store = TXCDocumentStore(revision)
+        stored_files = store.get_stored_files()
+        file_count = len(stored_files)
+        for index, stored in enumerate(stored_files, start=1):
+            if stored.hash in live_hashes:
+                adapter.info(f"{stored.name} unchanged, skipping.")
+                continue
+            adapter.info(
+                f"PTI Validation of file {index} of {file_count} - {stored.name}."
+            )
+            yield store.open(stored)
 
-        return live_revision.get_txc_hashes()
+    def get_live_hashes(self, revision: TimetableDatasetRevision) -> Set[str]:
+        return LiveRevisionFiles(revision).get_hashes()
 
     def get_violations(self, revision: TimetableDatasetRevision) -> List[Violation]:
         context = DatasetPipelineLoggerContext(object_id=revision.dataset_id)
         adapter = PipelineAdapter(logger, {"context": context})
-        live_hashes = self.get_live_hashes(revision)
 
         for xml in self.iter_get_files(revision=revision):
-            if sha1sum(xml.read()) in live_hashes:
-                adapter.info(f"{xml.name} unchanged, skipping.")
-                continue
-            else:
-                xml.seek(0)
-                self._validator.is_valid(xml)
+            self._validator.is_valid(xml)
 
         adapter.info(f"Revision contains {len(self._validator.violations)} violations.")
         return self._validator.violations
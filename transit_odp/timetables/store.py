@@ -0,0 +1,276 @@
+import io
+import shutil
+import time
+import zipfile
+from logging import getLogger
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+from django.conf import settings
+from pydantic import BaseModel
+
+from transit_odp.common.utils import sha1sum
+from transit_odp.organisation.models import DatasetRevision
+from transit_odp.timetables.dataclasses.transxchange import TXCFile
+from transit_odp.timetables.transxchange import TransXChangeDocument
+
+logger = getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+# Stores are removed when a revision is processed or fails, this removes the
+# stores of revisions whose tasks never got that far, e.g. a worker was lost
+STORE_MAX_AGE = 24 * 60 * 60
+
+
+def remove_stale_stores(root: Path, max_age: int = STORE_MAX_AGE) -> int:
+    """
+    Removes the stores in `root` that haven't been written to for `max_age`
+    seconds and returns the number removed.
+
+    Only the directories named after a revision id are stores, the others, e.g.
+    the extract cache, are left alone.
+    """
+    if not root.exists():
+        return 0
+
+    removed = 0
+    oldest = time.time() - max_age
+    for directory in root.iterdir():
+        try:
+            if (
+                directory.name.isdigit()
+                and directory.is_dir()
+                and directory.stat().st_mtime < oldest
+            ):
+                shutil.rmtree(directory)
+                removed += 1
+        except FileNotFoundError:
+            # Removed by another process
+            continue
+
+    if removed:
+        logger.info(f"Removed {removed} stale TransXChange document stores.")
+    return removed
+
+
+def open_stored_file(path: Path, name: str) -> BinaryIO:
+    """
+    Returns the content of the file at `path` as a file-like object called `name`.
+    """
+    file_ = io.BytesIO(path.read_bytes())
+    file_.name = name
+    return file_
+
+
+class StoredFile(BaseModel):
+    name: str
+    hash: str
+
+
+class StoreManifest(BaseModel):
+    source: str
+    size: int
+    files: List[StoredFile]
+
+
+class TXCDocumentRecord(BaseModel):
+    """The data extracted from a TransXChange document that the pipeline needs
+    without having to parse the document again.
+    """
+
+    file_name: str
+    txc_file: TXCFile
+
+    @classmethod
+    def from_txc_document(cls, doc: TransXChangeDocument):
+        return cls(
+            file_name=doc.get_file_name(),
+            txc_file=TXCFile.from_txc_document(doc, use_path_filename=True),
+        )
+
+
+class TXCDocumentStore:
+    """A per-revision store of the TransXChange files in a DatasetRevision.
+
+    The timetable pipeline is a chain of tasks that all need to read every file
+    in a revision. Instead of each task opening `upload_file` and unpacking it,
+    the files are unpacked once onto the local filesystem keyed by their sha1 hash
+    alongside a manifest of the original file names. The first time a document
+    is parsed a `TXCDocumentRecord` is stored next to it, so tasks that only need
+    header data never parse the document again.
+
+    The store is rebuilt whenever it is missing, e.g. if a task runs on a different
+    worker, or the `upload_file` of the revision has changed.
+
+    Args:
+        revision: The DatasetRevision whose files are stored.
+        root: The directory the store of every revision is kept in, defaults
+            to `settings.TXC_DOCUMENT_STORE_DIR`.
+
+    Example:
+        store = TXCDocumentStore(revision)
+        for doc in store.iter_documents():
+            doc.get_file_name()
+    """
+
+    def __init__(self, revision: DatasetRevision, root: Optional[str] = None):
+        self.revision = revision
+        root = root or settings.TXC_DOCUMENT_STORE_DIR
+        self.root = Path(root)
+        self.directory = self.root / str(revision.id)
+        self._manifest: Optional[StoreManifest] = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(revision_id={self.revision.id!r})"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / MANIFEST_NAME
+
+    def _is_current(self, manifest: StoreManifest) -> bool:
+        file_ = self.revision.upload_file
+        return manifest.source == file_.name and manifest.size == file_.size
+
+    def _load_manifest(self) -> Optional[StoreManifest]:
+        if not self.manifest_path.exists():
+            return None
+
+        manifest = StoreManifest.parse_file(self.manifest_path)
+        if not self._is_current(manifest):
+            logger.info(f"{self} is out of date.")
+            return None
+
+        return manifest
+
+    def get_manifest(self) -> StoreManifest:
+        """
+        Returns the manifest of the store, building the store if required.
+        """
+        if self._manifest is None:
+            self._manifest = self._load_manifest() or self.build()
+        return self._manifest
+
+    def _add_file(self, name: str, content: bytes) -> StoredFile:
+        hash_ = sha1sum(content)
+        path = self.get_path(StoredFile(name=name, hash=hash_))
+        if not path.exists():
+            path.write_bytes(content)
+        return StoredFile(name=name, hash=hash_)
+
+    def build(self) -> StoreManifest:
+        """
+        Unpacks the files of the revision into the store.
+
+        Stale stores of other revisions are removed first, a store is only
+        built on a worker that runs the timetable pipeline so every such
+        worker is swept.
+        """
+        self.clear()
+        remove_stale_stores(self.root)
+        self.directory.mkdir(parents=True)
+
+        file_ = self.revision.upload_file
+        file_.seek(0)
+        files = []
+        if zipfile.is_zipfile(file_):
+            with zipfile.ZipFile(file_) as zf:
+                names = [n for n in zf.namelist() if n.endswith(".xml")]
+                for name in names:
+                    with zf.open(name) as f:
+                        files.append(self._add_file(name, f.read()))
+        else:
+            file_.seek(0)
+            files.append(self._add_file(file_.name, file_.read()))
+
+        manifest = StoreManifest(source=file_.name, size=file_.size, files=files)
+        # Write the manifest last so a partially built store is never used
+        temp_path = self.directory / f"{MANIFEST_NAME}.tmp"
+        temp_path.write_text(manifest.json())
+        temp_path.replace(self.manifest_path)
+
+        logger.info(f"{self} built with {len(files)} files.")
+        self._manifest = manifest
+        return manifest
+
+    def clear(self) -> None:
+        """
+        Removes the store from the local filesystem.
+        """
+        self._manifest = None
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+
+    def get_stored_files(self) -> List[StoredFile]:
+        return self.get_manifest().files
+
+    def get_hashes(self) -> List[str]:
+        return [stored.hash for stored in self.get_stored_files()]
+
+    def get_path(self, stored: StoredFile) -> Path:
+        return self.directory / f"{stored.hash}.xml"
+
+    def open(self, stored: StoredFile) -> BinaryIO:
+        """
+        Returns the content of a stored file as a file-like object with the
+        original file name as its name.
+        """
+        return open_stored_file(self.get_path(stored), stored.name)
+
+    def iter_files(self) -> Iterator[BinaryIO]:
+        for stored in self.get_stored_files():
+            yield self.open(stored)
+
+    def _get_record_path(self, stored: StoredFile) -> Path:
+        return self.directory / f"{stored.hash}.json"
+
+    def has_record(self, stored: StoredFile) -> bool:
+        return self._get_record_path(stored).exists()
+
+    def save_record(self, stored: StoredFile, record: TXCDocumentRecord) -> None:
+        self._get_record_path(stored).write_text(record.json())
+
+    def _add_record(
+        self, stored: StoredFile, doc: TransXChangeDocument
+    ) -> TXCDocumentRecord:
+        record = TXCDocumentRecord.from_txc_document(doc)
+        self.save_record(stored, record)
+        return record
+
+    def get_document(self, stored: StoredFile) -> TransXChangeDocument:
+        """
+        Returns a stored file as a TransXChangeDocument.
+
+        A record of the document is stored as it is parsed if it doesn't
+        already have one.
+        """
+        doc = TransXChangeDocument(self.open(stored))
+        if not self.has_record(stored):
+            try:
+                self._add_record(stored, doc)
+            except Exception:
+                # Documents that fail schema validation won't always have
+                # the data for a record, get_records will report the error
+                logger.debug(f"Unable to create record for {stored.name}.")
+        return doc
+
+    def iter_documents(self) -> Iterator[TransXChangeDocument]:
+        """
+        Returns an iterator of the TransXChangeDocuments in the store.
+        """
+        for stored in self.get_stored_files():
+            yield self.get_document(stored)
+
+    def get_record(self, stored: StoredFile) -> TXCDocumentRecord:
+        path = self._get_record_path(stored)
+        if path.exists():
+            record = TXCDocumentRecord.parse_file(path)
+        else:
+            record = self._add_record(stored, TransXChangeDocument(self.open(stored)))
+
+        # Records are keyed by hash so identical files share a record,
+        # the filename of the header has to come from the manifest.
+        record.txc_file.header.filename = Path(stored.name).name
+        return record
+
+    def get_records(self) -> List[TXCDocumentRecord]:
+        return [self.get_record(stored) for stored in self.get_stored_files()]
@@ -26,10 +26,12 @@ from transit_odp.organisation.models import Dataset, DatasetRevision, TXCFileAtt
 from transit_odp.organisation.updaters import update_dataset
 from transit_odp.pipelines.exceptions import PipelineException
 from transit_odp.pipelines.models import DatasetETLTaskResult
-from transit_odp.timetables.dataclasses.transxchange import TXCFile
 from transit_odp.timetables.etl import TransXChangePipeline
+from transit_odp.timetables.incremental import LiveRevisionFiles
+from transit_odp.timetables.loggers import log_stage_duration
 from transit_odp.timetables.proxies import TimetableDatasetRevision
 from transit_odp.timetables.pti import get_pti_validator
+from transit_odp.timetables.store import TXCDocumentStore
 from transit_odp.timetables.transxchange import TransXChangeDatasetParser
 from transit_odp.timetables.utils import read_delete_datasets_file_from_s3
 from transit_odp.timetables.validate import (
@@ -83,6 +85,11 @@ def task_dataset_pipeline(self, revision_id: int, do_publish=False):
             task_dataset_etl_finalise.signature(args),
         ]
 
+        # Remove the unpacked files of the revision if any of the jobs fail
+        on_error = task_clear_document_store.si(revision.id)
+        for job in jobs:
+            job.link_error(on_error)
+
         if do_publish:
             jobs.append(task_publish_revision.signature((revision_id,), immutable=True))
 
@@ -104,6 +111,7 @@ def task_populate_timing_point_count(revision_id: int) -> None:
 
 
 @shared_task()
+@log_stage_duration
 def task_dataset_download(revision_id: int, task_id: int) -> int:
     task = get_etl_task_or_pipeline_exception(task_id)
     revision = task.revision
@@ -144,6 +152,7 @@ def task_dataset_download(revision_id: int, task_id: int) -> int:
 
 
 @shared_task()
+@log_stage_duration
 def task_scan_timetables(revision_id: int, task_id: int) -> int:
     task = get_etl_task_or_pipeline_exception(task_id)
     revision = task.revision
@@ -168,6 +177,7 @@ def task_scan_timetables(revision_id: int, task_id: int) -> int:
 
 
 @shared_task(acks_late=True)
+@log_stage_duration
 def task_timetable_file_check(revision_id: int, task_id: int) -> int:
     task = get_etl_task_or_pipeline_exception(task_id)
     revision = DatasetRevision.objects.get(id=revision_id)
@@ -177,6 +187,7 @@ def task_timetable_file_check(revision_id: int, task_id: int) -> int:
     try:
         validator = TimetableFileValidator(revision=revision)
         validator.validate()
+        TXCDocumentStore(revision).build()
         task.update_progress(30)
         adapter.info("File check complete. No issues.")
     except ValidationException as exc:
@@ -193,6 +204,7 @@ def task_timetable_file_check(revision_id: int, task_id: int) -> int:
 
 
 @shared_task(acks_late=True)
+@log_stage_duration
 def task_timetable_schema_check(revision_id: int, task_id: int):
     """A task that validates the file/s in a dataset."""
     task = get_etl_task_or_pipeline_exception(task_id)
@@ -239,6 +251,7 @@ def task_timetable_schema_check(revision_id: int, task_id: int):
 
 
 @shared_task
+@log_stage_duration
 def task_post_schema_check(revision_id: int, task_id: int):
     """
     Post schema checks, such as personal identifiable information (PII),
@@ -252,8 +265,12 @@ def task_post_schema_check(revision_id: int, task_id: int):
 
     try:
         violations = []
-        parser = TransXChangeDatasetParser(revision.upload_file)
-        file_names_list = parser.get_file_names()
+        store = TXCDocumentStore(revision)
+        # Files in the live revision have already passed these checks
+        stored_files = LiveRevisionFiles(revision).get_changed(store.get_stored_files())
+        file_names_list = [
+            store.get_record(stored).file_name for stored in stored_files
+        ]
         validator = PostSchemaValidator(file_names_list)
         violations += validator.get_violations()
     except Exception as exc:
@@ -294,6 +311,7 @@ def task_post_schema_check(revision_id: int, task_id: int):
 
 
 @shared_task()
+@log_stage_duration
 def task_extract_txc_file_data(revision_id: int, task_id: int):
     """
     Index the attributes and service code of every individual file in a dataset.
@@ -306,16 +324,19 @@ def task_extract_txc_file_data(revision_id: int, task_id: int):
     try:
         # If we're in the update flow lets clear out "old" files.
         revision.txc_file_attributes.all().delete()
-        parser = TransXChangeDatasetParser(revision.upload_file)
-        files = [
-            TXCFile.from_txc_document(doc, use_path_filename=True)
-            for doc in parser.get_documents()
-        ]
-
-        attributes = [
-            TXCFileAttributes.from_txc_file(txc_file=f, revision_id=revision.id)
-            for f in files
-        ]
+        store = TXCDocumentStore(revision)
+        live_files = LiveRevisionFiles(revision)
+        attributes = []
+        for stored in store.get_stored_files():
+            if live_files.is_unchanged(stored):
+                attributes.append(live_files.copy_attributes(stored))
+            else:
+                record = store.get_record(stored)
+                attributes.append(
+                    TXCFileAttributes.from_txc_file(
+                        txc_file=record.txc_file, revision_id=revision.id
+                    )
+                )
         TXCFileAttributes.objects.bulk_create(attributes, batch_size=BATCH_SIZE)
         adapter.info(f"Attributes extracted from {len(attributes)} files.")
     except Exception as exc:
@@ -328,6 +349,7 @@ def task_extract_txc_file_data(revision_id: int, task_id: int):
 
 
 @shared_task(acks_late=True)
+@log_stage_duration
 def task_pti_validation(revision_id: int, task_id: int):
     task = get_etl_task_or_pipeline_exception(task_id)
     revision = TimetableDatasetRevision.objects.get(id=revision_id)
@@ -375,6 +397,7 @@ def task_pti_validation(revision_id: int, task_id: int):
 
 
 @shared_task()
+@log_stage_duration
 def task_dataset_etl(revision_id: int, task_id: int):
     """A task that runs the ETL pipeline on a timetable dataset.
     N.B. this is just a proxy to `run_timetable_etl_pipeline` as part of a refactor.
@@ -408,6 +431,7 @@ def task_dataset_etl(revision_id: int, task_id: int):
 
 
 @shared_task()
+@log_stage_duration
 def task_dqs_upload(revision_id: int, task_id: int):
     """A task that uploads a timetables dataset to the DQ Service.
     N.B. this is just a proxy to `upload_dataset_to_dqs` as part of a refactor.
@@ -417,6 +441,7 @@ def task_dqs_upload(revision_id: int, task_id: int):
 
 
 @shared_task()
+@log_stage_duration
 def task_dataset_etl_finalise(revision_id: int, task_id: int) -> int:
     task = get_etl_task_or_pipeline_exception(task_id)
     revision = task.revision
@@ -427,10 +452,21 @@ def task_dataset_etl_finalise(revision_id: int, task_id: int) -> int:
         task.update_progress(100)
         revision.to_success()
         revision.save()
+    TXCDocumentStore(revision).clear()
     adapter.info("Timetable successfully processed.")
     return revision_id
 
 
+@shared_task(ignore_result=True)
+def task_clear_document_store(revision_id: int) -> None:
+    """Removes the document store of a revision whose pipeline has failed."""
+    try:
+        revision = DatasetRevision.objects.get(id=revision_id)
+    except DatasetRevision.DoesNotExist:
+        return
+    TXCDocumentStore(revision).clear()
+
+
 @shared_task(ignore_result=True)
 def task_publish_revision(revision_id: int) -> None:
     # We use Celery to publish a revision automatically in the monitoring pipeline
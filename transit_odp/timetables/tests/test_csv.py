@@ -455,6 +455,42 @@ def test_stale_42_day_look_ahead(effective, modified, period_end, is_stale):
     assert df["Requires Attention"][0] == "Yes" if is_stale else "No"
 
 
+@freeze_time("2023-02-14")
+def test_stale_12_months_old_leap_day():
+    """A file last modified on 29 February is a year old on 28 February."""
+    otc_service = ServiceModelFactory(effective_date=date(2020, 1, 1))
+    txc = TXCFileAttributesFactory(
+        licence_number=otc_service.licence.number,
+        service_code=otc_service.registration_number.replace("/", ":"),
+        modification_datetime=datetime.fromisoformat("2020-02-29T00:00:00+00:00"),
+    )
+    DataQualityReportFactory(revision=txc.revision)
+    PTIValidationResultFactory(revision=txc.revision)
+
+    df = _get_timetable_catalogue_dataframe()
+    assert df["Date when data is over 1 year old"][0] == date(2021, 2, 28)
+
+
+def test_organisation_name_from_licence():
+    """
+    Services that are only in the OTC are given the name of the organisation
+    that holds their licence in BODS.
+    """
+    organisation = OrganisationFactory(name="Licence holder")
+    services = ServiceModelFactory.create_batch(3)
+    for service in services[:2]:
+        LicenceFactory(number=service.licence.number, organisation=organisation)
+    for fa in TXCFileAttributesFactory.create_batch(2):
+        DataQualityReportFactory(revision=fa.revision)
+        PTIValidationResultFactory(revision=fa.revision)
+
+    df = _get_timetable_catalogue_dataframe()
+    names = dict(zip(df["OTC:Licence Number"], df["Organisation Name"]))
+    assert names[services[0].licence.number] == "Licence holder"
+    assert names[services[1].licence.number] == "Licence holder"
+    assert names[services[2].licence.number] == "Organisation not yet created"
+
+
 @freeze_time("2023-02-14")
 @pytest.mark.parametrize(
     "effective, modified, period_end, period_start, is_stale",
@@ -0,0 +1,107 @@
+import os
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+from django.utils import timezone
+
+from transit_odp.common.utils import sha1sum
+from transit_odp.organisation.factories import (
+    DatasetFactory,
+    DatasetRevisionFactory,
+    TXCFileAttributesFactory,
+)
+from transit_odp.timetables.extract import (
+    EXTRACT_CACHE_MAX_AGE,
+    TransXChangeStoreExtractor,
+    TXCExtractCache,
+)
+from transit_odp.timetables.incremental import LiveRevisionFiles
+from transit_odp.timetables.store import TXCDocumentStore
+
+pytestmark = pytest.mark.django_db
+
+DATA_DIR = Path(__file__).parent / "data"
+ZIP_FILE = DATA_DIR / "EA_TXC_5_files.zip"
+
+
+def test_unchanged_files_are_identified_by_live_hashes():
+    dataset = DatasetFactory()
+    live_revision = DatasetRevisionFactory(
+        dataset=dataset, upload_file=None, is_published=True
+    )
+    draft_revision = DatasetRevisionFactory(
+        dataset=dataset,
+        upload_file__from_path=ZIP_FILE.as_posix(),
+        is_published=False,
+    )
+    dataset.live_revision = live_revision
+    dataset.save()
+
+    with zipfile.ZipFile(ZIP_FILE) as zf:
+        name = next(n for n in zf.namelist() if n.endswith(".xml"))
+        hash_ = sha1sum(zf.read(name))
+    live = TXCFileAttributesFactory(
+        revision=live_revision, hash=hash_, filename="old.xml"
+    )
+
+    store = TXCDocumentStore(draft_revision)
+    live_files = LiveRevisionFiles(draft_revision)
+    changed = live_files.get_changed(store.get_stored_files())
+    assert len(changed) == len(store.get_stored_files()) - 1
+    assert hash_ not in [stored.hash for stored in changed]
+
+    stored = next(s for s in store.get_stored_files() if s.hash == hash_)
+    attributes = live_files.copy_attributes(stored)
+    assert attributes.id is None
+    assert attributes.revision_id == draft_revision.id
+    assert attributes.filename == Path(name).name
+    assert attributes.service_code == live.service_code
+    assert attributes.hash == hash_
+
+
+def test_store_extractor_reuses_cached_extracts(tmp_path, mocker):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    store = TXCDocumentStore(revision)
+    cache = TXCExtractCache(root=tmp_path)
+    expected = TransXChangeStoreExtractor(store, timezone.now(), cache=cache).extract()
+
+    extractor = mocker.patch("transit_odp.timetables.extract.TransXChangeExtractor")
+    start_time = timezone.now()
+    actual = TransXChangeStoreExtractor(store, start_time, cache=cache).extract()
+
+    extractor.assert_not_called()
+    assert actual.import_datetime == start_time
+    assert actual.services.equals(expected.services)
+    assert actual.journey_patterns.equals(expected.journey_patterns)
+    assert actual.timing_links.equals(expected.timing_links)
+
+
+def test_extract_cache_is_keyed_by_extractor_and_pandas_versions(tmp_path, mocker):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    store = TXCDocumentStore(revision)
+    cache = TXCExtractCache(root=tmp_path)
+    TransXChangeStoreExtractor(store, timezone.now(), cache=cache).extract()
+    stored = store.get_stored_files()[0]
+    assert cache.get(stored.hash) is not None
+
+    mocker.patch("transit_odp.timetables.extract.EXTRACTOR_VERSION", 0)
+    assert cache.get(stored.hash) is None
+    mocker.patch("transit_odp.timetables.extract.pd.__version__", "0.0.0")
+    assert cache.get(stored.hash) is None
+
+
+def test_store_extractor_prunes_cache(tmp_path):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    cache = TXCExtractCache(root=tmp_path)
+    cache.directory.mkdir(parents=True)
+    stale = cache.directory / "stale.pickle"
+    stale.write_bytes(b"")
+    modified = time.time() - EXTRACT_CACHE_MAX_AGE.total_seconds() - 60
+    os.utime(stale, (modified, modified))
+
+    store = TXCDocumentStore(revision)
+    TransXChangeStoreExtractor(store, timezone.now(), cache=cache).extract()
+
+    assert not stale.exists()
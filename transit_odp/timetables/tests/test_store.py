@@ -0,0 +1,99 @@
+import os
+import time
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from transit_odp.common.utils import sha1sum
+from transit_odp.organisation.factories import DatasetRevisionFactory
+from transit_odp.timetables.dataclasses.transxchange import TXCFile
+from transit_odp.timetables.extract import TXCExtractCache
+from transit_odp.timetables.store import (
+    STORE_MAX_AGE,
+    TXCDocumentStore,
+    remove_stale_stores,
+)
+from transit_odp.timetables.transxchange import TransXChangeDocument
+
+pytestmark = pytest.mark.django_db
+
+DATA_DIR = Path(__file__).parent / "data"
+XML_FILE = DATA_DIR / "ea_20-1A-A-y08-1.xml"
+ZIP_FILE = DATA_DIR / "EA_TXC_5_files.zip"
+
+
+def test_build_store_from_zip(tmp_path):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    store = TXCDocumentStore(revision, root=tmp_path)
+    manifest = store.build()
+
+    with zipfile.ZipFile(ZIP_FILE) as zf:
+        names = [n for n in zf.namelist() if n.endswith(".xml")]
+        hashes = [sha1sum(zf.read(name)) for name in names]
+
+    assert [stored.name for stored in manifest.files] == names
+    assert store.get_hashes() == hashes
+    assert store.manifest_path.exists()
+
+
+def test_store_is_built_on_first_access(tmp_path):
+    revision = DatasetRevisionFactory(upload_file__from_path=XML_FILE.as_posix())
+    store = TXCDocumentStore(revision, root=tmp_path)
+    assert not store.directory.exists()
+
+    files = list(store.iter_files())
+    assert len(files) == 1
+    assert files[0].name == revision.upload_file.name
+    assert files[0].read() == XML_FILE.read_bytes()
+
+
+def test_records_match_documents(tmp_path):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    store = TXCDocumentStore(revision, root=tmp_path)
+    docs = list(store.iter_documents())
+
+    # Records are stored as the documents are parsed and read back by a new store
+    records = TXCDocumentStore(revision, root=tmp_path).get_records()
+    assert len(records) == len(docs)
+    for doc, record in zip(docs, records):
+        assert record.file_name == doc.get_file_name()
+        assert record.txc_file == TXCFile.from_txc_document(doc, use_path_filename=True)
+
+
+def test_store_is_rebuilt_when_upload_file_changes(tmp_path):
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    TXCDocumentStore(revision, root=tmp_path).build()
+
+    with XML_FILE.open("rb") as f:
+        revision.upload_file.save(XML_FILE.name, f)
+
+    store = TXCDocumentStore(revision, root=tmp_path)
+    docs = list(store.iter_documents())
+    assert len(docs) == 1
+    assert isinstance(docs[0], TransXChangeDocument)
+    assert store.get_hashes() == [sha1sum(XML_FILE.read_bytes())]
+
+
+def test_stale_stores_are_removed_when_a_store_is_built(tmp_path):
+    stale, recent = DatasetRevisionFactory.create_batch(
+        2, upload_file__from_path=XML_FILE.as_posix()
+    )
+    stale_store = TXCDocumentStore(stale, root=tmp_path)
+    stale_store.build()
+    modified = time.time() - STORE_MAX_AGE - 60
+    os.utime(stale_store.directory, (modified, modified))
+    recent_store = TXCDocumentStore(recent, root=tmp_path)
+    recent_store.build()
+
+    extract_cache = TXCExtractCache(root=tmp_path).directory
+    extract_cache.mkdir()
+    os.utime(extract_cache, (modified, modified))
+
+    revision = DatasetRevisionFactory(upload_file__from_path=ZIP_FILE.as_posix())
+    TXCDocumentStore(revision, root=tmp_path).build()
+
+    assert not stale_store.directory.exists()
+    assert extract_cache.exists()
+    assert recent_store.directory.exists()
+    assert remove_stale_stores(tmp_path) == 0
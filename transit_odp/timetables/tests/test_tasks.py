@@ -7,6 +7,7 @@ from django.utils import timezone
 from freezegun import freeze_time
 from requests import Response
 
+from transit_odp.data_quality.models import SchemaViolation
 from transit_odp.data_quality.models.report import PTIValidationResult
 from transit_odp.fares.tasks import DT_FORMAT
 from transit_odp.organisation.constants import FeedStatus
@@ -16,10 +17,16 @@ from transit_odp.organisation.factories import (
     OrganisationFactory,
 )
 from transit_odp.pipelines.exceptions import PipelineException
-from transit_odp.pipelines.factories import DatasetETLTaskResultFactory
+from transit_odp.pipelines.factories import (
+    DatasetETLTaskResultFactory,
+    SchemaDefinitionFactory,
+)
 from transit_odp.pipelines.models import DatasetETLTaskResult
+from transit_odp.timetables.store import TXCDocumentStore
 from transit_odp.timetables.tasks import (
+    task_clear_document_store,
     task_dataset_download,
+    task_dataset_pipeline,
     task_post_schema_check,
     task_pti_validation,
     task_scan_timetables,
@@ -37,6 +44,9 @@ pytestmark = pytest.mark.django_db
 TASK_MODULE = "transit_odp.timetables.tasks"
 HERE = Path(__file__)
 DATA = HERE.parent / "data"
+TXC_SCHEMA_ZIP = (
+    HERE.parents[2] / "pipelines" / "tests" / "data" / "TransXChange_schema_2.4.zip"
+)
 
 
 @pytest.fixture
@@ -316,3 +326,60 @@ def test_task_pti_validation():
     task_pti_validation(revision.id, task.id)
     result = PTIValidationResult.objects.get(revision=revision)
     assert result.count == 0
+
+
+def test_pipeline_jobs_clear_document_store_on_error(mocker):
+    chain = mocker.patch(TASK_MODULE + ".celery.chain")
+    revision = DatasetRevisionFactory(
+        status=FeedStatus.pending.value, is_published=False
+    )
+
+    task_dataset_pipeline(revision.id)
+
+    jobs = chain.call_args.args
+    on_error = task_clear_document_store.si(revision.id)
+    for job in jobs:
+        assert job.options["link_error"] == [on_error]
+
+
+def test_clear_document_store():
+    revision = DatasetRevisionFactory(
+        upload_file__from_path=(DATA / "ea_20-1A-A-y08-1.xml").as_posix()
+    )
+    store = TXCDocumentStore(revision)
+    store.build()
+
+    task_clear_document_store(revision.id)
+    assert not store.directory.exists()
+
+
+def test_timetable_schema_check_in_parallel(settings, mocker, tmp_path):
+    """
+    GIVEN TXC_SCHEMA_VALIDATION_WORKERS is more than one
+    WHEN the schema check task validates a zip of files that aren't TransXChange
+    THEN a violation is saved for every file
+    """
+    settings.TXC_SCHEMA_VALIDATION_WORKERS = 2
+    mocker.patch(
+        "transit_odp.pipelines.pipelines.xml_schema.SCHEMA_DIR",
+        str(tmp_path / "schemas"),
+    )
+    SchemaDefinitionFactory(schema__from_path=TXC_SCHEMA_ZIP.as_posix())
+
+    files = []
+    for index in range(4):
+        path = tmp_path / f"file{index}.xml"
+        create_text_file(path, "<Root/>")
+        files.append(path)
+    testzip = tmp_path / "testzip.zip"
+    create_zip_file(testzip, files)
+    with open(testzip, "rb") as zout:
+        task = create_task(revision__upload_file=File(zout, name="testzip.zip"))
+
+    with pytest.raises(PipelineException):
+        task_timetable_schema_check(task.revision.id, task.id)
+
+    violations = SchemaViolation.objects.filter(revision=task.revision)
+    assert len({violation.filename for violation in violations}) == len(files)
+    task.refresh_from_db()
+    assert task.error_code == task.SCHEMA_ERROR
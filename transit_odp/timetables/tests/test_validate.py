@@ -1,3 +1,6 @@
+import multiprocessing
+import threading
+from contextlib import contextmanager
 from datetime import timedelta
 from pathlib import Path
 
@@ -13,7 +16,11 @@ from transit_odp.pipelines.exceptions import PipelineException
 from transit_odp.pipelines.models import DatasetETLTaskResult
 from transit_odp.timetables.proxies import TimetableDatasetRevision
 from transit_odp.timetables.tasks import task_scan_timetables
-from transit_odp.timetables.validate import PostSchemaValidator, TXCRevisionValidator
+from transit_odp.timetables.validate import (
+    PostSchemaValidator,
+    TXCRevisionValidator,
+    validate_files,
+)
 from transit_odp.validate.antivirus import (
     AntiVirusError,
     ClamConnectionError,
@@ -31,6 +38,16 @@ DATA_DIR = Path(__file__).parent.joinpath("data")
 XML_FILE = DATA_DIR.joinpath("ea_20-1A-A-y08-1.xml")
 ZIP_FILE = DATA_DIR.joinpath("EA_TXC_5_files.zip")
 
+SIMPLE_XSD = """<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema">
+  <xs:element name="Root">
+    <xs:complexType>
+      <xs:sequence>
+        <xs:element name="Child" type="xs:integer"/>
+      </xs:sequence>
+    </xs:complexType>
+  </xs:element>
+</xs:schema>"""
+
 
 class TestFileValidation:
     def test_malformed_xml(self):
@@ -392,3 +409,102 @@ def test_check_file_names_pii_information(file_names, violation_count):
     validator = PostSchemaValidator(file_names)
     violations = validator.get_violations()
     assert len(violations) == violation_count
+
+
+def test_validate_files_in_parallel_preserves_order(tmp_path):
+    """
+    GIVEN files alternating between valid and invalid against a schema
+    WHEN `validate_files` is called with multiple worker processes
+    THEN the violations are returned in the same order as the files
+    """
+    schema_path = tmp_path / "schema.xsd"
+    schema_path.write_text(SIMPLE_XSD)
+
+    files = []
+    for index in range(6):
+        child = "a" if index % 2 else str(index)
+        path = tmp_path / f"{index}.xml"
+        path.write_text(f"<Root><Child>{child}</Child></Root>")
+        files.append((str(path), f"file{index}.xml", False))
+
+    results = list(validate_files(files, str(schema_path), max_workers=2))
+
+    assert len(results) == len(files)
+    for index, (violations, record) in enumerate(results):
+        assert record is None
+        if index % 2:
+            assert [v.filename for v in violations] == [f"file{index}.xml"]
+        else:
+            assert violations == []
+
+
+def test_validate_files_compiles_the_schema_while_locked(tmp_path):
+    """
+    GIVEN a schema that's only on disk while a lock is held
+    WHEN `validate_files` is called with that lock
+    THEN each worker compiles the schema while holding the lock
+    """
+    schema_path = tmp_path / "schema.xsd"
+    guard = threading.Lock()
+    holders = []
+    entered = []
+
+    @contextmanager
+    def lock():
+        # Shared, like `SchemaLoader.locked`, so the workers can overlap
+        with guard:
+            entered.append(True)
+            if not holders:
+                schema_path.write_text(SIMPLE_XSD)
+            holders.append(True)
+        try:
+            yield
+        finally:
+            with guard:
+                holders.pop()
+                if not holders:
+                    schema_path.unlink()
+
+    files = []
+    for index, child in enumerate(["1", "a", "2"]):
+        path = tmp_path / f"{index}.xml"
+        path.write_text(f"<Root><Child>{child}</Child></Root>")
+        files.append((str(path), path.name, False))
+
+    results = validate_files(files, str(schema_path), max_workers=2, lock=lock)
+
+    assert [len(violations) for violations, _ in results] == [0, 1, 0]
+    assert 1 <= len(entered) <= 2
+    assert not schema_path.exists()
+
+
+def _validate_in_daemon(files, schema_path, results):
+    results.put(
+        [len(violations) for violations, _ in validate_files(files, schema_path, 2)]
+    )
+
+
+def test_validate_files_in_a_daemonic_process(tmp_path):
+    """
+    GIVEN a daemonic process, like the pool processes of a Celery worker
+    WHEN `validate_files` is called in it with multiple workers
+    THEN the files are validated
+    """
+    schema_path = tmp_path / "schema.xsd"
+    schema_path.write_text(SIMPLE_XSD)
+    files = []
+    for index, child in enumerate(["1", "a"]):
+        path = tmp_path / f"{index}.xml"
+        path.write_text(f"<Root><Child>{child}</Child></Root>")
+        files.append((str(path), path.name, False))
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    process = context.Process(
+        target=_validate_in_daemon,
+        args=(files, str(schema_path), results),
+        daemon=True,
+    )
+    process.start()
+    assert results.get(timeout=30) == [0, 1]
+    process.join()
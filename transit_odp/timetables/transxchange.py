@@ -109,6 +109,10 @@ class TransXChangeDocument:
         class_name = self.__class__.__name__
         return f"{class_name}(source={self.name!r})"
 
+    @property
+    def tree(self) -> etree._ElementTree:
+        return self._tree
+
     def __getattr__(self, attr):
         try:
             return getattr(self._root, attr)
@@ -5,7 +5,7 @@ from io import StringIO
 
 from transit_odp.pipelines.constants import SchemaCategory
 from transit_odp.pipelines.models import SchemaDefinition
-from transit_odp.pipelines.pipelines.xml_schema import SchemaLoader
+from transit_odp.pipelines.pipelines.xml_schema import SchemaLoader, schema_registry
 from transit_odp.timetables.constants import TXC_XSD_PATH
 from django.conf import settings
 
@@ -15,9 +15,15 @@ logger = logging.getLogger(__name__)
 
 
 def get_transxchange_schema():
+    return schema_registry.get_schema(SchemaCategory.TXC, TXC_XSD_PATH)
+
+
+def get_transxchange_schema_loader() -> SchemaLoader:
+    """
+    Returns the loader of the TransXChange XSDs on the local filesystem.
+    """
     definition = SchemaDefinition.objects.get(category=SchemaCategory.TXC)
-    schema_loader = SchemaLoader(definition, TXC_XSD_PATH)
-    return schema_loader.schema
+    return SchemaLoader(definition, TXC_XSD_PATH)
 
 
 def get_s3_bucket_storage():
@@ -1,17 +1,33 @@
 import re
-import zipfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from logging import getLogger
-from typing import List, Optional
+from pathlib import Path
+from typing import Callable, ContextManager, Iterator, List, Optional, Tuple
 
+from django.conf import settings
 from lxml import etree
 
 from transit_odp.common.loggers import DatasetPipelineLoggerContext, PipelineAdapter
 from transit_odp.data_quality.pti.models import Observation, Violation
 from transit_odp.organisation.models import DatasetRevision, TXCFileAttributes
 from transit_odp.timetables.constants import PII_ERROR
+from transit_odp.timetables.incremental import LiveRevisionFiles
 from transit_odp.timetables.proxies import TimetableDatasetRevision
-from transit_odp.timetables.transxchange import TXCSchemaViolation
-from transit_odp.timetables.utils import get_transxchange_schema
+from transit_odp.timetables.store import (
+    TXCDocumentRecord,
+    TXCDocumentStore,
+    open_stored_file,
+)
+from transit_odp.timetables.transxchange import (
+    TransXChangeDocument,
+    TXCSchemaViolation,
+)
+from transit_odp.timetables.utils import (
+    get_transxchange_schema,
+    get_transxchange_schema_loader,
+)
 from transit_odp.validate.xml import FileValidator, XMLValidator
 from transit_odp.validate.zip import ZippedValidator
 
@@ -46,39 +62,132 @@ REVISION_NUMBER_OBSERVATION = Observation(
 )
 
 
+# The compiled schema of each parallel schema validation thread, a schema keeps
+# the error log of its last validation so it can't be shared between threads
+_worker = threading.local()
+
+SchemaValidationResult = Tuple[List[TXCSchemaViolation], Optional[TXCDocumentRecord]]
+
+
+def _init_schema_worker(
+    schema_path: str, lock: Callable[[], ContextManager] = nullcontext
+) -> None:
+    # The XSDs the schema includes are read as it's compiled
+    with lock():
+        _worker.schema = etree.XMLSchema(etree.parse(schema_path))
+
+
+def _validate_file(path: str, name: str, create_record: bool) -> SchemaValidationResult:
+    doc = TransXChangeDocument(open_stored_file(Path(path), name))
+    schema = _worker.schema
+    violations = []
+    if not schema.validate(doc.tree):
+        violations = [
+            TXCSchemaViolation.from_error(error) for error in schema.error_log
+        ]
+
+    record = None
+    if create_record:
+        try:
+            record = TXCDocumentRecord.from_txc_document(doc)
+        except Exception:
+            logger.debug(f"Unable to create record for {name}.")
+
+    return violations, record
+
+
+def validate_files(
+    files: List[Tuple[str, str, bool]],
+    schema_path: str,
+    max_workers: int,
+    lock: Callable[[], ContextManager] = nullcontext,
+) -> Iterator[SchemaValidationResult]:
+    """Validates files against an XSD schema using a pool of threads.
+
+    lxml releases the GIL while it parses and validates documents, so the
+    threads validate in parallel. Threads are used rather than processes as
+    Celery's pool processes are daemonic and can't have children. Each thread
+    compiles its own copy of the schema, rather than using the one in
+    `schema_registry`, while holding `lock`. Results are returned in the same
+    order as `files`.
+
+    Args:
+        files: A list of (path, name, create_record) of the files to validate.
+        schema_path: The path of the XSD to validate against.
+        max_workers: The number of threads to validate with.
+        lock: Returns a context manager held while a thread compiles the schema,
+            e.g. `SchemaLoader.locked` so the XSDs aren't extracted meanwhile.
+    """
+    with ThreadPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_schema_worker,
+        initargs=(schema_path, lock),
+    ) as executor:
+        yield from executor.map(_validate_file, *zip(*files))
+
+
 class DatasetTXCValidator:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self._schema = get_transxchange_schema()
+        self.max_workers = max_workers or settings.TXC_SCHEMA_VALIDATION_WORKERS
 
-    def iter_get_files(self, revision: DatasetRevision):
+    def iter_get_documents(self, revision: DatasetRevision):
         context = DatasetPipelineLoggerContext(object_id=revision.dataset_id)
         adapter = PipelineAdapter(logger, {"context": context})
 
-        file_ = revision.upload_file
-        if revision.is_file_zip:
-            adapter.info(f"Processing zip file {file_.name}.")
-            with zipfile.ZipFile(file_) as zf:
-                names = [n for n in zf.namelist() if n.endswith(".xml")]
-                total_files = len(names)
-                for index, name in enumerate(names, 1):
-                    adapter.info(f"Validating file {index} of {total_files} - {name}.")
-                    with zf.open(name) as f:
-                        yield f
-        else:
-            adapter.info(f"Getting file 1 of 1 - {file_.name}.")
-            file_.seek(0)
-            yield file_
+        store = TXCDocumentStore(revision)
+        live_files = LiveRevisionFiles(revision)
+        stored_files = store.get_stored_files()
+        total_files = len(stored_files)
+        for index, stored in enumerate(stored_files, 1):
+            if live_files.is_unchanged(stored):
+                adapter.info(f"{stored.name} unchanged, skipping.")
+                continue
+            adapter.info(f"Validating file {index} of {total_files} - {stored.name}.")
+            yield store.get_document(stored)
 
     def get_violations(self, revision: DatasetRevision):
+        if self.max_workers > 1:
+            return self.get_violations_in_parallel(revision)
+
         violations = []
-        for file_ in self.iter_get_files(revision=revision):
-            doc = etree.parse(file_)
-            is_valid = self._schema.validate(doc)
+        for doc in self.iter_get_documents(revision=revision):
+            is_valid = self._schema.validate(doc.tree)
             if not is_valid:
                 for error in self._schema.error_log:
                     violations.append(TXCSchemaViolation.from_error(error))
         return violations
 
+    def get_violations_in_parallel(self, revision: DatasetRevision):
+        context = DatasetPipelineLoggerContext(object_id=revision.dataset_id)
+        adapter = PipelineAdapter(logger, {"context": context})
+
+        store = TXCDocumentStore(revision)
+        # Files in the live revision have already passed schema validation
+        stored_files = LiveRevisionFiles(revision).get_changed(store.get_stored_files())
+        if not stored_files:
+            return []
+
+        adapter.info(
+            f"Validating {len(stored_files)} files with {self.max_workers} threads."
+        )
+        files = [
+            (str(store.get_path(stored)), stored.name, not store.has_record(stored))
+            for stored in stored_files
+        ]
+        loader = get_transxchange_schema_loader()
+        schema_path = str(loader.path)
+
+        violations = []
+        results = validate_files(
+            files, schema_path, self.max_workers, lock=loader.locked
+        )
+        for stored, (file_violations, record) in zip(stored_files, results):
+            violations += file_violations
+            if record is not None:
+                store.save_record(stored, record)
+        return violations
+
 
 class TimetableFileValidator:
     def __init__(self, revision):
@@ -152,7 +261,7 @@ class TXCRevisionValidator:
         """
         if self._live_hashes is not None:
             return self._live_hashes
-        self._live_hashes = self.live_revision.get_txc_hashes()
+        self._live_hashes = [attrs.hash for attrs in self.live_attributes]
         return self._live_hashes
 
     @property
@@ -58,9 +58,8 @@ class BasePostSchemaCSVView(DetailView):
         buffer_ = io.BytesIO()
         with ZipFile(buffer_, mode="w", compression=ZIP_DEFLATED) as zin:
             csv_export = PostSchemaCSV(revision)
-            output = csv_export.to_string()
             if csv_export.count() > 0:
-                zin.writestr(csv_filename, output)
+                csv_export.to_zip(zin, csv_filename)
 
         buffer_.seek(0)
         response = FileResponse(buffer_)
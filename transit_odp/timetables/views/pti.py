@@ -106,9 +106,8 @@ class BaseViolationsCSVFileView(DetailView):
         zip_filename = f"validation_{org_id}_{dataset.id}.zip"
         with ZipFile(buffer_, mode="w", compression=ZIP_DEFLATED) as zin:
             builder = TXCSchemaCSV(revision_id=revision.id)
-            output = builder.to_string()
             if builder.count() > 0:
-                zin.writestr("txc_observations.csv", output)
+                builder.to_zip(zin, "txc_observations.csv")
 
         buffer_.seek(0)
         response = FileResponse(buffer_)
@@ -129,9 +128,8 @@ class BaseViolationsCSVFileView(DetailView):
         )
         with ZipFile(buffer_, mode="w", compression=ZIP_DEFLATED) as zin:
             builder = PTICSV(revision_id=revision.id)
-            output = builder.to_string()
             if builder.count() > 0:
-                zin.writestr(pti_report_filename, output)
+                builder.to_zip(zin, pti_report_filename)
 
         buffer_.seek(0)
         response = FileResponse(buffer_)
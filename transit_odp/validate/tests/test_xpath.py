@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import pytest
+from lxml import etree
+
+from transit_odp.data_quality.pti.models import Schema
+from transit_odp.validate.xpath import (
+    ContextPath,
+    compile_observations,
+    select_contexts,
+)
+
+TIMETABLES_DIR = Path(__file__).parents[2] / "timetables"
+PTI_SCHEMA = TIMETABLES_DIR / "pti_schema.json"
+TXC_FILE = TIMETABLES_DIR / "tests" / "data" / "ea_20-1A-A-y08-1.xml"
+NAMESPACES = {"x": "http://www.transxchange.org.uk/"}
+
+
+def test_compile_observations():
+    schema = Schema.from_path(PTI_SCHEMA)
+    compiled = compile_observations(schema.observations, schema.header.namespaces)
+
+    assert len(compiled) == len(schema.observations)
+    for item, observation in zip(compiled, schema.observations):
+        assert item.observation is observation
+        assert item.context.path == observation.context
+        assert [rule.path for rule in item.rules] == [
+            rule.test for rule in observation.rules
+        ]
+
+
+def test_compile_observations_invalid_xpath():
+    schema = Schema.from_path(PTI_SCHEMA)
+    observation = schema.observations[0].copy(update={"context": "//x:Line["})
+
+    with pytest.raises(etree.XPathSyntaxError):
+        compile_observations([observation], schema.header.namespaces)
+
+
+@pytest.mark.parametrize(
+    ("expression", "absolute", "tags"),
+    [
+        ("//x:Line", False, ("{http://www.transxchange.org.uk/}Line",)),
+        ("/x:TransXChange", True, ("{http://www.transxchange.org.uk/}TransXChange",)),
+        (
+            "//x:Notes/x:Note/x:Private",
+            False,
+            (
+                "{http://www.transxchange.org.uk/}Notes",
+                "{http://www.transxchange.org.uk/}Note",
+                "{http://www.transxchange.org.uk/}Private",
+            ),
+        ),
+        (
+            "//x:VehicleJourneyInterchange ",
+            False,
+            ("{http://www.transxchange.org.uk/}VehicleJourneyInterchange",),
+        ),
+    ],
+)
+def test_parse_context_path(expression, absolute, tags):
+    path = ContextPath.parse(expression, NAMESPACES)
+    assert path == ContextPath(absolute=absolute, tags=tags)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["//x:Line[@id]", "//x:Lines//x:Line", "x:Line", "//y:Line", "count(//x:Line)"],
+)
+def test_parse_context_path_not_a_path(expression):
+    assert ContextPath.parse(expression, NAMESPACES) is None
+
+
+def test_select_contexts_matches_xpath():
+    schema = Schema.from_path(PTI_SCHEMA)
+    compiled = compile_observations(schema.observations, schema.header.namespaces)
+    document = etree.parse(str(TXC_FILE))
+
+    selected = select_contexts(document, compiled)
+    for item, elements in zip(compiled, selected):
+        assert elements == item.context(document)
@@ -0,0 +1,132 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lxml import etree
+
+STEP_PATTERN = re.compile(r"(?:([A-Za-z_][\w.-]*):)?([A-Za-z_][\w.-]*)")
+
+
+@dataclass(frozen=True)
+class ContextPath:
+    """A context expression that is a path of element names, e.g.
+    "//x:Service/x:Lines/x:Line" or "/x:TransXChange".
+
+    Elements can be tested against a ContextPath as the document is walked, so
+    the contexts of many observations are matched with a single walk.
+    """
+
+    absolute: bool
+    tags: Tuple[str, ...]
+
+    @classmethod
+    def parse(
+        cls, expression: str, namespaces: Dict[str, str]
+    ) -> Optional["ContextPath"]:
+        """
+        Returns the ContextPath of `expression` or None if the expression
+        is not a path of element names.
+        """
+        expression = expression.strip()
+        if expression.startswith("//"):
+            absolute, steps = False, expression[2:]
+        elif expression.startswith("/"):
+            absolute, steps = True, expression[1:]
+        else:
+            return None
+
+        tags = []
+        for step in steps.split("/"):
+            match = STEP_PATTERN.fullmatch(step)
+            if match is None:
+                return None
+            prefix, name = match.groups()
+            if prefix is None:
+                tags.append(name)
+            elif prefix in namespaces:
+                tags.append(f"{{{namespaces[prefix]}}}{name}")
+            else:
+                return None
+        return cls(absolute=absolute, tags=tuple(tags))
+
+    def matches(self, element: etree._Element) -> bool:
+        """
+        Returns True if the path selects `element`, the tag of `element` must
+        be the last tag of the path.
+        """
+        node = element
+        for tag in reversed(self.tags[:-1]):
+            node = node.getparent()
+            if node is None or node.tag != tag:
+                return False
+        if self.absolute:
+            return node.getparent() is None
+        return True
+
+
+@dataclass(frozen=True)
+class CompiledObservation:
+    """An observation of a JSON rule schema with its context and the tests of its
+    rules compiled into XPath objects.
+
+    Compiling the expressions once means they aren't parsed again for every
+    element they are evaluated on. Functions registered in the lxml
+    FunctionNamespace are resolved when the expressions are evaluated.
+    """
+
+    observation: Any
+    context: etree.XPath
+    rules: List[etree.XPath]
+    path: Optional[ContextPath] = None
+
+
+def compile_observations(
+    observations: Sequence[Any], namespaces: Dict[str, str]
+) -> List[CompiledObservation]:
+    """
+    Returns `observations` with their context and rule tests compiled.
+
+    Raises:
+        XPathSyntaxError: if an expression isn't valid XPath.
+    """
+    compiled = []
+    for observation in observations:
+        compiled.append(
+            CompiledObservation(
+                observation=observation,
+                context=etree.XPath(observation.context, namespaces=namespaces),
+                rules=[
+                    etree.XPath(rule.test, namespaces=namespaces)
+                    for rule in observation.rules
+                ],
+                path=ContextPath.parse(observation.context, namespaces),
+            )
+        )
+    return compiled
+
+
+def select_contexts(
+    document: etree._ElementTree, observations: Sequence[CompiledObservation]
+) -> List[List[etree._Element]]:
+    """
+    Returns the elements selected by the context of each observation.
+
+    The contexts that are paths of element names are matched in a single walk
+    of the document, the rest are evaluated as XPath. Elements are returned in
+    document order, the same as evaluating each context on its own.
+    """
+    selected = [[] for _ in observations]
+    paths_by_tag = defaultdict(list)
+    for index, compiled in enumerate(observations):
+        if compiled.path is None:
+            selected[index] = list(compiled.context(document))
+        else:
+            paths_by_tag[compiled.path.tags[-1]].append((index, compiled.path))
+
+    if paths_by_tag:
+        for element in document.iter(*paths_by_tag):
+            for index, path in paths_by_tag[element.tag]:
+                if path.matches(element):
+                    selected[index].append(element)
+    return selected